@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Analysis Executor
+=====================================
+
+Spreads CPU-bound file scanning across a process pool. Files are grouped
+into chunks so each task carries enough work to outweigh its pickling
+cost, and the scan function is shipped to every worker once when the pool
+starts instead of with each chunk. Results are merged back in input order,
+so a parallel run returns exactly what a serial run would; imap() yields
+results as they complete instead. Rule profiler statistics gathered in a
+worker travel back with each chunk's results. A running analysis can be
+cancelled from another thread; queued chunks are dropped and map()
+returns None.
+"""
+
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+from rule_profiler import RuleProfile, get_rule_profiler
+
+# Set in each worker process by the pool initializer
+_worker_fn = None
+
+
+def _init_worker(fn: Callable):
+    global _worker_fn
+    _worker_fn = fn
+    # Forked workers inherit the parent's statistics; drop them so each
+    # chunk only reports what the worker itself measured
+    get_rule_profiler().drain()
+
+
+def _run_chunk(chunk: List[Tuple[Hashable, Any]]) -> Tuple[List[Tuple[Hashable, Any]], List[RuleProfile]]:
+    # Rule statistics gathered in the worker travel back with the results
+    results = [(key, _worker_fn(value)) for key, value in chunk]
+    return results, get_rule_profiler().drain()
+
+
+class AnalysisExecutor:
+    """Chunked, ordered and cancellable process-pool map for file analysis"""
+
+    def __init__(self, max_workers: int = None, chunk_size: int = None):
+        self.max_workers = max_workers or int(
+            os.environ.get('GITHUB_ANALYSIS_WORKERS', 0)
+        ) or os.cpu_count() or 1
+        self.chunk_size = chunk_size or int(os.environ.get('GITHUB_ANALYSIS_CHUNK_SIZE', 16))
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Tuple[Hashable, Any]],
+            cancel_event: threading.Event = None) -> Optional[Dict[Hashable, Any]]:
+        """Apply fn to every (key, value) item, returning {key: result} in input order
+
+        fn must be picklable (a module-level function or a method of a
+        module-level object). Items are consumed lazily, so at most a few
+        chunks per worker are held in memory. Returns None if cancelled.
+        """
+        cancel_event = cancel_event or threading.Event()
+        order = []
+
+        def keyed():
+            for key, value in items:
+                order.append(key)
+                yield key, value
+
+        results = dict(self.imap(fn, keyed(), cancel_event))
+        if cancel_event.is_set():
+            return None
+        return {key: results[key] for key in order}
+
+    def imap(self, fn: Callable[[Any], Any], items: Iterable[Tuple[Hashable, Any]],
+             cancel_event: threading.Event = None) -> Iterator[Tuple[Hashable, Any]]:
+        """Yield (key, result) pairs as workers finish them, in completion order
+
+        Stops early, without raising, once the analysis is cancelled.
+        """
+        cancel_event = cancel_event or threading.Event()
+        with self._lock:
+            self._active.add(cancel_event)
+
+        try:
+            if self.max_workers <= 1:
+                yield from self._iter_serial(fn, items, cancel_event)
+            else:
+                yield from self._iter_parallel(fn, items, cancel_event)
+        finally:
+            with self._lock:
+                self._active.discard(cancel_event)
+
+    def cancel(self):
+        """Cancel every analysis currently running on this executor"""
+        with self._lock:
+            for cancel_event in self._active:
+                cancel_event.set()
+
+    def _iter_serial(self, fn, items, cancel_event) -> Iterator[Tuple[Hashable, Any]]:
+        for key, value in items:
+            if cancel_event.is_set():
+                print("⚠️  Analysis cancelled")
+                return
+            yield key, fn(value)
+
+    def _chunks(self, items) -> Iterator[List[Tuple[Hashable, Any]]]:
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _iter_parallel(self, fn, items, cancel_event) -> Iterator[Tuple[Hashable, Any]]:
+        chunks = self._chunks(items)
+        first = next(chunks, None)
+        if first is None:
+            return
+
+        # A single chunk is not worth starting a pool for
+        second = next(chunks, None)
+        if second is None:
+            yield from self._iter_serial(fn, first, cancel_event)
+            return
+
+        max_pending = self.max_workers * 2
+        pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker, initargs=(fn,))
+        finished = False
+        try:
+            pending = set()
+            queued = iter([first, second])
+
+            def submit_next() -> bool:
+                chunk = next(queued, None) or next(chunks, None)
+                if chunk is None:
+                    return False
+                pending.add(pool.submit(_run_chunk, chunk))
+                return True
+
+            while len(pending) < max_pending and submit_next():
+                pass
+
+            while pending:
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                if cancel_event.is_set():
+                    print("⚠️  Analysis cancelled")
+                    return
+                for future in done:
+                    submit_next()
+                    results, profiles = future.result()
+                    get_rule_profiler().merge(profiles)
+                    yield from results
+            finished = True
+        finally:
+            # Abandoned or cancelled runs drop their queued chunks
+            pool.shutdown(wait=finished, cancel_futures=True)
+
+
+_analysis_executor = None
+_analysis_executor_lock = threading.Lock()
+
+
+def get_analysis_executor() -> AnalysisExecutor:
+    """Return the process-wide analysis executor"""
+    global _analysis_executor
+    with _analysis_executor_lock:
+        if _analysis_executor is None:
+            _analysis_executor = AnalysisExecutor()
+        return _analysis_executor
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Analysis Jobs
+=================================
+
+Runs repository analyses as background jobs so web requests never wait on
+one. A job is submitted with an id and executed by a worker thread; while
+it runs it reports progress (files scanned, findings so far), and the API
+serves the last completed results together with the job's status.
+Submitting a repository that already has a queued or running job returns
+that job instead of starting another. A job can also publish items, such as
+proposals, as it produces them. Any number of followers receive them, each
+from the first item on, until the job finishes. The published items are
+only held while the job runs; followers that join a finished job read them
+from wherever the job stored them.
+"""
+
+import os
+import uuid
+import queue
+import threading
+from datetime import datetime
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+
+@dataclass
+class AnalysisJob:
+    id: str
+    repo_name: str
+    status: str = QUEUED
+    created_at: str = ''
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    progress: Dict = field(default_factory=dict)
+    proposals: Optional[int] = None
+    error: Optional[str] = None
+
+    def __post_init__(self):
+        if not self.created_at:
+            self.created_at = datetime.now().isoformat()
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        # Signalled on every published item and when the job finishes
+        self._changed = threading.Condition(self._lock)
+        self._published = []
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the job finishes; True if it did within the timeout"""
+        return self._done.wait(timeout)
+
+    def update_progress(self, progress: Dict):
+        """Record the latest counters reported by the analysis"""
+        with self._lock:
+            self.progress = dict(progress)
+
+    def publish(self, item: Dict):
+        """Hand an item to everyone following the job"""
+        with self._changed:
+            self._published.append(item)
+            self._changed.notify_all()
+
+    def follow(self, heartbeat: float = None,
+               stored: Callable[[], Iterable[Dict]] = None) -> Iterator[Optional[Dict]]:
+        """Yield every published item, earlier ones first, until the job finishes
+
+        With a heartbeat, None is yielded whenever that many seconds pass
+        without a new item, so a caller can keep its connection alive. The
+        items of a job that has already finished are no longer held; stored()
+        is called to load them instead.
+        """
+        with self._changed:
+            # Followers keep their own reference, so releasing the buffer
+            # when the job finishes does not cut a slow follower short
+            published = self._published
+        if published is None:
+            if stored:
+                yield from stored()
+            return
+
+        index = 0
+        while True:
+            with self._changed:
+                if index >= len(published) and self.active:
+                    self._changed.wait(heartbeat)
+                items = published[index:]
+                finished = not self.active
+            index += len(items)
+            yield from items
+            if finished and index >= len(published):
+                return
+            if not items:
+                yield None
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'id': self.id,
+                'repo_name': self.repo_name,
+                'status': self.status,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'progress': dict(self.progress),
+                'proposals': self.proposals,
+                'error': self.error
+            }
+
+
+class AnalysisJobQueue:
+    """FIFO of analysis jobs executed by background worker threads"""
+
+    def __init__(self, workers: int = None, history: int = None):
+        self.workers = workers or int(os.environ.get('GITHUB_ANALYSIS_JOB_WORKERS', 1))
+        self.history = history or int(os.environ.get('GITHUB_ANALYSIS_JOB_HISTORY', 50))
+        self._jobs = OrderedDict()
+        self._runners = {}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"analysis-job-{len(self._threads)}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, repo_name: str, run: Callable[[AnalysisJob], Optional[int]]) -> AnalysisJob:
+        """Queue run(job) for a repository, or return the job already pending for it
+
+        run may call job.update_progress() and returns the number of
+        proposals produced.
+        """
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if job.repo_name == repo_name and job.active:
+                    return job
+
+            job = AnalysisJob(id=uuid.uuid4().hex, repo_name=repo_name)
+            self._jobs[job.id] = job
+            self._runners[job.id] = run
+            self._trim()
+            self._start_workers()
+
+        self._queue.put(job.id)
+        print(f"⏳ Queued analysis job {job.id} for {repo_name}")
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest(self, repo_name: str) -> Optional[AnalysisJob]:
+        """Most recently submitted job for a repository"""
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if job.repo_name == repo_name:
+                    return job
+        return None
+
+    def jobs(self) -> List[AnalysisJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _trim(self):
+        # Forget the oldest finished jobs beyond the history limit
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(self._jobs) - self.history)]:
+            del self._jobs[job_id]
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                job = self._jobs.get(job_id)
+                run = self._runners.pop(job_id, None)
+            if job is None or run is None:
+                continue
+
+            with job._lock:
+                job.status = RUNNING
+                job.started_at = datetime.now().isoformat()
+
+            try:
+                proposals = run(job)
+                with job._lock:
+                    job.status = COMPLETED
+                    job.proposals = proposals
+                print(f"✅ Analysis job {job.id} for {job.repo_name} completed")
+            except Exception as e:
+                with job._lock:
+                    job.status = FAILED
+                    job.error = str(e)
+                print(f"❌ Analysis job {job.id} for {job.repo_name} failed: {e}")
+            finally:
+                with job._changed:
+                    job.finished_at = datetime.now().isoformat()
+                    # Finished jobs stay in the history; their items do not
+                    job._published = None
+                    job._changed.notify_all()
+                job._done.set()
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> AnalysisJobQueue:
+    """Return the process-wide analysis job queue"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = AnalysisJobQueue()
+        return _job_queue
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Incremental Analysis Store
+==============================================
+
+Persists rule findings per (git blob SHA, ruleset version) in SQLite, along
+with the file map of the last analyzed commit of each repository. A new
+analysis only scans blobs that have no stored findings for the current
+ruleset; findings for unchanged files are carried forward, so a push that
+touches a few files costs a few files of work.
+"""
+
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+import functools
+import itertools
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from rule_profiler import get_rule_profiler
+
+DB_PATH = os.path.join(os.path.dirname(__file__), 'db.sqlite')
+
+# SQLite limits the number of bound parameters per statement
+QUERY_CHUNK_SIZE = 500
+
+
+def _scan_file(scan: Callable[[str], List[Dict]], item: Tuple[str, str]) -> Tuple[List[Dict], bool]:
+    """(findings, complete) of scan(content) for a (path, content) pair
+
+    Rule time is charged to the path. complete is False when a rule ran out
+    of its time budget, so the findings may be missing some hits.
+    """
+    path, content = item
+    profiler = get_rule_profiler()
+    with profiler.file(path):
+        findings = scan(content)
+        return findings, profiler.file_timeouts == 0
+
+
+def ruleset_version(rules: List[Dict]) -> str:
+    """Stable version string for a list of rule definitions"""
+    encoded = json.dumps(rules, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:12]
+
+
+class AnalysisStore:
+    """Per-blob findings and last analyzed commit per repository"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or DB_PATH
+        self.last_summary = {}
+        self._lock = threading.Lock()
+        self._create_tables()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _create_tables(self):
+        conn = self._connect()
+        try:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS blob_findings (
+                blob_sha TEXT NOT NULL,
+                ruleset_version TEXT NOT NULL,
+                findings TEXT NOT NULL,
+                analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (blob_sha, ruleset_version)
+            )
+            ''')
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_runs (
+                repo_name TEXT NOT NULL,
+                ruleset_version TEXT NOT NULL,
+                commit_sha TEXT NOT NULL,
+                files TEXT NOT NULL,
+                analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (repo_name, ruleset_version)
+            )
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def last_run(self, repo_name: str, version: str) -> Optional[Dict]:
+        """Commit and file map of the repository's last analysis under a ruleset"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT commit_sha, ruleset_version, files, analyzed_at FROM analysis_runs '
+                'WHERE repo_name = ? AND ruleset_version = ?',
+                (repo_name, version)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+        return {
+            'commit_sha': row['commit_sha'],
+            'ruleset_version': row['ruleset_version'],
+            'files': json.loads(row['files']),
+            'analyzed_at': row['analyzed_at']
+        }
+
+    def get_findings(self, blob_shas: Iterable[str], version: str) -> Dict[str, List[Dict]]:
+        """Stored findings for the given blobs under one ruleset version"""
+        blob_shas = list(blob_shas)
+        found = {}
+
+        conn = self._connect()
+        try:
+            for start in range(0, len(blob_shas), QUERY_CHUNK_SIZE):
+                chunk = blob_shas[start:start + QUERY_CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f'SELECT blob_sha, findings FROM blob_findings '
+                    f'WHERE ruleset_version = ? AND blob_sha IN ({placeholders})',
+                    [version] + chunk
+                ).fetchall()
+                for row in rows:
+                    found[row['blob_sha']] = json.loads(row['findings'])
+        finally:
+            conn.close()
+
+        return found
+
+    def save_findings(self, findings_by_blob: Dict[str, List[Dict]], version: str):
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO blob_findings (blob_sha, ruleset_version, findings) VALUES (?, ?, ?)',
+                    [(blob_sha, version, json.dumps(findings)) for blob_sha, findings in findings_by_blob.items()]
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+    def save_run(self, repo_name: str, commit_sha: str, version: str, files: Dict[str, str]):
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO analysis_runs (repo_name, ruleset_version, commit_sha, files) '
+                    'VALUES (?, ?, ?, ?)',
+                    (repo_name, version, commit_sha, json.dumps(files))
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+    def analyze_snapshot(self, repo_name: str, snapshot, version: str,
+                         scan: Callable[[str], List[Dict]],
+                         extensions: Tuple[str, ...] = None,
+                         executor=None,
+                         progress: Callable[[Dict], None] = None,
+                         prefilter: Callable[..., Optional[Set[str]]] = None) -> Optional[Dict[str, List[Dict]]]:
+        """Return findings per path, scanning only blobs not analyzed before
+
+        With an AnalysisExecutor the new blobs are scanned in parallel worker
+        processes. Returns None if the executor's analysis was cancelled.
+        progress receives {'files', 'to_scan', 'scanned', 'findings'} after
+        each scanned blob, with findings counted over every file so far.
+        """
+        cancel_event = threading.Event()
+        results = dict(self.iter_snapshot(
+            repo_name, snapshot, version, scan, extensions, executor, progress, cancel_event, prefilter
+        ))
+        if cancel_event.is_set():
+            return None
+        return {path: results[path] for path in sorted(results)}
+
+    def iter_snapshot(self, repo_name: str, snapshot, version: str,
+                      scan: Callable[[str], List[Dict]],
+                      extensions: Tuple[str, ...] = None,
+                      executor=None,
+                      progress: Callable[[Dict], None] = None,
+                      cancel_event: threading.Event = None,
+                      prefilter: Callable[..., Optional[Set[str]]] = None) -> Iterator[Tuple[str, List[Dict]]]:
+        """Yield (path, findings) as soon as each file's findings are known
+
+        Files with stored findings come first, then scanned files in the
+        order they finish. The run is recorded once iteration completes; a
+        cancelled or abandoned iteration records nothing. Findings of a blob
+        where a rule timed out are yielded but not stored, so the blob is
+        scanned again by the next run.
+
+        prefilter(snapshot) may return the set of paths that can match any
+        rule at all; other new blobs get empty findings without being read.
+        """
+        cancel_event = cancel_event or threading.Event()
+        current = {
+            path: blob_sha for path, blob_sha in snapshot.blob_shas().items()
+            if not extensions or path.endswith(extensions)
+        }
+
+        previous_run = self.last_run(repo_name, version)
+        previous = previous_run['files'] if previous_run else {}
+        changed = [path for path, blob_sha in current.items() if previous.get(path) != blob_sha]
+        removed = [path for path in previous if path not in current]
+
+        known = self.get_findings(set(current.values()), version)
+
+        paths_by_blob = {}
+        for path in sorted(current):
+            paths_by_blob.setdefault(current[path], []).append(path)
+        unseen = [blob_sha for blob_sha in paths_by_blob if blob_sha not in known]
+
+        skipped = []
+        candidates = prefilter(snapshot) if prefilter and unseen else None
+        if candidates is not None:
+            skipped = [
+                blob_sha for blob_sha in unseen
+                if not any(path in candidates for path in paths_by_blob[blob_sha])
+            ]
+            skipped_set = set(skipped)
+            unseen = [blob_sha for blob_sha in unseen if blob_sha not in skipped_set]
+
+        # Stored findings count from the start; new ones as their blob is scanned
+        counts = {'files': len(current), 'to_scan': len(unseen) + len(skipped), 'scanned': 0, 'findings': 0}
+        counts['findings'] = sum(
+            len(known[blob_sha]) * len(paths) for blob_sha, paths in paths_by_blob.items() if blob_sha in known
+        )
+        if progress:
+            progress(dict(counts))
+
+        for path in sorted(current):
+            if current[path] in known:
+                yield path, known[current[path]]
+
+        contents = (
+            (blob_sha, (paths_by_blob[blob_sha][0], snapshot.read_text(paths_by_blob[blob_sha][0])))
+            for blob_sha in unseen
+        )
+        scan_file = functools.partial(_scan_file, scan)
+        if executor is not None:
+            results = executor.imap(scan_file, contents, cancel_event)
+        else:
+            results = self._scan_serial(scan_file, contents, cancel_event)
+
+        scanned = {}
+        incomplete = set()
+        for blob_sha, (findings, complete) in itertools.chain(((blob_sha, ([], True)) for blob_sha in skipped), results):
+            scanned[blob_sha] = findings
+            if not complete:
+                incomplete.add(blob_sha)
+            counts['scanned'] += 1
+            counts['findings'] += len(findings) * len(paths_by_blob[blob_sha])
+            if progress:
+                progress(dict(counts))
+            for path in paths_by_blob[blob_sha]:
+                yield path, findings
+
+        if cancel_event.is_set():
+            return
+
+        complete = {blob_sha: findings for blob_sha, findings in scanned.items() if blob_sha not in incomplete}
+        if complete:
+            self.save_findings(complete, version)
+        self.save_run(repo_name, snapshot.sha or '', version, current)
+
+        self.last_summary = {
+            'files': len(current),
+            'changed': len(changed),
+            'removed': len(removed),
+            'scanned': len(scanned) - len(skipped),
+            'prefiltered': len(skipped),
+            'incomplete': len(incomplete),
+            'carried_forward': len(current) - sum(len(paths_by_blob[blob_sha]) for blob_sha in scanned),
+            'since_commit': previous_run['commit_sha'] if previous_run else None
+        }
+        print(f"🔍 Analyzed {len(current)} files in {repo_name}: {self.last_summary['scanned']} scanned, "
+              f"{len(skipped)} skipped by prefilter, {self.last_summary['carried_forward']} carried forward")
+        if incomplete:
+            print(f"⚠️  {len(incomplete)} files hit a rule timeout; their findings were not stored and will be rescanned")
+
+    def _scan_serial(self, scan, contents, cancel_event) -> Iterator[Tuple[str, List[Dict]]]:
+        for blob_sha, content in contents:
+            if cancel_event.is_set():
+                return
+            yield blob_sha, scan(content)
+
+
+_analysis_store = None
+_analysis_store_lock = threading.Lock()
+
+
+def get_analysis_store() -> AnalysisStore:
+    """Return the process-wide analysis store"""
+    global _analysis_store
+    with _analysis_store_lock:
+        if _analysis_store is None:
+            _analysis_store = AnalysisStore()
+        return _analysis_store
@@ -1,11 +1,13 @@
 import os
+import json
 import uuid
 import sqlite3
 import datetime
 import time
 import jwt
 from functools import wraps
-from flask import Flask, request, jsonify, g, render_template_string
+from dataclasses import asdict
+from flask import Flask, Response, request, jsonify, g, render_template_string, stream_with_context
 from flask_cors import CORS
 from flask_mail import Mail, Message
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -13,6 +15,15 @@ from dotenv import load_dotenv
 from github_integration import GitHubIntegration, IssueProposal
 from github_integration_app import GitHubIntegrationApp
 from github_integration_simple import GitHubIntegrationSimple
+from github_transport import get_transport
+from blob_cache import get_blob_cache
+from analysis_jobs import FAILED, get_job_queue
+from rule_profiler import get_rule_profiler
+from rule_packs import get_rule_packs
+from code_search import get_code_search
+from proposal_store import (
+    CREATE_PROPOSALS_TABLE, get_proposal, list_proposals, prune_proposals, save_proposal, update_status
+)
 
 # Load environment variables
 load_dotenv()
@@ -169,6 +180,9 @@ def create_tables():
     )
     ''')
 
+    # Create proposals table
+    cursor.execute(CREATE_PROPOSALS_TABLE)
+
     db.commit()
 
 # Create tables on startup
@@ -206,10 +220,20 @@ def dashboard():
             'POST /api/demo/chat': 'Send demo chat message (no auth required)'
         },
         'GitHub Integration': {
-            'GET /api/github/proposals': 'Get issue proposals',
+            'GET /api/github/proposals': 'Get stored issue proposals and analysis job status (?refresh=true queues an analysis)',
+            'GET /api/github/proposals/stream': 'Queue or join an analysis job and stream its proposals as Server-Sent Events',
+            'GET /api/github/diff-analysis': 'Analyze the added lines of a pull request (?pr=) or range (?range=base..head)',
+            'POST /api/github/analysis': 'Queue a repository analysis job',
+            'GET /api/github/analysis/<job_id>': 'Get analysis job status and progress',
             'POST /api/github/proposals/<id>/approve': 'Approve and create GitHub issue',
             'POST /api/github/proposals/<id>/reject': 'Reject issue proposal',
-            'GET /api/github/stats': 'Get repository statistics'
+            'GET /api/github/stats': 'Get repository statistics',
+            'GET /api/github/metrics': 'Get GitHub API client metrics',
+            'GET /api/github/rules': 'Get the loaded rule packs',
+            'POST /api/github/rules/reload': 'Reload rule packs from disk without a restart',
+            'GET /api/github/rules/profile': 'Get per-rule time, bytes, matches, timeouts and worst file',
+            'DELETE /api/github/rules/profile': 'Reset the rule profiler',
+            'GET /api/code/search': 'Search the analyzed code (?q=, &regex=true, &case=false, &limit=)'
         },
         'Public': {
             'GET /api/kanban': 'Get kanban board items'
@@ -283,6 +307,36 @@ def dashboard():
                         </div>
                     </div>
 
+                    <!-- Rule Profile -->
+                    <div class="bg-slate-800 rounded-lg p-6 border border-slate-700 mt-6">
+                        <h2 class="text-xl font-semibold text-white mb-4">Rule Profile</h2>
+                        <div class="text-xs text-slate-400 mb-3">
+                            {{ '%.3f'|format(rule_profile.total_seconds) }}s total,
+                            {{ rule_profile.total_timeouts }} timeouts,
+                            {{ rule_profile.timeout_seconds }}s budget per rule per file
+                        </div>
+                        {% if rule_profile.rules %}
+                        <div class="space-y-2">
+                            {% for rule in rule_profile.rules[:10] %}
+                            <div class="bg-slate-700 rounded p-2">
+                                <div class="flex justify-between">
+                                    <span class="text-sm font-mono text-green-400">{{ rule.rule_id }}</span>
+                                    <span class="text-sm {% if rule.timeouts %}text-red-400{% else %}text-white{% endif %}">{{ '%.3f'|format(rule.seconds) }}s</span>
+                                </div>
+                                <div class="text-xs text-slate-300 mt-1">
+                                    {{ rule.files }} files, {{ rule.bytes }} bytes, {{ rule.matches }} matches{% if rule.timeouts %}, {{ rule.timeouts }} timeouts{% endif %}
+                                </div>
+                                {% if rule.worst_file %}
+                                <div class="text-xs text-slate-400">Worst: {{ rule.worst_file }} ({{ '%.3f'|format(rule.worst_seconds) }}s)</div>
+                                {% endif %}
+                            </div>
+                            {% endfor %}
+                        </div>
+                        {% else %}
+                        <div class="text-sm text-slate-400">No rules evaluated yet</div>
+                        {% endif %}
+                    </div>
+
                     <!-- API Documentation -->
                     <div class="bg-slate-800 rounded-lg p-6 border border-slate-700 mt-6">
                         <h2 class="text-xl font-semibold text-white mb-4">API Documentation</h2>
@@ -358,7 +412,8 @@ def dashboard():
     return render_template_string(html_template, 
                                 console_logs=console_logs,
                                 server_stats=server_stats,
-                                api_docs=api_docs)
+                                api_docs=api_docs,
+                                rule_profile=get_rule_profiler().stats())
 
 # JWT token verification
 def token_required(f):
@@ -1081,9 +1136,30 @@ def send_demo_chat_message():
     }), 200
 
 # GitHub Integration endpoints
+def submit_proposal_analysis(github_integration):
+    """Queue a background analysis whose proposals replace the stored ones"""
+    repo_name = github_integration.repo_name
+
+    def run(job):
+        ids = []
+        with app.app_context():
+            try:
+                db = get_db()
+                # Each proposal goes to the job's stream followers as soon as the pipeline yields it
+                for proposal in github_integration.iter_proposals(progress=job.update_progress):
+                    ids.append(save_proposal(db, repo_name, proposal, commit=False))
+                    job.publish(asdict(proposal))
+                prune_proposals(db, repo_name, ids)
+            finally:
+                close_db()
+        add_log('success', f'Analysis of {repo_name} produced {len(ids)} proposals', endpoint='/api/github/analysis')
+        return len(ids)
+
+    return get_job_queue().submit(repo_name, run)
+
 @app.route('/api/github/proposals', methods=['GET'])
 def get_issue_proposals():
-    """Get issue proposals from GitHub analysis"""
+    """Get the latest stored issue proposals and the status of the analysis job"""
     add_log('info', 'GitHub proposals requested', endpoint='/api/github/proposals')
     try:
         # Use GitHub App integration
@@ -1102,30 +1178,120 @@ def get_issue_proposals():
                 'error': 'GitHub App not configured. Please set GITHUB_APP_ID and GITHUB_APP_PRIVATE_KEY_PATH.'
             }), 500
         
-        proposals = github_integration.analyze_repository()
+        db = get_db()
+        repo_name = github_integration.repo_name
+        proposals_data = list_proposals(db, repo_name)
+        job = get_job_queue().latest(repo_name)
+        
+        # Analysis runs in the background; this request only reads the table
+        if request.args.get('refresh') == 'true' or (not proposals_data and job is None):
+            add_log('info', f'Queueing analysis of repository: {repo_name}', endpoint='/api/github/proposals')
+            job = submit_proposal_analysis(github_integration)
         
-        # Convert proposals to dict format
-        proposals_data = []
-        for proposal in proposals:
-            proposal_dict = {
-                'id': proposal.id,
-                'title': proposal.title,
-                'description': proposal.description,
-                'severity': proposal.severity,
-                'category': proposal.category,
-                'file_path': proposal.file_path,
-                'line_number': proposal.line_number,
-                'suggested_fix': proposal.suggested_fix,
-                'labels': proposal.labels,
-                'created_at': proposal.created_at,
-                'status': proposal.status,
-                'github_issue_number': proposal.github_issue_number
-            }
-            proposals_data.append(proposal_dict)
+        return jsonify({
+            'success': True,
+            'data': proposals_data,
+            'job': job.to_dict() if job else None
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/github/proposals/stream', methods=['GET'])
+def stream_issue_proposals():
+    """Follow the repository's analysis job and stream each proposal as a Server-Sent Event"""
+    add_log('info', 'GitHub proposal stream requested', endpoint='/api/github/proposals/stream')
+    if not all([os.environ.get('GITHUB_APP_ID'), os.environ.get('GITHUB_APP_PRIVATE_KEY_PATH')]):
+        add_log('error', 'GitHub App not properly configured', endpoint='/api/github/proposals/stream')
+        return jsonify({
+            'success': False,
+            'error': 'GitHub App not configured. Please set GITHUB_APP_ID and GITHUB_APP_PRIVATE_KEY_PATH.'
+        }), 500
+    
+    github_integration = GitHubIntegrationSimple()
+    repo_name = github_integration.repo_name
+    # The analysis runs as a background job; a queued or running one is reused
+    job = submit_proposal_analysis(github_integration)
+    
+    def server_sent_event(event, data):
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    
+    def generate():
+        started = time.time()
+        count = 0
+        by_category = {}
+        
+        yield server_sent_event('job', job.to_dict())
+        # A job that finished before the stream joined is replayed from the proposals table
+        stored = lambda: list_proposals(get_db(), repo_name)
+        for proposal in job.follow(heartbeat=15, stored=stored):
+            if proposal is None:
+                # Keeps proxies from closing an idle stream while the job waits or scans
+                yield ": keep-alive\n\n"
+                continue
+            count += 1
+            by_category[proposal['category']] = by_category.get(proposal['category'], 0) + 1
+            yield server_sent_event('proposal', proposal)
+        
+        state = job.to_dict()
+        if state['status'] == FAILED:
+            add_log('error', f"Proposal stream failed: {state['error']}", endpoint='/api/github/proposals/stream')
+            yield server_sent_event('error', {'error': state['error']})
+            return
+        
+        progress = state['progress']
+        yield server_sent_event('summary', {
+            'repo_name': repo_name,
+            'job_id': job.id,
+            'proposals': count,
+            'by_category': by_category,
+            'files': progress.get('files', 0),
+            'scanned': progress.get('scanned', 0),
+            'findings': progress.get('findings', 0),
+            'duration': round(time.time() - started, 3)
+        })
+        add_log('success', f'Streamed {count} proposals for {repo_name}', endpoint='/api/github/proposals/stream')
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/github/diff-analysis', methods=['GET'])
+def analyze_github_diff():
+    """Analyze only the added lines of a pull request (?pr=) or commit range (?range=base..head)"""
+    target = request.args.get('pr') or request.args.get('range')
+    add_log('info', f'GitHub diff analysis requested for {target}', endpoint='/api/github/diff-analysis')
+    if not target:
+        return jsonify({
+            'success': False,
+            'error': 'Pass a pull request number (?pr=) or a commit range (?range=base..head)'
+        }), 400
+    
+    try:
+        if not all([os.environ.get('GITHUB_APP_ID'), os.environ.get('GITHUB_APP_PRIVATE_KEY_PATH')]):
+            add_log('error', 'GitHub App not properly configured', endpoint='/api/github/diff-analysis')
+            return jsonify({
+                'success': False,
+                'error': 'GitHub App not configured. Please set GITHUB_APP_ID and GITHUB_APP_PRIVATE_KEY_PATH.'
+            }), 500
+        
+        findings = GitHubIntegrationSimple().analyze_diff(target)
+        if findings is None:
+            return jsonify({
+                'success': False,
+                'error': f'Could not get the changes for {target}'
+            }), 502
         
         return jsonify({
             'success': True,
-            'data': proposals_data
+            'data': {
+                'target': target,
+                'findings': findings
+            }
         }), 200
         
     except Exception as e:
@@ -1134,6 +1300,46 @@ def get_issue_proposals():
             'error': str(e)
         }), 500
 
+@app.route('/api/github/analysis', methods=['POST'])
+def start_repository_analysis():
+    """Queue a repository analysis and return its job"""
+    add_log('info', 'GitHub analysis requested', endpoint='/api/github/analysis')
+    try:
+        if not all([os.environ.get('GITHUB_APP_ID'), os.environ.get('GITHUB_APP_PRIVATE_KEY_PATH')]):
+            add_log('error', 'GitHub App not properly configured', endpoint='/api/github/analysis')
+            return jsonify({
+                'success': False,
+                'error': 'GitHub App not configured. Please set GITHUB_APP_ID and GITHUB_APP_PRIVATE_KEY_PATH.'
+            }), 500
+        
+        job = submit_proposal_analysis(GitHubIntegrationSimple())
+        
+        return jsonify({
+            'success': True,
+            'data': job.to_dict()
+        }), 202
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/github/analysis/<job_id>', methods=['GET'])
+def get_repository_analysis(job_id):
+    """Get the status and progress of an analysis job"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Analysis job not found'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'data': job.to_dict()
+    }), 200
+
 @app.route('/api/github/proposals/<proposal_id>/approve', methods=['POST'])
 def approve_issue_proposal(proposal_id):
     """Approve an issue proposal and create GitHub issue"""
@@ -1156,23 +1362,25 @@ def approve_issue_proposal(proposal_id):
                 'error': 'GitHub App not configured. Please set GITHUB_APP_ID and GITHUB_APP_PRIVATE_KEY_PATH.'
             }), 500
         
-        proposals = github_integration.analyze_repository()
-        
-        # Find the proposal
-        proposal = None
-        for p in proposals:
-            if p.id == proposal_id:
-                proposal = p
-                break
+        db = get_db()
+        proposal_data = get_proposal(db, proposal_id)
         
-        if not proposal:
+        if not proposal_data:
             add_log('warning', f'Proposal not found: {proposal_id}', endpoint=f'/api/github/proposals/{proposal_id}/approve')
             return jsonify({
                 'success': False,
                 'error': 'Proposal not found'
             }), 404
         
-        add_log('info', f'Found proposal: {proposal.title}', endpoint=f'/api/github/proposals/{proposal_id}/approve')
+        add_log('info', f'Found proposal: {proposal_data["title"]}', endpoint=f'/api/github/proposals/{proposal_id}/approve')
+        
+        if proposal_data['status'] == 'published':
+            return jsonify({
+                'success': False,
+                'error': f'Proposal already published as issue #{proposal_data["github_issue_number"]}'
+            }), 409
+        
+        proposal = IssueProposal(**{key: value for key, value in proposal_data.items() if key != 'repo_name'})
         
         # Create GitHub issue
         issue_number = github_integration.create_github_issue(proposal)
@@ -1180,6 +1388,7 @@ def approve_issue_proposal(proposal_id):
         if issue_number:
             proposal.status = 'published'
             proposal.github_issue_number = issue_number
+            update_status(db, proposal_id, 'published', issue_number)
             
             add_log('success', f'GitHub issue created successfully: #{issue_number}', endpoint=f'/api/github/proposals/{proposal_id}/approve')
             
@@ -1214,43 +1423,23 @@ def approve_issue_proposal(proposal_id):
 def reject_issue_proposal(proposal_id):
     """Reject an issue proposal"""
     try:
-        # Use GitHub App integration
-        app_id = os.environ.get('GITHUB_APP_ID')
-        private_key_path = os.environ.get('GITHUB_APP_PRIVATE_KEY_PATH')
-        
-        if all([app_id, private_key_path]):
-            github_integration = GitHubIntegrationSimple()
-        else:
-            return jsonify({
-                'success': False,
-                'error': 'GitHub App not configured. Please set GITHUB_APP_ID and GITHUB_APP_PRIVATE_KEY_PATH.'
-            }), 500
-        
-        proposals = github_integration.analyze_repository()
-        
-        # Find the proposal
-        proposal = None
-        for p in proposals:
-            if p.id == proposal_id:
-                proposal = p
-                break
-        
-        if not proposal:
+        db = get_db()
+        if not update_status(db, proposal_id, 'rejected'):
             return jsonify({
                 'success': False,
                 'error': 'Proposal not found'
             }), 404
         
-        proposal.status = 'rejected'
+        proposal = get_proposal(db, proposal_id)
         
         return jsonify({
             'success': True,
             'data': {
                 'message': 'Proposal rejected successfully',
                 'proposal': {
-                    'id': proposal.id,
-                    'title': proposal.title,
-                    'status': proposal.status
+                    'id': proposal['id'],
+                    'title': proposal['title'],
+                    'status': proposal['status']
                 }
             }
         }), 200
@@ -1290,5 +1479,92 @@ def get_github_stats():
             'error': str(e)
         }), 500
 
+@app.route('/api/github/metrics', methods=['GET'])
+def get_github_metrics():
+    """Get GitHub API client metrics"""
+    return jsonify({
+        'success': True,
+        'data': {
+            'connections': get_transport().connection_stats(),
+            'http_cache': get_transport().cache.stats(),
+            'rate_limits': get_transport().scheduler.stats(),
+            'blob_cache': get_blob_cache().stats()
+        }
+    }), 200
+
+@app.route('/api/github/rules', methods=['GET'])
+def get_github_rules():
+    """Get the loaded rule packs"""
+    registry = get_rule_packs()
+    registry.current()
+    return jsonify({
+        'success': True,
+        'data': registry.stats()
+    }), 200
+
+@app.route('/api/github/rules/reload', methods=['POST'])
+def reload_github_rules():
+    """Validate the rule packs on disk and swap them in"""
+    registry = get_rule_packs()
+    if registry.reload() is None:
+        add_log('error', 'Rule pack reload failed; keeping the current rules', endpoint='/api/github/rules/reload')
+        return jsonify({
+            'success': False,
+            'error': 'Rule packs are invalid; the current rules were kept. See the server log for details.'
+        }), 422
+    
+    add_log('success', f"Rule packs reloaded ({registry.stats()['digest'][:12]})", endpoint='/api/github/rules/reload')
+    return jsonify({
+        'success': True,
+        'data': registry.stats()
+    }), 200
+
+@app.route('/api/github/rules/profile', methods=['GET', 'DELETE'])
+def github_rule_profile():
+    """Get or reset per-rule execution statistics"""
+    profiler = get_rule_profiler()
+    if request.method == 'DELETE':
+        profiler.reset()
+        add_log('info', 'Rule profiler reset', endpoint='/api/github/rules/profile')
+        return jsonify({'success': True}), 200
+    
+    return jsonify({
+        'success': True,
+        'data': profiler.stats()
+    }), 200
+
+@app.route('/api/code/search', methods=['GET'])
+def search_code():
+    """Search the last analyzed snapshot (?q=, &regex=true, &case=false, &limit=, &repo=)"""
+    query = request.args.get('q', '')
+    if not query:
+        return jsonify({
+            'success': False,
+            'error': 'Pass a search query (?q=)'
+        }), 400
+    
+    repo_name = request.args.get('repo') or os.environ.get('GITHUB_REPO', 'NiloticNetwork/NiloticNetworkBlockchain')
+    try:
+        limit = max(1, min(int(request.args.get('limit', 50)), 500))
+    except ValueError:
+        limit = 50
+    
+    result = get_code_search().search(
+        repo_name, query,
+        regex=request.args.get('regex', 'false').lower() == 'true',
+        case_sensitive=request.args.get('case', 'true').lower() != 'false',
+        limit=limit
+    )
+    if result is None:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid or too complex regular expression: {query}'
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'data': result
+    }), 200
+
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=5070)
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - AST Cache
+=============================
+
+Structural rules for C/C++ that line regexes cannot express, such as a
+push_back on a local std::vector inside a loop with no reserve() before
+it. Files are parsed with tree-sitter and the trees are kept in an LRU
+cache keyed by git blob SHA. When a path's new blob replaces one that is
+still cached, the old tree is edited and reparsed incrementally, so a push
+that touches a few lines of a file costs little more than those lines.
+Every rule's tree-sitter queries are compiled once per process. Findings are
+stored in the analysis store per (blob SHA, structural rules version), so
+a later analysis only parses blobs it has never seen.
+
+tree-sitter is optional: without the tree_sitter and tree_sitter_cpp
+packages the structural rules are disabled and the regex rules still run.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from analysis_store import get_analysis_store, ruleset_version
+from line_index import LineIndex
+
+try:
+    import tree_sitter_cpp
+    from tree_sitter import Language, Parser, Query
+    try:
+        from tree_sitter import QueryCursor
+    except ImportError:
+        # Before 0.25 queries ran matches() themselves
+        QueryCursor = None
+    CPP_LANGUAGE = Language(tree_sitter_cpp.language())
+except ImportError:
+    CPP_LANGUAGE = None
+
+# Bumped when the shape of structural findings changes
+AST_FORMAT = 'tree-sitter/1'
+
+LOOPS = ('for_statement', 'for_range_loop', 'while_statement', 'do_statement')
+FUNCTIONS = ('function_definition', 'lambda_expression')
+
+MEMBER_CALLS = '''
+(call_expression
+  function: (field_expression
+    argument: (identifier) @object
+    field: (field_identifier) @method)) @call
+'''
+
+LOCAL_DECLARATIONS = '''
+(declaration type: (_) @type declarator: (identifier) @name) @declaration
+(declaration type: (_) @type declarator: (init_declarator declarator: (identifier) @name)) @declaration
+'''
+
+
+def ast_available() -> bool:
+    return CPP_LANGUAGE is not None
+
+
+def _grammar_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version('tree-sitter-cpp')
+    except Exception:
+        return 'unknown'
+
+
+def _point(source: bytes, offset: int) -> Tuple[int, int]:
+    """(row, byte column) of a byte offset, as tree-sitter counts them"""
+    row = source.count(b'\n', 0, offset)
+    return row, offset - (source.rfind(b'\n', 0, offset) + 1)
+
+
+def text_edit(old: bytes, new: bytes) -> Tuple[int, int, int]:
+    """(start, old end, new end) of the one byte range that changed between two versions"""
+    start = 0
+    limit = min(len(old), len(new))
+    while start < limit and old[start] == new[start]:
+        start += 1
+    old_end, new_end = len(old), len(new)
+    while old_end > start and new_end > start and old[old_end - 1] == new[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+    return start, old_end, new_end
+
+
+def _matches(query, node) -> List[Dict[str, List]]:
+    """Captures of every match of a compiled query, as {name: [nodes]}"""
+    matches = QueryCursor(query).matches(node) if QueryCursor is not None else query.matches(node)
+    return [
+        {name: nodes if isinstance(nodes, list) else [nodes] for name, nodes in captures.items()}
+        for _, captures in matches
+    ]
+
+
+def _text(node, source: bytes) -> str:
+    return source[node.start_byte:node.end_byte].decode('utf-8', errors='replace')
+
+
+def _contains(outer, inner) -> bool:
+    return outer.start_byte <= inner.start_byte and inner.end_byte <= outer.end_byte
+
+
+def _enclosing(node, types: Tuple[str, ...]):
+    node = node.parent
+    while node is not None and node.type not in types:
+        node = node.parent
+    return node
+
+
+def _push_back_in_loop(root, source: bytes, queries: Dict) -> List:
+    """push_back/emplace_back on a local vector inside a loop, with no reserve() before the loop"""
+    calls = _matches(queries['calls'], root)
+    declarations = _matches(queries['declarations'], root)
+
+    found = []
+    reported = set()
+    for match in calls:
+        call, method = match['call'][0], _text(match['method'][0], source)
+        if method not in ('push_back', 'emplace_back'):
+            continue
+        name = _text(match['object'][0], source)
+        function = _enclosing(call, FUNCTIONS)
+        if function is None:
+            continue
+
+        # The vector must be declared in this function, before and outside the loop
+        declared = [
+            d['declaration'][0] for d in declarations
+            if _text(d['name'][0], source) == name and 'vector' in _text(d['type'][0], source)
+            and _contains(function, d['declaration'][0]) and d['declaration'][0].start_byte < call.start_byte
+        ]
+        if not declared:
+            continue
+        declaration = declared[-1]
+
+        loop = None
+        node = _enclosing(call, LOOPS + FUNCTIONS)
+        while node is not None and node.type in LOOPS:
+            if not _contains(node, declaration):
+                loop = node
+            node = _enclosing(node, LOOPS + FUNCTIONS)
+        if loop is None or (name, loop.start_byte) in reported:
+            continue
+
+        reserved = any(
+            _text(other['object'][0], source) == name and _text(other['method'][0], source) == 'reserve'
+            and declaration.start_byte < other['call'][0].start_byte < loop.start_byte
+            for other in calls
+        )
+        if not reserved:
+            reported.add((name, loop.start_byte))
+            found.append(call)
+    return found
+
+
+@dataclass
+class StructuralRule:
+    id: str
+    title: str
+    description: str
+    severity: str  # 'low', 'medium', 'high', 'critical'
+    category: str
+    queries: Dict[str, str]
+    find: Callable[..., List]
+    labels: List[str] = field(default_factory=list)
+    # Regex rule whose findings this rule replaces while tree-sitter is available
+    replaces: Optional[str] = None
+
+    def describe(self) -> Dict:
+        return {
+            'id': self.id, 'title': self.title, 'description': self.description, 'severity': self.severity,
+            'category': self.category, 'labels': self.labels, 'queries': self.queries,
+            'find': self.find.__name__, 'replaces': self.replaces
+        }
+
+
+STRUCTURAL_RULES = [
+    StructuralRule(
+        id='vector-push-back-in-loop',
+        title='Vector grows inside a loop without reserve()',
+        description='A local std::vector is appended to inside a loop without reserving capacity first. '
+                    'Call reserve() before the loop to avoid repeated reallocations.',
+        severity='medium',
+        category='performance',
+        queries={'calls': MEMBER_CALLS, 'declarations': LOCAL_DECLARATIONS},
+        find=_push_back_in_loop,
+        labels=['performance', 'enhancement'],
+        replaces='vector-push-back'
+    )
+]
+
+
+class ASTCache:
+    """LRU cache of tree-sitter trees by blob SHA, with incremental reparse per path"""
+
+    def __init__(self, max_trees: int = None):
+        self.max_trees = max_trees or int(os.environ.get('GITHUB_AST_CACHE_TREES', 256))
+        self._trees = OrderedDict()
+        self._paths = {}
+        self._parser = Parser(CPP_LANGUAGE) if ast_available() else None
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'parsed': 0, 'reparsed': 0, 'evictions': 0}
+
+    def parse(self, source: bytes, blob_sha: str, path: str = None):
+        """Tree of a blob, reusing the cached tree of the path's previous blob"""
+        if self._parser is None:
+            return None
+
+        with self._lock:
+            cached = self._trees.get(blob_sha)
+            if cached is not None:
+                self._trees.move_to_end(blob_sha)
+                self._counters['hits'] += 1
+                if path:
+                    self._paths[path] = blob_sha
+                return cached[0]
+
+            previous = self._trees.get(self._paths.get(path)) if path else None
+            if previous is not None:
+                old_tree, old_source = previous
+                start, old_end, new_end = text_edit(old_source, source)
+                # Edit a copy, so the old blob's tree stays valid in the cache
+                if hasattr(old_tree, 'copy'):
+                    edited = old_tree.copy()
+                else:
+                    edited = old_tree
+                    del self._trees[self._paths[path]]
+                edited.edit(
+                    start_byte=start, old_end_byte=old_end, new_end_byte=new_end,
+                    start_point=_point(old_source, start),
+                    old_end_point=_point(old_source, old_end),
+                    new_end_point=_point(source, new_end)
+                )
+                tree = self._parser.parse(source, edited)
+                self._counters['reparsed'] += 1
+            else:
+                tree = self._parser.parse(source)
+                self._counters['parsed'] += 1
+
+            self._trees[blob_sha] = (tree, source)
+            if path:
+                self._paths[path] = blob_sha
+            while len(self._trees) > self.max_trees:
+                self._trees.popitem(last=False)
+                self._counters['evictions'] += 1
+            return tree
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._counters, trees=len(self._trees), max_trees=self.max_trees)
+
+
+class StructuralAnalyzer:
+    """Runs structural rules over cached tree-sitter trees"""
+
+    def __init__(self, rules: Iterable[StructuralRule] = None, cache: ASTCache = None):
+        self.rules = list(rules if rules is not None else STRUCTURAL_RULES)
+        self.rules_by_id = {rule.id: rule for rule in self.rules}
+        self.cache = cache or ASTCache()
+        self.version = ruleset_version(
+            [{'engine': AST_FORMAT, 'grammar': _grammar_version()}] + [rule.describe() for rule in self.rules]
+        )
+        self._queries = {}
+        self._lock = threading.Lock()
+        self._warned = False
+
+    @property
+    def available(self) -> bool:
+        return ast_available()
+
+    @property
+    def replaced_rules(self) -> List[str]:
+        """Regex rules to ignore because a structural rule covers them"""
+        if not self.available:
+            return []
+        return [rule.replaces for rule in self.rules if rule.replaces]
+
+    def _compiled(self, rule: StructuralRule) -> Dict:
+        # Query compilation is the expensive part of a rule; do it once per process
+        with self._lock:
+            compiled = self._queries.get(rule.id)
+            if compiled is None:
+                compiled = self._queries[rule.id] = {
+                    name: Query(CPP_LANGUAGE, source) for name, source in rule.queries.items()
+                }
+            return compiled
+
+    def scan(self, content: str, blob_sha: str, path: str = None) -> List[Dict]:
+        """Every structural rule hit as {'rule_id', 'offset', 'line', 'column'}, ordered by offset"""
+        if not self.available:
+            return []
+        source = content.encode('utf-8')
+        tree = self.cache.parse(source, blob_sha, path)
+        if tree is None:
+            return []
+
+        hits = []
+        for rule in self.rules:
+            for node in rule.find(tree.root_node, source, self._compiled(rule)):
+                # tree-sitter counts bytes; findings count characters
+                hits.append((len(source[:node.start_byte].decode('utf-8', errors='replace')), rule.id))
+        hits.sort()
+
+        line_index = LineIndex(content) if hits else None
+        findings = []
+        for offset, rule_id in hits:
+            line, column = line_index.position(offset)
+            findings.append({'rule_id': rule_id, 'offset': offset, 'line': line, 'column': column})
+        return findings
+
+    def analyze_snapshot(self, snapshot, extensions: Tuple[str, ...], store=None) -> Dict[str, List[Dict]]:
+        """Structural findings per path, parsing only blobs with no stored findings"""
+        if not self.available:
+            if not self._warned:
+                print("⚠️  tree-sitter is not installed; structural rules are disabled")
+                self._warned = True
+            return {}
+
+        store = store or get_analysis_store()
+        files = {path: blob_sha for path, blob_sha in snapshot.blob_shas().items() if path.endswith(extensions)}
+        stored = store.get_findings(set(files.values()), self.version)
+
+        scanned = {}
+        for path, blob_sha in sorted(files.items()):
+            if blob_sha in stored or blob_sha in scanned:
+                continue
+            content = snapshot.read_text(path)
+            scanned[blob_sha] = self.scan(content, blob_sha, path) if content is not None else []
+        if scanned:
+            store.save_findings(scanned, self.version)
+        stored.update(scanned)
+
+        print(f"🔍 Structural analysis: {len(files)} files, {len(scanned)} parsed, "
+              f"{len(files) - len(scanned)} from stored findings")
+        return {path: stored[blob_sha] for path, blob_sha in files.items() if stored.get(blob_sha)}
+
+
+_structural_analyzer = None
+_structural_analyzer_lock = threading.Lock()
+
+
+def get_structural_analyzer() -> StructuralAnalyzer:
+    """Return the process-wide structural analyzer"""
+    global _structural_analyzer
+    with _structural_analyzer_lock:
+        if _structural_analyzer is None:
+            _structural_analyzer = StructuralAnalyzer()
+        return _structural_analyzer
@@ -2,10 +2,18 @@
 
 import os
 import uuid
+import functools
+import argparse
 import sqlite3
 import requests
 from github import Github
 from datetime import datetime
+from blob_cache import get_blob_cache
+from line_index import LineIndex
+from tree_filter import get_tree_filter
+from analysis_executor import get_analysis_executor
+from diff_analysis import analyze_patch
+from symbol_index import get_symbol_index
 
 # Basic configuration
 DB_PATH = os.path.join(os.path.dirname(__file__), 'db.sqlite')
@@ -34,17 +42,46 @@ def fetch_repo():
         print(f"Error fetching repo: {str(e)}")
         return None
 
-def get_file_content(repo, path):
-    """Get the content of a file from the repository"""
+def get_tree_entries(repo):
+    """Path, blob SHA and size of every file at the default branch head"""
+    try:
+        tree = repo.get_git_tree(repo.default_branch, recursive=True)
+        return [
+            {'path': element.path, 'sha': element.sha, 'size': element.size}
+            for element in tree.tree if element.type == 'blob'
+        ]
+    except Exception as e:
+        print(f"Error getting repository tree: {str(e)}")
+        return []
+
+def get_file_content(repo, path, blob_sha=None):
+    """Get the content of a file from the repository
+
+    When the file's blob SHA is known, the local blob cache is checked first
+    and the file is only downloaded if that blob has not been seen before.
+    Bytes that are not valid UTF-8 are replaced rather than failing the file.
+    """
+    blob_cache = get_blob_cache()
+    if blob_sha:
+        cached = blob_cache.get(blob_sha)
+        if cached is not None:
+            return cached.decode('utf-8', errors='replace')
+
     try:
         content = repo.get_contents(path)
-        return content.decoded_content.decode('utf-8')
+        blob_cache.put(content.decoded_content, content.sha)
+        # Decoded like the cached copy, so a non-UTF-8 file reads the same on every run
+        return content.decoded_content.decode('utf-8', errors='replace')
     except Exception as e:
         print(f"Error getting file content for {path}: {str(e)}")
         return None
 
-def analyze_code(file_content, file_path):
-    """Analyze code for issues and potential fixes"""
+def analyze_code(file_content, file_path, symbols=None):
+    """Analyze code for issues and potential fixes
+
+    symbols is the repository's SymbolTable, for checks that depend on
+    what other files declare or define.
+    """
     issues = []
 
     # Example: Look for the supply calculation bug in main.cpp
@@ -61,8 +98,9 @@ def analyze_code(file_content, file_path):
             'suggested_fix': 'Replace with: totalSupply = blockchain.getCurrentSupply();'
         })
 
-        # For this example, we'll also need to suggest adding the getCurrentSupply method
-        if 'blockchain.cpp' in file_path and 'double getCurrentSupply() const' not in file_content:
+        # The fix calls getCurrentSupply(), which has to exist in the Blockchain class
+        if symbols is not None and not symbols.is_defined('getCurrentSupply', kind='function'):
+            blockchain = symbols.locations('Blockchain', kind='class', role='definition')
             issue_id = str(uuid.uuid4())
             issues.append({
                 'id': issue_id,
@@ -70,8 +108,8 @@ def analyze_code(file_content, file_path):
                 'description': 'Need to implement a method to track and return the current supply of SLW tokens',
                 'severity': 'medium',
                 'status': 'open',
-                'file_path': file_path,
-                'line_number': 0,  # Would need to find the appropriate line in a real implementation
+                'file_path': blockchain[0]['path'] if blockchain else file_path,
+                'line_number': blockchain[0]['line'] if blockchain else 0,
                 'suggested_fix': '''
 // Add to the Blockchain class in blockchain.h:
 double getCurrentSupply() const;
@@ -92,13 +130,20 @@ double Blockchain::getCurrentSupply() const {
 
     return issues
 
-def find_line_number(content, search_string):
-    """Find the line number of a string in the content"""
-    lines = content.split('\n')
-    for i, line in enumerate(lines):
-        if search_string in line:
-            return i + 1
-    return 0
+def analyze_file(item, symbols=None):
+    """analyze_code for a (content, file_path) pair, as run by the analysis executor"""
+    file_content, file_path = item
+    return analyze_code(file_content, file_path, symbols)
+
+def find_line_number(content, search_string, line_index=None):
+    """Find the line number of a string in the content
+
+    Pass a LineIndex built once for the file when looking up several strings.
+    """
+    offset = content.find(search_string)
+    if offset == -1:
+        return 0
+    return (line_index or LineIndex(content)).line_of(offset)
 
 def save_issues(issues):
     """Save identified issues to the database"""
@@ -215,7 +260,43 @@ Fixed by: Atim AI Assistant
         print(f"Error creating PR: {str(e)}")
         return None
 
-def main():
+def get_changed_files(repo, target):
+    """Changed files with their patches for a PR number or a 'base..head' range"""
+    try:
+        if str(target).isdigit():
+            files = repo.get_pull(int(target)).get_files()
+        else:
+            base, _, head = str(target).partition('..')
+            files = repo.compare(base, head.lstrip('.')).files
+        return [{'filename': f.filename, 'status': f.status, 'patch': f.patch} for f in files]
+    except Exception as e:
+        print(f"Error getting changes for {target}: {str(e)}")
+        return []
+
+def analyze_changes(repo, target):
+    """Analyze only the added lines of a pull request or commit range
+
+    Issues get the line in the new file and their position in the diff.
+    Cross-file checks use the symbols of the last indexed commit.
+    """
+    symbols = get_symbol_index().table(REPO_NAME)
+    issues = []
+    for entry in get_changed_files(repo, target):
+        file_path = entry['filename']
+        if not entry['patch'] or entry['status'] == 'removed' or not get_tree_filter().accepts(file_path):
+            continue
+
+        def scan(text):
+            return [dict(issue, line=issue['line_number']) for issue in analyze_code(text, file_path, symbols)
+                    if issue['line_number'] > 0 and issue['file_path'] == file_path]
+
+        for finding in analyze_patch(entry['patch'], scan):
+            finding['line_number'] = finding.pop('line')
+            finding['diff_position'] = finding.pop('position')
+            issues.append(finding)
+    return issues
+
+def main(diff_target=None):
     """Main function to run Atim's core code analysis"""
     print("Starting Atim - Nilotic Network AI Assistant")
 
@@ -225,23 +306,45 @@ def main():
         print("Failed to fetch repository.")
         return
 
+    if diff_target:
+        print(f"Analyzing changes {diff_target} in {REPO_NAME}")
+        issues = analyze_changes(repo, diff_target)
+        for issue in issues:
+            print(f"{issue['file_path']}:{issue['line_number']} (diff position {issue['diff_position']}): {issue['title']}")
+        save_issues(issues)
+        print(f"Saved {len(issues)} issues to database")
+        return
+
     print(f"Analyzing repository: {REPO_NAME}")
 
-    # Analyze important files
-    target_files = [
-        'src/main.cpp',
-        'src/blockchain.cpp',
-        'src/blockchain.h'
-    ]
+    # One tree request lists every file with its blob SHA and size; vendored,
+    # oversized and binary files are dropped before anything is downloaded
+    entries, skipped = get_tree_filter().filter_entries(get_tree_entries(repo))
+    if skipped:
+        print(f"Skipping files: {skipped}")
+
+    # Symbols of every file, so rules can ask what other files declare or
+    # define; only blobs never indexed before are read
+    blob_shas = {entry['path']: entry['sha'] for entry in entries}
+    get_symbol_index().update(REPO_NAME, None, blob_shas, lambda path: get_file_content(repo, path, blob_shas[path]))
+    symbols = get_symbol_index().table(REPO_NAME)
+
+    def contents():
+        for entry in entries:
+            content = get_file_content(repo, entry['path'], entry['sha'])
+            if content:
+                yield entry['path'], (content, entry['path'])
+
+    # Files are downloaded here and analyzed in worker processes as they arrive
+    results = get_analysis_executor().map(functools.partial(analyze_file, symbols=symbols), contents())
+    if results is None:
+        print("Analysis cancelled.")
+        return
 
     all_issues = []
-    for file_path in target_files:
-        print(f"Analyzing {file_path}...")
-        content = get_file_content(repo, file_path)
-        if content:
-            issues = analyze_code(content, file_path)
-            all_issues.extend(issues)
-            print(f"Found {len(issues)} issues in {file_path}")
+    for file_path, issues in results.items():
+        all_issues.extend(issues)
+        print(f"Found {len(issues)} issues in {file_path}")
 
     # Save issues to database
     save_issues(all_issues)
@@ -258,4 +361,7 @@ def main():
                     break  # Only create one PR for this example
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Atim - Nilotic Network AI Assistant")
+    parser.add_argument('--diff', metavar='PR_OR_RANGE',
+                        help="analyze only the added lines of a pull request number or base..head range")
+    main(parser.parse_args().diff)
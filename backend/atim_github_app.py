@@ -9,15 +9,12 @@ and installation access tokens. This is the modern, secure approach for bots.
 """
 
 import os
-import jwt
-import time
-import json
-import requests
 from datetime import datetime
 from typing import Dict, List, Optional
-from github import Github, GithubException
-from github.Auth import AppAuth
+from github import Auth, Github, GithubException
 from dotenv import load_dotenv
+from github_token_manager import get_token_manager
+from github_stats import get_stats_provider
 
 class AtimGitHubApp:
     """Atim's GitHub App implementation with proper authentication"""
@@ -49,14 +46,11 @@ class AtimGitHubApp:
             return
             
         try:
-            # Generate JWT for app authentication
-            jwt_token = self._generate_jwt()
+            # Installation tokens come from the process-wide token manager
+            access_token = self._get_installation_token()
             
-            # Get installation access token
-            access_token = self._get_installation_token(jwt_token)
-            
-            # Initialize GitHub client with app authentication
-            self.github = Github(auth=AppAuth(self.app_id, access_token))
+            # Initialize GitHub client with the installation token
+            self.github = Github(auth=Auth.Token(access_token))
             
             # Test repository access
             self.repo = self.github.get_repo(self.repo_name)
@@ -68,39 +62,12 @@ class AtimGitHubApp:
             self.github = None
             self.repo = None
     
-    def _generate_jwt(self) -> str:
-        """Generate JWT for GitHub App authentication"""
-        try:
-            with open(self.private_key_path, 'r') as f:
-                private_key = f.read()
-            
-            payload = {
-                'iat': int(time.time()),
-                'exp': int(time.time()) + 600,  # 10 minutes
-                'iss': int(self.app_id)
-            }
-            
-            return jwt.encode(payload, private_key, algorithm='RS256')
-            
-        except Exception as e:
-            raise Exception(f"Failed to generate JWT: {e}")
-    
-    def _get_installation_token(self, jwt_token: str) -> str:
-        """Get installation access token"""
-        headers = {
-            'Authorization': f'Bearer {jwt_token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        
-        response = requests.post(
-            f'https://api.github.com/app/installations/{self.installation_id}/access_tokens',
-            headers=headers
-        )
-        
-        if response.status_code == 201:
-            return response.json()['token']
-        else:
-            raise Exception(f"Failed to get installation token: {response.text}")
+    def _get_installation_token(self) -> str:
+        """Get a cached installation access token"""
+        access_token = get_token_manager().get_installation_token(self.repo_name)
+        if not access_token:
+            raise Exception("Failed to get installation token")
+        return access_token
     
     def create_issue(self, title: str, description: str, labels: List[str] = None, 
                     severity: str = "medium", category: str = "enhancement") -> Optional[int]:
@@ -196,13 +163,27 @@ This pull request was automatically generated by Atim AI Assistant based on code
                 'forks': 0
             }
         
+        # One GraphQL round trip; falls back to PyGithub if the query fails
+        stats = get_stats_provider().get_stats(self.repo_name, get_token_manager().get_installation_headers(self.repo_name))
+        if stats:
+            return {
+                'name': stats['repository'],
+                'app_status': 'online',
+                'app_name': self.app_name,
+                'open_issues': stats['open_issues'],
+                'open_pulls': stats['open_pulls'],
+                'stars': stats['stars'],
+                'forks': stats['forks'],
+                'language': stats['language'] or 'C++'
+            }
+        
         try:
             return {
                 'name': self.repo.full_name,
                 'app_status': 'online',
                 'app_name': self.app_name,
                 'open_issues': self.repo.open_issues_count,
-                'open_pulls': len(list(self.repo.get_pulls(state='open'))),
+                'open_pulls': self.repo.get_pulls(state='open').totalCount,
                 'stars': self.repo.stargazers_count,
                 'forks': self.repo.forks_count,
                 'language': self.repo.language or 'C++'
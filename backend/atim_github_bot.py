@@ -15,6 +15,7 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from github import Github, GithubException
 from dotenv import load_dotenv
+from github_stats import get_stats_provider
 
 class AtimGitHubBot:
     """Atim's dedicated GitHub bot for autonomous operations"""
@@ -151,13 +152,27 @@ This pull request was automatically generated by Atim AI Assistant based on code
                 'forks': 0
             }
         
+        # One GraphQL round trip; falls back to PyGithub if the query fails
+        stats = get_stats_provider().get_stats(self.repo_name, {'Authorization': f'token {self.github_token}'})
+        if stats:
+            return {
+                'name': stats['repository'],
+                'bot_status': 'online',
+                'bot_username': self.github.get_user().login,
+                'open_issues': stats['open_issues'],
+                'open_pulls': stats['open_pulls'],
+                'stars': stats['stars'],
+                'forks': stats['forks'],
+                'language': stats['language'] or 'C++'
+            }
+        
         try:
             return {
                 'name': self.repo.full_name,
                 'bot_status': 'online',
                 'bot_username': self.github.get_user().login,
                 'open_issues': self.repo.open_issues_count,
-                'open_pulls': len(list(self.repo.get_pulls(state='open'))),
+                'open_pulls': self.repo.get_pulls(state='open').totalCount,
                 'stars': self.repo.stargazers_count,
                 'forks': self.repo.forks_count,
                 'language': self.repo.language or 'C++'
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Blob Cache
+==============================
+
+Content-addressed on-disk cache of repository files keyed by git blob SHA.
+A blob's SHA changes whenever its content does, so a cached entry never
+goes stale: after a push only the blobs the tree lists under new SHAs have
+to be downloaded. Entries are optionally zlib-compressed and the cache is
+kept under a size limit by evicting the least recently used blobs.
+"""
+
+import os
+import zlib
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+def git_blob_sha(content: bytes) -> str:
+    """SHA-1 of a blob as git computes it ('blob <size>\\0<content>')"""
+    header = f"blob {len(content)}\0".encode('utf-8')
+    return hashlib.sha1(header + content).hexdigest()
+
+
+class BlobCache:
+    """Size-bounded LRU cache of git blobs on disk"""
+
+    def __init__(self, directory: str = None, max_bytes: int = None, compress: bool = None):
+        self.directory = directory or os.environ.get(
+            'GITHUB_BLOB_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'atim-blob-cache')
+        )
+        self.max_bytes = max_bytes or int(os.environ.get('GITHUB_BLOB_CACHE_BYTES', 256 * 1024 * 1024))
+        self.compress = compress if compress is not None else (
+            os.environ.get('GITHUB_BLOB_CACHE_COMPRESS', 'true').lower() == 'true'
+        )
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._counters = {'hits': 0, 'misses': 0, 'stored': 0, 'evictions': 0}
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+
+    def __contains__(self, sha: str) -> bool:
+        with self._lock:
+            return sha in self._entries
+
+    def get(self, sha: str) -> Optional[bytes]:
+        """Return a blob's content, or None if it is not cached"""
+        with self._lock:
+            if sha not in self._entries:
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(sha)
+
+        try:
+            with open(self._path(sha), 'rb') as f:
+                data = f.read()
+            os.utime(self._path(sha))
+            content = zlib.decompress(data[1:]) if data[:1] == b'z' else data[1:]
+        except (OSError, zlib.error) as e:
+            print(f"⚠️  Dropping unreadable blob {sha}: {e}")
+            self._forget(sha)
+            with self._lock:
+                self._counters['misses'] += 1
+            return None
+
+        with self._lock:
+            self._counters['hits'] += 1
+        return content
+
+    def put(self, content: bytes, sha: str = None) -> str:
+        """Store a blob and return its SHA"""
+        sha = sha or git_blob_sha(content)
+        if sha in self:
+            return sha
+
+        # One marker byte records whether the entry is compressed
+        data = b'r' + content
+        if self.compress:
+            compressed = zlib.compress(content, 6)
+            if len(compressed) < len(content):
+                data = b'z' + compressed
+
+        if len(data) > self.max_bytes:
+            return sha
+
+        path = self._path(sha)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            if sha not in self._entries:
+                self._entries[sha] = len(data)
+                self._bytes += len(data)
+                self._counters['stored'] += 1
+            evicted = self._evict()
+
+        for evicted_sha in evicted:
+            try:
+                os.remove(self._path(evicted_sha))
+            except OSError:
+                pass
+
+        return sha
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+            size = self._bytes
+
+        lookups = counters['hits'] + counters['misses']
+        return {
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'compressed': self.compress,
+            'hits': counters['hits'],
+            'misses': counters['misses'],
+            'stored': counters['stored'],
+            'evictions': counters['evictions'],
+            'hit_rate': round(counters['hits'] / lookups, 3) if lookups else 0.0
+        }
+
+    def _path(self, sha: str) -> str:
+        return os.path.join(self.directory, sha[:2], sha)
+
+    def _load_index(self):
+        """Rebuild the LRU order from the files left by earlier processes"""
+        found = []
+        for prefix in os.listdir(self.directory):
+            prefix_dir = os.path.join(self.directory, prefix)
+            if len(prefix) != 2 or not os.path.isdir(prefix_dir):
+                continue
+            for name in os.listdir(prefix_dir):
+                if name.endswith('.tmp'):
+                    continue
+                stat = os.stat(os.path.join(prefix_dir, name))
+                found.append((stat.st_mtime, name, stat.st_size))
+
+        for _, sha, size in sorted(found):
+            self._entries[sha] = size
+            self._bytes += size
+
+    def _evict(self):
+        evicted = []
+        while self._entries and self._bytes > self.max_bytes:
+            sha, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._counters['evictions'] += 1
+            evicted.append(sha)
+        return evicted
+
+    def _forget(self, sha: str):
+        with self._lock:
+            size = self._entries.pop(sha, None)
+            if size is not None:
+                self._bytes -= size
+
+
+_blob_cache = None
+_blob_cache_lock = threading.Lock()
+
+
+def get_blob_cache() -> BlobCache:
+    """Return the process-wide blob cache"""
+    global _blob_cache
+    with _blob_cache_lock:
+        if _blob_cache is None:
+            _blob_cache = BlobCache()
+        return _blob_cache
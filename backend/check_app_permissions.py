@@ -3,8 +3,8 @@
 import os
 import time
 import jwt
-import requests
 from dotenv import load_dotenv
+from github_transport import get_transport
 
 def check_app_permissions():
     """Check GitHub App permissions and installation"""
@@ -24,6 +24,8 @@ def check_app_permissions():
     print(f"📋 Installation ID: {installation_id}")
     print(f"📋 Repository: {repo_name}")
     
+    transport = get_transport()
+    
     # Generate JWT
     try:
         with open(private_key_path, 'r') as f:
@@ -44,7 +46,7 @@ def check_app_permissions():
         
         # Check app information
         print(f"\n🔍 Checking App Information:")
-        response = requests.get('https://api.github.com/app', headers=headers)
+        response = transport.get('https://api.github.com/app', headers=headers)
         
         if response.status_code == 200:
             app_data = response.json()
@@ -58,7 +60,7 @@ def check_app_permissions():
         # Check installation
         if installation_id:
             print(f"\n🔍 Checking Installation:")
-            response = requests.get(
+            response = transport.get(
                 f'https://api.github.com/app/installations/{installation_id}',
                 headers=headers
             )
@@ -72,7 +74,7 @@ def check_app_permissions():
                 
                 # Get installation access token
                 print(f"\n🔑 Getting Installation Access Token:")
-                token_response = requests.post(
+                token_response = transport.post(
                     f'https://api.github.com/app/installations/{installation_id}/access_tokens',
                     headers=headers
                 )
@@ -91,7 +93,7 @@ def check_app_permissions():
                     print(f"\n🔍 Testing Repository Access with Installation Token:")
                     
                     # Test repository access
-                    repo_response = requests.get(
+                    repo_response = transport.get(
                         f'https://api.github.com/repos/{repo_name}',
                         headers=install_headers
                     )
@@ -106,7 +108,7 @@ def check_app_permissions():
                             "labels": ["test", "automation"]
                         }
                         
-                        issue_response = requests.post(
+                        issue_response = transport.post(
                             f'https://api.github.com/repos/{repo_name}/issues',
                             headers=install_headers,
                             json=test_data
@@ -119,7 +121,7 @@ def check_app_permissions():
                             print(f"✅ Issue created successfully: #{issue_data['number']}")
                             
                             # Clean up
-                            close_response = requests.patch(
+                            close_response = transport.patch(
                                 f'https://api.github.com/repos/{repo_name}/issues/{issue_data["number"]}',
                                 headers=install_headers,
                                 json={"state": "closed"}
@@ -147,6 +149,10 @@ def check_app_permissions():
             
     except Exception as e:
         print(f"❌ Error: {e}")
+    
+    print(f"\n🔌 Connection Reuse:")
+    for host, stats in transport.connection_stats().items():
+        print(f"   {host}: {stats['requests']} requests, {stats['new_connections']} new connections")
 
 if __name__ == "__main__":
     check_app_permissions()
@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Code Search
+===============================
+
+Trigram index over analyzed snapshots for instant literal and regex
+search. Every blob's set of lowercased trigrams is computed once and
+stored in SQLite by blob SHA, and each repository keeps an in-memory
+inverted index from trigram to the files containing it. An update only
+reads blobs it has never indexed and only touches the postings of
+changed or removed paths. A query is planned into the trigrams any match
+must contain (an OR of ANDs for alternations); intersecting those
+postings leaves a few candidate files, and only those are read from the
+blob cache and matched with the real regex. Queries with no usable
+literal fall back to checking every file.
+
+Search is open to any caller, so user regexes are guarded: patterns that
+are too long, use backreferences or nest unbounded quantifiers are refused,
+and the remaining ones are matched in a child process that is killed when
+the time budget runs out. The matches found until then are returned with a
+timed_out flag. Worker processes are kept between searches and only
+replaced after one is killed.
+"""
+
+import os
+import re
+import json
+import time
+import zlib
+import sqlite3
+import itertools
+import threading
+import multiprocessing
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from blob_cache import BlobCache, get_blob_cache
+from line_index import LineIndex
+
+DB_PATH = os.path.join(os.path.dirname(__file__), 'db.sqlite')
+
+# Bumped when trigram extraction changes, so every blob is indexed again
+INDEX_VERSION = 'trigrams/1'
+
+# SQLite limits the number of bound parameters per statement
+QUERY_CHUNK_SIZE = 500
+
+# Longest line excerpt returned with a match
+MAX_EXCERPT = 200
+
+# Longest regex search() accepts
+MAX_PATTERN_LENGTH = 256
+
+REGEX_METACHARACTERS = set('.^$*+?{}[]|()')
+
+# Escapes longer than two characters: hex, unicode, named and octal/backreference
+ESCAPE = re.compile(r'\\(?:x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|N\{[^}]*\}|[0-7]{1,3}|[1-9][0-9]?)')
+
+
+def trigrams(text: str) -> Set[str]:
+    """Distinct lowercased three-character substrings of a text"""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _split_alternation(pattern: str) -> List[str]:
+    """Top-level branches of a regex, or [pattern] when there is no '|'"""
+    branches = []
+    depth = 0
+    start = 0
+    i = 0
+    in_class = False
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            i += 2
+            continue
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+            # A ']' right after '[' or '[^' is a literal member
+            if pattern[i + 1:i + 2] == '^':
+                i += 1
+            if pattern[i + 1:i + 2] == ']':
+                i += 1
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            branches.append(pattern[start:i])
+            start = i + 1
+        i += 1
+    branches.append(pattern[start:])
+    return branches
+
+
+def _skip_group(pattern: str, i: int) -> int:
+    """Index just past the ')' closing the group that opens at pattern[i]"""
+    depth = 0
+    in_class = False
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            i += 2
+            continue
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def required_literals(branch: str) -> List[str]:
+    """Literal runs every match of a regex branch without '|' must contain
+
+    Conservative: classes, groups, wildcards and optional characters end a
+    run, so the result may miss literals but never requires a wrong one.
+    """
+    runs = []
+    run = []
+    i = 0
+    while i < len(branch):
+        char = branch[i]
+        step = 1
+        literal = None
+        if char == '\\':
+            escape = ESCAPE.match(branch, i)
+            step = escape.end() - i if escape else 2
+            nxt = branch[i + 1:i + 2]
+            if nxt and not nxt.isalnum():
+                literal = nxt
+        elif char == '[':
+            step = _skip_class(branch, i) - i
+        elif char == '(':
+            step = _skip_group(branch, i) - i
+        elif char not in REGEX_METACHARACTERS:
+            literal = char
+
+        # A quantifier applies to the character or group before it
+        quantifier = branch[i + step:i + step + 1]
+        optional = quantifier in ('*', '?') or (quantifier == '{' and re.match(r'\{0*[,}]', branch[i + step:]))
+
+        if literal is not None and not optional:
+            run.append(literal)
+        if literal is None or quantifier in ('*', '?', '+', '{'):
+            # The run cannot continue past a non-literal or a repetition
+            if run:
+                runs.append(''.join(run))
+            run = []
+        i += step
+        if quantifier in ('*', '?', '+'):
+            i += 1
+            if branch[i:i + 1] in ('?', '+'):
+                i += 1
+        elif quantifier == '{':
+            closing = branch.find('}', i)
+            i = closing + 1 if closing != -1 else len(branch)
+    if run:
+        runs.append(''.join(run))
+    return runs
+
+
+def _skip_class(pattern: str, i: int) -> int:
+    """Index just past the ']' closing the character class at pattern[i]"""
+    i += 1
+    if pattern[i:i + 1] == '^':
+        i += 1
+    if pattern[i:i + 1] == ']':
+        i += 1
+    while i < len(pattern):
+        if pattern[i] == '\\':
+            i += 2
+            continue
+        if pattern[i] == ']':
+            return i + 1
+        i += 1
+    return i
+
+
+def plan_query(pattern: str) -> Optional[List[Set[str]]]:
+    """Trigram sets a match must contain, one per alternative, or None to scan everything"""
+    flags = re.match(r'\(\?[aiLmsux]+\)', pattern)
+    if flags:
+        # Verbose mode changes what counts as a literal; other flags do not
+        if 'x' in flags.group(0):
+            return None
+        pattern = pattern[flags.end():]
+
+    plan = []
+    for branch in _split_alternation(pattern):
+        required = set()
+        for literal in required_literals(branch):
+            required |= trigrams(literal)
+        if not required:
+            return None
+        plan.append(required)
+    return plan
+
+
+def _has_quantifier(pattern: str) -> bool:
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '[':
+            i = _skip_class(pattern, i)
+            continue
+        if char in '*+' or (char == '{' and re.match(r'\{\d*,?\d*\}', pattern[i:])):
+            return True
+        i += 1
+    return False
+
+
+def pattern_problem(pattern: str) -> Optional[str]:
+    """Why a user regex is refused before it runs, or None when it may run
+
+    Nested unbounded quantifiers such as (a+)+ and backreferences are what
+    make Python regexes take exponential time.
+    """
+    if len(pattern) > MAX_PATTERN_LENGTH:
+        return f"patterns are limited to {MAX_PATTERN_LENGTH} characters"
+    if re.search(r'\\[1-9]|\(\?P=', pattern):
+        return "backreferences are not supported"
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '[':
+            i = _skip_class(pattern, i)
+            continue
+        if char == '(':
+            end = _skip_group(pattern, i)
+            repeated = pattern[end:end + 1] in ('*', '+') or re.match(r'\{\d*,\}', pattern[end:])
+            if repeated and _has_quantifier(pattern[i + 1:end - 1]):
+                return "nested repetition such as (a+)+ is not supported"
+        i += 1
+    return None
+
+
+def search_timeout() -> float:
+    """Seconds one search may spend matching; 0 disables the budget"""
+    return float(os.environ.get('GITHUB_CODE_SEARCH_TIMEOUT', 2.0))
+
+
+def search_workers() -> int:
+    """Regex worker processes kept alive between searches (GITHUB_CODE_SEARCH_WORKERS)"""
+    return max(1, int(os.environ.get('GITHUB_CODE_SEARCH_WORKERS', 2)))
+
+
+def _match_worker(connection):
+    # Runs in a child process, so a runaway match can be killed; re caches
+    # the compiled patterns of recent queries
+    while True:
+        item = connection.recv()
+        if item is None:
+            return
+        pattern, flags, text, limit = item
+        compiled = re.compile(pattern, flags)
+        connection.send([match.start() for match in itertools.islice(compiled.finditer(text), limit)])
+
+
+class RegexWorker:
+    """Child process that matches regexes and is killed when one runs too long"""
+
+    def __init__(self):
+        methods = multiprocessing.get_all_start_methods()
+        # The fork server forks from a clean process, not from a busy web worker
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        self._connection, child = context.Pipe()
+        self._process = context.Process(target=_match_worker, args=(child,), daemon=True)
+        self._process.start()
+        child.close()
+
+    @property
+    def alive(self) -> bool:
+        return self._process.is_alive()
+
+    def find(self, pattern: str, flags: int, text: str, limit: int, deadline: float) -> Optional[List[int]]:
+        """Offsets of up to limit matches, or None if the deadline passed first
+
+        A worker that returned None is still matching and must be closed.
+        """
+        self._connection.send((pattern, flags, text, limit))
+        if not self._connection.poll(max(deadline - time.perf_counter(), 0)):
+            return None
+        return self._connection.recv()
+
+    def close(self):
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process.join(1)
+        self._connection.close()
+
+
+class RegexWorkerPool:
+    """Idle regex workers shared by searches, so a query does not start a process
+
+    A search checks a worker out for its duration. Workers that overran
+    their deadline are killed instead of returned, and a fresh one is
+    started on the next checkout.
+    """
+
+    def __init__(self, size: int = None):
+        self.size = size or search_workers()
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> RegexWorker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive:
+                    return worker
+                worker.close()
+        return RegexWorker()
+
+    def release(self, worker: RegexWorker, healthy: bool = True):
+        """Keep a worker for the next search, or close it if it timed out or failed"""
+        if healthy and worker.alive:
+            with self._lock:
+                if len(self._idle) < self.size:
+                    self._idle.append(worker)
+                    return
+        worker.close()
+
+
+class RepositorySearchIndex:
+    """In-memory trigram postings of one repository"""
+
+    def __init__(self):
+        self.files = {}
+        self.postings = {}
+
+    def add(self, path: str, blob_sha: str, grams: Iterable[str]):
+        self.files[path] = blob_sha
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(path)
+
+    def remove(self, path: str, grams: Iterable[str]):
+        self.files.pop(path, None)
+        for gram in grams:
+            paths = self.postings.get(gram)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self.postings[gram]
+
+    def candidates(self, plan: Optional[List[Set[str]]]) -> List[str]:
+        """Paths that contain every trigram of at least one alternative"""
+        if plan is None:
+            return sorted(self.files)
+
+        matched = set()
+        for required in plan:
+            postings = sorted((self.postings.get(gram, set()) for gram in required), key=len)
+            paths = set(postings[0])
+            for other in postings[1:]:
+                if not paths:
+                    break
+                paths &= other
+            matched |= paths
+        return sorted(matched)
+
+
+class CodeSearch:
+    """Trigram search over the last indexed snapshot of each repository"""
+
+    def __init__(self, db_path: str = None, blob_cache: BlobCache = None):
+        self.db_path = db_path or DB_PATH
+        self.blob_cache = blob_cache
+        self._indexes = {}
+        self._lock = threading.Lock()
+        self._create_tables()
+
+    def _cache(self) -> BlobCache:
+        return self.blob_cache or get_blob_cache()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _create_tables(self):
+        conn = self._connect()
+        try:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS blob_trigrams (
+                blob_sha TEXT NOT NULL,
+                index_version TEXT NOT NULL,
+                trigrams BLOB NOT NULL,
+                PRIMARY KEY (blob_sha, index_version)
+            )
+            ''')
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS search_index_runs (
+                repo_name TEXT PRIMARY KEY,
+                index_version TEXT NOT NULL,
+                commit_sha TEXT NOT NULL,
+                files TEXT NOT NULL,
+                indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _blob_trigrams(self, conn: sqlite3.Connection, blob_shas: Iterable[str]) -> Dict[str, List[str]]:
+        blob_shas = sorted(set(blob_shas))
+        found = {}
+        for start in range(0, len(blob_shas), QUERY_CHUNK_SIZE):
+            chunk = blob_shas[start:start + QUERY_CHUNK_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f'SELECT blob_sha, trigrams FROM blob_trigrams '
+                f'WHERE index_version = ? AND blob_sha IN ({placeholders})',
+                [INDEX_VERSION] + chunk
+            ).fetchall()
+            for row in rows:
+                found[row['blob_sha']] = json.loads(zlib.decompress(row['trigrams']).decode('utf-8'))
+        return found
+
+    def _load(self, conn: sqlite3.Connection, repo_name: str) -> RepositorySearchIndex:
+        """The repository's postings, rebuilt from SQLite after a restart"""
+        index = self._indexes.get(repo_name)
+        if index is not None:
+            return index
+
+        index = self._indexes[repo_name] = RepositorySearchIndex()
+        run = conn.execute(
+            'SELECT index_version, files FROM search_index_runs WHERE repo_name = ?', (repo_name,)
+        ).fetchone()
+        if run is not None and run['index_version'] == INDEX_VERSION:
+            files = json.loads(run['files'])
+            grams = self._blob_trigrams(conn, files.values())
+            for path, blob_sha in files.items():
+                if blob_sha in grams:
+                    index.add(path, blob_sha, grams[blob_sha])
+        return index
+
+    def update(self, repo_name: str, commit_sha: str, files: Dict[str, str],
+               read: Callable[[str], Optional[bytes]]) -> Dict:
+        """Bring a repository's index to the given {path: blob SHA} map
+
+        read(path) returns a file's bytes and is only called for blobs that
+        were never indexed or are missing from the blob cache.
+        """
+        cache = self._cache()
+        with self._lock:
+            conn = self._connect()
+            try:
+                index = self._load(conn, repo_name)
+                changed = sorted(path for path, blob_sha in files.items() if index.files.get(path) != blob_sha)
+                removed = sorted(path for path in index.files if path not in files)
+
+                old = self._blob_trigrams(conn, (index.files[path] for path in changed + removed if path in index.files))
+                for path in changed + removed:
+                    if path in index.files:
+                        index.remove(path, old.get(index.files[path], ()))
+
+                known = self._blob_trigrams(conn, (files[path] for path in changed))
+                indexed = {}
+                for path in changed:
+                    blob_sha = files[path]
+                    if (blob_sha in known or blob_sha in indexed) and blob_sha in cache:
+                        continue
+                    content = read(path)
+                    if content is None:
+                        continue
+                    if blob_sha not in cache:
+                        # Matches are verified against the blob cache
+                        cache.put(content, blob_sha)
+                    if blob_sha not in known:
+                        indexed[blob_sha] = sorted(trigrams(content.decode('utf-8', errors='replace')))
+                known.update(indexed)
+
+                for path in changed:
+                    if files[path] in known:
+                        index.add(path, files[path], known[files[path]])
+
+                conn.executemany(
+                    'INSERT OR REPLACE INTO blob_trigrams (blob_sha, index_version, trigrams) VALUES (?, ?, ?)',
+                    [
+                        (blob_sha, INDEX_VERSION, zlib.compress(json.dumps(grams).encode('utf-8')))
+                        for blob_sha, grams in indexed.items()
+                    ]
+                )
+                conn.execute(
+                    'INSERT OR REPLACE INTO search_index_runs (repo_name, index_version, commit_sha, files) '
+                    'VALUES (?, ?, ?, ?)',
+                    (repo_name, INDEX_VERSION, commit_sha or '', json.dumps(index.files, sort_keys=True))
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+        summary = {'files': len(files), 'changed': len(changed), 'removed': len(removed), 'indexed': len(indexed)}
+        print(f"🔍 Search index of {repo_name}: {summary['changed']} files updated, "
+              f"{summary['removed']} removed, {summary['indexed']} blobs indexed")
+        return summary
+
+    def update_snapshot(self, repo_name: str, snapshot) -> Dict:
+        """Index every file of a RepositorySnapshot"""
+        return self.update(repo_name, snapshot.sha, snapshot.blob_shas(), snapshot.read)
+
+    def search(self, repo_name: str, query: str, regex: bool = False, case_sensitive: bool = True,
+               limit: int = 50) -> Optional[Dict]:
+        """Matches of a literal or regex query as {'path', 'line', 'column', 'text'}
+
+        Returns None when the regex does not compile or is refused by
+        pattern_problem(). Matching stops at the search time budget, and
+        the result then has timed_out set.
+        """
+        started = time.perf_counter()
+        pattern = query if regex else re.escape(query)
+        flags = 0 if case_sensitive else re.IGNORECASE
+        try:
+            compiled = re.compile(pattern, flags)
+        except re.error as e:
+            print(f"❌ Invalid search pattern {query!r}: {e}")
+            return None
+        problem = pattern_problem(pattern) if regex else None
+        if problem:
+            print(f"❌ Refused search pattern {query!r}: {problem}")
+            return None
+
+        plan = plan_query(pattern)
+        with self._lock:
+            conn = self._connect()
+            try:
+                index = self._load(conn, repo_name)
+            finally:
+                conn.close()
+            candidates = index.candidates(plan)
+            files = dict(index.files)
+
+        cache = self._cache()
+        results = []
+        unverified = 0
+        truncated = False
+        timed_out = False
+        budget = search_timeout()
+        deadline = started + budget if budget > 0 else None
+        # Escaped literals cannot backtrack; user regexes run where they can be killed
+        workers = get_regex_workers() if regex and deadline is not None else None
+        worker = workers.acquire() if workers is not None else None
+        # Set while the worker may still be matching, so it is killed instead of reused
+        busy = False
+        try:
+            for path in candidates:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    timed_out = True
+                    break
+                content = cache.get(files[path])
+                if content is None:
+                    unverified += 1
+                    continue
+                text = content.decode('utf-8', errors='replace')
+                wanted = limit - len(results) + 1
+                if worker is not None:
+                    busy = True
+                    offsets = worker.find(pattern, flags, text, wanted, deadline)
+                    busy = offsets is None
+                    if offsets is None:
+                        timed_out = True
+                        break
+                else:
+                    offsets = [match.start() for match in itertools.islice(compiled.finditer(text), wanted)]
+
+                line_index = LineIndex(text) if offsets else None
+                for offset in offsets:
+                    if len(results) >= limit:
+                        truncated = True
+                        break
+                    line, column = line_index.position(offset)
+                    start = line_index.line_start(line)
+                    end = text.find('\n', start)
+                    results.append({
+                        'path': path,
+                        'line': line,
+                        'column': column,
+                        'text': text[start:end if end != -1 else len(text)][:MAX_EXCERPT]
+                    })
+                if truncated:
+                    break
+        finally:
+            if worker is not None:
+                workers.release(worker, healthy=not busy)
+        if timed_out:
+            print(f"⚠️  Search for {query!r} stopped after its {budget}s budget")
+
+        return {
+            'query': query,
+            'regex': regex,
+            'results': results,
+            'truncated': truncated,
+            'timed_out': timed_out,
+            'files': len(files),
+            'candidates': len(candidates),
+            'unverified': unverified,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+
+
+_code_search = None
+_code_search_lock = threading.Lock()
+
+
+def get_code_search() -> CodeSearch:
+    """Return the process-wide code search index"""
+    global _code_search
+    with _code_search_lock:
+        if _code_search is None:
+            _code_search = CodeSearch()
+        return _code_search
+
+
+_regex_workers = None
+_regex_workers_lock = threading.Lock()
+
+
+def get_regex_workers() -> RegexWorkerPool:
+    """Return the process-wide pool of regex worker processes"""
+    global _regex_workers
+    with _regex_workers_lock:
+        if _regex_workers is None:
+            _regex_workers = RegexWorkerPool()
+        return _regex_workers
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - C++ Lexer
+=============================
+
+One streaming pass over a C/C++ file that tells code apart from comments
+and literals. lex() yields every token as (kind, start, end) spans of the
+original text. code_view() runs before rule matching: it blanks comments
+and string and character literals with spaces but keeps newlines, so a
+rule such as `strcpy\\s*\\(` no longer fires inside `// never use strcpy()`
+or a log message. Offsets, lines and columns of the hits stay the same as
+in the original file. code_view() is built from lex() tokens, so what
+rules see always agrees with the tokenizer. Preprocessor directives stay
+visible to rules, including the header name of an #include.
+"""
+
+import re
+from typing import Iterator, List, Tuple
+
+COMMENT = r'//(?:\\\n|[^\n])*|/\*.*?(?:\*/|\Z)'
+
+# Raw strings first: their body may hold quotes and backslashes
+STRING = (
+    r'(?:u8|[uUL])?R"(?P<delimiter>[^()\\\s]{0,16})\(.*?\)(?P=delimiter)"'
+    r'|(?:u8|[uUL])?"(?:\\.|[^"\\\n])*"'
+)
+CHARACTER = r"(?:u8|[uUL])?'(?:\\.|[^'\\\n])+'"
+
+# Digit separators (1'000'000) must not start a character literal
+NUMBER = r"\.?\d(?:[eEpP][+-]|[\w.']|'(?=\w))*"
+
+INCLUDE = r'\#[ \t]*include[ \t]*(?:<[^>\n]*>|"[^"\n]*")'
+
+TOKEN = re.compile(rf'''
+    (?P<space>\s+)
+  | (?P<comment>{COMMENT})
+  | (?P<include>{INCLUDE})
+  | (?P<directive>\#(?:\\\n|/(?![/*])|[^\n/])*)
+  | (?P<string>{STRING})
+  | (?P<character>{CHARACTER})
+  | (?P<number>{NUMBER})
+  | (?P<identifier>[A-Za-z_]\w*)
+  | (?P<operator>::|->\*?|\+\+|--|<<=?|>>=?|[-+*/%&|^<>=!]=|&&|\|\||\.\.\.|\.\*|\S)
+''', re.VERBOSE | re.DOTALL)
+
+MASKED_KINDS = ('comment', 'string', 'character')
+
+
+def lex(content: str) -> Iterator[Tuple[str, int, int]]:
+    """Every token of a file as (kind, start, end), whitespace included"""
+    for match in TOKEN.finditer(content):
+        yield match.lastgroup, match.start(), match.end()
+
+
+def masked_spans(content: str, offset: int = 0) -> List[Tuple[int, int]]:
+    """(start, end) of every comment and string or character literal
+
+    Directives are lexed again past their '#', so a literal in a #define
+    or #error body is masked too. #include header names are not.
+    """
+    spans = []
+    for kind, start, end in lex(content):
+        if kind in MASKED_KINDS:
+            spans.append((offset + start, offset + end))
+        elif kind == 'directive':
+            spans.extend(masked_spans(content[start + 1:end], offset + start + 1))
+    return spans
+
+
+def code_view(content: str) -> str:
+    """The file with comments and literals replaced by spaces, newlines kept"""
+    pieces = []
+    position = 0
+    for start, end in masked_spans(content):
+        pieces.append(content[position:start])
+        masked = content[start:end]
+        if '\n' in masked:
+            pieces.append(re.sub(r'[^\n]', ' ', masked))
+        else:
+            pieces.append(' ' * len(masked))
+        position = end
+    if not pieces:
+        return content
+    pieces.append(content[position:])
+    return ''.join(pieces)
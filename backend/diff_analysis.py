@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Diff Analysis
+=================================
+
+Reviews a change instead of a repository. The per-file patches of a pull
+request or a base...head comparison are fetched (GitHub returns only the
+changed hunks), rules run on the added lines plus a few lines of context
+around them, and each finding is mapped back to its line in the new file
+and its position in the diff, the value GitHub expects for review
+comments. The cost grows with the size of the diff, not of the repository.
+"""
+
+import os
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Union
+from cpp_lexer import MASKED_KINDS, lex
+from github_scheduler import PRIORITY_INTERACTIVE
+from github_transport import GitHubTransport, get_transport
+from line_index import LineIndex
+from rule_profiler import get_rule_profiler
+from tree_filter import TreeFilter
+
+HUNK_HEADER = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@')
+
+# Files per page of the pull request files endpoint
+FILES_PAGE_SIZE = 100
+
+
+def parse_patch(patch: str) -> List[List[Dict]]:
+    """Split one file's patch into hunks of new-side lines
+
+    Each line is {'kind': '+' or ' ', 'line': new file line number,
+    'position': diff position, 'text': content}. Removed lines are dropped
+    but still advance the diff position, as do hunk headers after the first.
+    """
+    hunks = []
+    position = 0
+    line = 0
+
+    for raw in patch.split('\n'):
+        header = HUNK_HEADER.match(raw)
+        if header:
+            if hunks:
+                position += 1
+            line = int(header.group(1))
+            hunks.append([])
+            continue
+        if not hunks or not raw or raw.startswith('\\'):
+            # Text before the first hunk, a trailing newline, or "\ No newline at end of file"
+            continue
+
+        position += 1
+        kind = raw[:1]
+        if kind == '-':
+            continue
+        if kind in ('+', ' '):
+            hunks[-1].append({'kind': kind, 'line': line, 'position': position, 'text': raw[1:]})
+            line += 1
+
+    return hunks
+
+
+def _masked_line_starts(hunk: List[Dict]) -> Dict[int, int]:
+    """{line: first line} for hunk lines inside a comment or literal that began on an earlier line"""
+    text = '\n'.join(entry['text'] for entry in hunk) + '\n'
+    line_index = LineIndex(text)
+    starts = {}
+    for kind, start, end in lex(text):
+        if kind not in MASKED_KINDS:
+            continue
+        first, last = line_index.line_of(start) - 1, line_index.line_of(max(start, end - 1)) - 1
+        for i in range(first + 1, last + 1):
+            starts[i] = first
+    return starts
+
+
+def analyze_patch(patch: str, scan: Callable[[str], List[Dict]], context: int = None) -> List[Dict]:
+    """Rule findings on the added lines of one file's patch
+
+    Every run of added lines is scanned together with up to `context` lines
+    around it, so patterns spanning a few lines still match; only findings
+    that start on an added line are reported. A window that would start
+    inside a block comment or raw string is extended back to where it
+    opens, so the text in it is not mistaken for code. Findings gain 'line'
+    (new file) and 'position' (diff).
+    """
+    context = context if context is not None else int(os.environ.get('GITHUB_DIFF_CONTEXT', 3))
+    findings = []
+
+    for hunk in parse_patch(patch):
+        added = [i for i, entry in enumerate(hunk) if entry['kind'] == '+']
+        if not added:
+            continue
+
+        # Merge added lines whose context windows touch into one window
+        masked_starts = _masked_line_starts(hunk)
+        windows = []
+        for i in added:
+            start, end = max(0, i - context), min(len(hunk), i + context + 1)
+            start = masked_starts.get(start, start)
+            if windows and start <= windows[-1][1]:
+                windows[-1][0] = min(windows[-1][0], start)
+                windows[-1][1] = end
+            else:
+                windows.append([start, end])
+
+        for start, end in windows:
+            lines = hunk[start:end]
+            text = '\n'.join(entry['text'] for entry in lines) + '\n'
+            for finding in scan(text):
+                entry = lines[finding['line'] - 1]
+                if entry['kind'] != '+':
+                    continue
+                findings.append(dict(finding, line=entry['line'], position=entry['position']))
+
+    return findings
+
+
+def analyze_files(files: Iterable[Dict], scan: Callable[[str], List[Dict]], context: int = None,
+                  tree_filter: TreeFilter = None) -> Dict[str, List[Dict]]:
+    """Findings per path for GitHub file entries ({'filename', 'status', 'patch'})"""
+    results = {}
+    for entry in files:
+        path = entry.get('filename')
+        patch = entry.get('patch')
+        if not path or not patch or entry.get('status') == 'removed':
+            # Binary or very large files come without a patch
+            continue
+        if tree_filter and not tree_filter.accepts(path):
+            continue
+        with get_rule_profiler().file(path):
+            results[path] = analyze_patch(patch, scan, context)
+    return results
+
+
+def fetch_diff_files(repo_name: str, target: Union[int, str], headers: Dict[str, str],
+                     budget_key: str = None, transport: GitHubTransport = None) -> Optional[List[Dict]]:
+    """Changed files with their patches for a pull request number or a 'base..head' range"""
+    transport = transport or get_transport()
+
+    try:
+        if isinstance(target, int) or str(target).isdigit():
+            files = []
+            page = 1
+            while True:
+                response = transport.get(
+                    f"/repos/{repo_name}/pulls/{int(target)}/files",
+                    params={'per_page': FILES_PAGE_SIZE, 'page': page},
+                    headers=headers,
+                    use_cache=True,
+                    priority=PRIORITY_INTERACTIVE,
+                    budget_key=budget_key
+                )
+                if response.status_code != 200:
+                    print(f"❌ Failed to get files of pull request #{target}: {response.status_code}")
+                    return None
+                batch = response.json()
+                files.extend(batch)
+                if len(batch) < FILES_PAGE_SIZE:
+                    return files
+                page += 1
+
+        base, _, head = str(target).partition('..')
+        if not base or not head:
+            print(f"❌ Diff target must be a pull request number or base..head, got {target!r}")
+            return None
+
+        response = transport.get(
+            f"/repos/{repo_name}/compare/{base}...{head.lstrip('.')}",
+            headers=headers,
+            use_cache=True,
+            priority=PRIORITY_INTERACTIVE,
+            budget_key=budget_key
+        )
+        if response.status_code != 200:
+            print(f"❌ Failed to compare {base}..{head}: {response.status_code}")
+            return None
+        return response.json().get('files', [])
+
+    except Exception as e:
+        print(f"❌ Error getting diff for {target}: {e}")
+        return None
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Duplicate Code Index
+========================================
+
+Finds copy-pasted C/C++ blocks across a repository without comparing files
+pairwise. Each blob is tokenized with identifiers, numbers and literals
+normalized, so renamed copies still match. A rolling hash over every run of
+KGRAM tokens is winnowed down to one fingerprint per WINDOW positions,
+which guarantees that any shared run of at least KGRAM + WINDOW - 1 tokens
+leaves a common fingerprint. Fingerprints are stored per (blob SHA,
+fingerprint version), and every repository keeps a table of them at the
+last indexed commit, so an update only fingerprints new blobs. Detection
+joins that table on the hash, which costs time linear in the size of the
+repository, and merges matching fingerprints along the same token offset
+into duplicated regions.
+"""
+
+import os
+import json
+import zlib
+import sqlite3
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+from cpp_lexer import lex
+from line_index import LineIndex
+
+DB_PATH = os.path.join(os.path.dirname(__file__), 'db.sqlite')
+
+# Tokens per hashed k-gram and k-grams per winnowing window
+KGRAM = 10
+WINDOW = 8
+
+# Bumped when tokenizing or fingerprinting changes, so every blob is fingerprinted again
+FINGERPRINT_VERSION = f'winnow/2/k{KGRAM}/w{WINDOW}'
+
+# SQLite limits the number of bound parameters per statement
+QUERY_CHUNK_SIZE = 500
+
+# Fingerprints found in more places than this are boilerplate, not copies
+MAX_OCCURRENCES = 12
+
+# Rolling hash modulus (a Mersenne prime) and base
+MODULUS = (1 << 61) - 1
+BASE = 1000003
+
+KEYWORDS = {
+    'alignas', 'alignof', 'auto', 'bool', 'break', 'case', 'catch', 'char', 'class', 'const',
+    'constexpr', 'const_cast', 'continue', 'decltype', 'default', 'delete', 'do', 'double',
+    'dynamic_cast', 'else', 'enum', 'explicit', 'extern', 'false', 'float', 'for', 'friend', 'goto',
+    'if', 'inline', 'int', 'long', 'mutable', 'namespace', 'new', 'noexcept', 'nullptr', 'operator',
+    'private', 'protected', 'public', 'reinterpret_cast', 'return', 'short', 'signed', 'sizeof',
+    'static', 'static_assert', 'static_cast', 'struct', 'switch', 'template', 'this', 'throw', 'true',
+    'try', 'typedef', 'typename', 'union', 'unsigned', 'using', 'virtual', 'void', 'volatile', 'while'
+}
+
+def tokenize(content: str) -> List[Tuple[str, int]]:
+    """Normalized (token, line) pairs, without comments or preprocessor lines
+
+    Identifiers become 'I', numbers 'N' and literals 'S', so a copy whose
+    names were changed still produces the same tokens.
+    """
+    lines = LineIndex(content)
+    tokens = []
+    for kind, start, end in lex(content):
+        if kind in ('space', 'comment', 'include', 'directive'):
+            continue
+        text = content[start:end]
+        if kind == 'identifier':
+            text = text if text in KEYWORDS else 'I'
+        elif kind == 'number':
+            text = 'N'
+        elif kind in ('string', 'character'):
+            text = 'S'
+        tokens.append((text, lines.line_of(start)))
+    return tokens
+
+
+def _token_hash(token: str) -> int:
+    # Stable across processes, unlike hash()
+    return zlib.crc32(token.encode('utf-8')) + 1
+
+
+def kgram_hashes(tokens: List[str], k: int = KGRAM) -> List[int]:
+    """Rolling hash of every run of k consecutive tokens"""
+    if len(tokens) < k:
+        return []
+    values = [_token_hash(token) for token in tokens]
+    leading = pow(BASE, k - 1, MODULUS)
+    current = 0
+    for value in values[:k]:
+        current = (current * BASE + value) % MODULUS
+    hashes = [current]
+    for i in range(k, len(values)):
+        current = ((current - values[i - k] * leading) * BASE + values[i]) % MODULUS
+        hashes.append(current)
+    return hashes
+
+
+def winnow(hashes: List[int], window: int = WINDOW) -> List[int]:
+    """Positions of the rightmost minimal hash of every window, each recorded once"""
+    if not hashes:
+        return []
+    if len(hashes) < window:
+        lowest = min(hashes)
+        return [max(i for i, value in enumerate(hashes) if value == lowest)]
+
+    selected = []
+    candidates = deque()
+    for i, value in enumerate(hashes):
+        # Keep positions with strictly increasing hashes; ties go to the rightmost
+        while candidates and hashes[candidates[-1]] >= value:
+            candidates.pop()
+        candidates.append(i)
+        if candidates[0] <= i - window:
+            candidates.popleft()
+        if i >= window - 1 and (not selected or selected[-1] != candidates[0]):
+            selected.append(candidates[0])
+    return selected
+
+
+def fingerprint(content: str) -> List[List[int]]:
+    """Winnowed fingerprints of a file as [hash, token position, start line, end line]"""
+    tokens = tokenize(content)
+    hashes = kgram_hashes([token for token, _ in tokens])
+    return [
+        [hashes[position], position, tokens[position][1], tokens[position + KGRAM - 1][1]]
+        for position in winnow(hashes)
+    ]
+
+
+def duplicate_regions(occurrences: Dict[int, List[Tuple[str, int, int, int]]],
+                      min_tokens: int) -> List[Dict]:
+    """Merge fingerprints shared by two places into duplicated regions
+
+    occurrences maps a hash to its (path, position, start line, end line)
+    places. Matches of one pair of files at the same token offset belong to
+    one copy as long as they are no further apart than the winnowing window
+    guarantees.
+    """
+    diagonals = {}
+    for places in occurrences.values():
+        if len(places) > MAX_OCCURRENCES:
+            continue
+        places = sorted(places)
+        for i, first in enumerate(places):
+            for second in places[i + 1:]:
+                key = (first[0], second[0], second[1] - first[1])
+                diagonals.setdefault(key, []).append((first, second))
+
+    regions = []
+    for (first_path, second_path, offset), matches in diagonals.items():
+        matches.sort()
+        run = [matches[0]]
+        for match in matches[1:] + [None]:
+            if match is not None and match[0][1] - run[-1][0][1] <= KGRAM + WINDOW:
+                run.append(match)
+                continue
+            tokens = run[-1][0][1] + KGRAM - run[0][0][1]
+            # A region overlapping its own copy is repetitive code, not a copy
+            if tokens >= min_tokens and (first_path != second_path or offset >= tokens):
+                regions.append({
+                    'tokens': tokens,
+                    'first': {'path': first_path, 'start_line': run[0][0][2], 'end_line': run[-1][0][3]},
+                    'second': {'path': second_path, 'start_line': run[0][1][2], 'end_line': run[-1][1][3]}
+                })
+            run = [match]
+    regions.sort(key=lambda region: (-region['tokens'], region['first']['path'], region['first']['start_line']))
+    return regions
+
+
+class DuplicateIndex:
+    """SQLite-backed winnowing fingerprints per blob and per repository"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or DB_PATH
+        self._lock = threading.Lock()
+        self._create_tables()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _create_tables(self):
+        conn = self._connect()
+        try:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS blob_fingerprints (
+                blob_sha TEXT NOT NULL,
+                fingerprint_version TEXT NOT NULL,
+                fingerprints BLOB NOT NULL,
+                PRIMARY KEY (blob_sha, fingerprint_version)
+            )
+            ''')
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS repo_fingerprints (
+                repo_name TEXT NOT NULL,
+                hash INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                start_line INTEGER NOT NULL,
+                end_line INTEGER NOT NULL
+            )
+            ''')
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_repo_fingerprints_hash ON repo_fingerprints (repo_name, hash)'
+            )
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_repo_fingerprints_path ON repo_fingerprints (repo_name, path)'
+            )
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS duplicate_index_runs (
+                repo_name TEXT PRIMARY KEY,
+                fingerprint_version TEXT NOT NULL,
+                commit_sha TEXT NOT NULL,
+                files TEXT NOT NULL,
+                indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _blob_fingerprints(self, conn: sqlite3.Connection, blob_shas: List[str]) -> Dict[str, List[List[int]]]:
+        found = {}
+        for start in range(0, len(blob_shas), QUERY_CHUNK_SIZE):
+            chunk = blob_shas[start:start + QUERY_CHUNK_SIZE]
+            rows = conn.execute(
+                f"SELECT blob_sha, fingerprints FROM blob_fingerprints "
+                f"WHERE fingerprint_version = ? AND blob_sha IN ({','.join('?' * len(chunk))})",
+                [FINGERPRINT_VERSION] + chunk
+            ).fetchall()
+            for row in rows:
+                found[row['blob_sha']] = json.loads(zlib.decompress(row['fingerprints']).decode('utf-8'))
+        return found
+
+    def update(self, repo_name: str, commit_sha: str, files: Dict[str, str],
+               read: Callable[[str], Optional[str]]) -> Dict:
+        """Bring a repository's fingerprints to the given {path: blob SHA} map
+
+        read(path) returns a file's text and is only called for blobs that
+        were never fingerprinted. Returns counts of what the update touched.
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                run = conn.execute(
+                    'SELECT fingerprint_version, files FROM duplicate_index_runs WHERE repo_name = ?', (repo_name,)
+                ).fetchone()
+                previous = json.loads(run['files']) if run and run['fingerprint_version'] == FINGERPRINT_VERSION else {}
+
+                changed = sorted(path for path, blob_sha in files.items() if previous.get(path) != blob_sha)
+                removed = sorted(path for path in previous if path not in files)
+
+                known = self._blob_fingerprints(conn, sorted({files[path] for path in changed}))
+                fingerprinted = {}
+                for path in changed:
+                    blob_sha = files[path]
+                    if blob_sha in known or blob_sha in fingerprinted:
+                        continue
+                    content = read(path)
+                    fingerprinted[blob_sha] = fingerprint(content) if content else []
+                known.update(fingerprinted)
+
+                conn.executemany(
+                    'INSERT OR REPLACE INTO blob_fingerprints (blob_sha, fingerprint_version, fingerprints) '
+                    'VALUES (?, ?, ?)',
+                    [
+                        (blob_sha, FINGERPRINT_VERSION, zlib.compress(json.dumps(fingerprints).encode('utf-8')))
+                        for blob_sha, fingerprints in fingerprinted.items()
+                    ]
+                )
+                if not previous:
+                    conn.execute('DELETE FROM repo_fingerprints WHERE repo_name = ?', (repo_name,))
+                else:
+                    stale = changed + removed
+                    for start in range(0, len(stale), QUERY_CHUNK_SIZE):
+                        chunk = stale[start:start + QUERY_CHUNK_SIZE]
+                        conn.execute(
+                            f"DELETE FROM repo_fingerprints WHERE repo_name = ? AND path IN ({','.join('?' * len(chunk))})",
+                            [repo_name] + chunk
+                        )
+                conn.executemany(
+                    'INSERT INTO repo_fingerprints (repo_name, hash, path, position, start_line, end_line) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    [
+                        (repo_name, value, path, position, start_line, end_line)
+                        for path in changed for value, position, start_line, end_line in known[files[path]]
+                    ]
+                )
+                conn.execute(
+                    'INSERT OR REPLACE INTO duplicate_index_runs (repo_name, fingerprint_version, commit_sha, files) '
+                    'VALUES (?, ?, ?, ?)',
+                    (repo_name, FINGERPRINT_VERSION, commit_sha or '', json.dumps(files, sort_keys=True))
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+        summary = {
+            'files': len(files), 'changed': len(changed), 'removed': len(removed), 'fingerprinted': len(fingerprinted)
+        }
+        print(f"🔍 Duplicate index of {repo_name}: {summary['changed']} files updated, "
+              f"{summary['removed']} removed, {summary['fingerprinted']} blobs fingerprinted")
+        return summary
+
+    def update_snapshot(self, repo_name: str, snapshot, extensions: Tuple[str, ...]) -> Dict:
+        """Fingerprint the files of a RepositorySnapshot with the given extensions"""
+        files = {path: blob_sha for path, blob_sha in snapshot.blob_shas().items() if path.endswith(extensions)}
+        return self.update(repo_name, snapshot.sha, files, snapshot.read_text)
+
+    def duplicates(self, repo_name: str, min_tokens: int = None) -> List[Dict]:
+        """Duplicated regions at the last indexed commit, largest first
+
+        Each region is {'tokens', 'first', 'second'} with the path and line
+        range of both copies.
+        """
+        min_tokens = min_tokens or int(os.environ.get('GITHUB_DUPLICATE_MIN_TOKENS', 50))
+        conn = self._connect()
+        try:
+            rows = conn.execute('''
+                SELECT hash, path, position, start_line, end_line FROM repo_fingerprints
+                WHERE repo_name = ? AND hash IN (
+                    SELECT hash FROM repo_fingerprints WHERE repo_name = ?
+                    GROUP BY hash HAVING COUNT(*) BETWEEN 2 AND ?
+                )
+            ''', (repo_name, repo_name, MAX_OCCURRENCES)).fetchall()
+        finally:
+            conn.close()
+
+        occurrences = {}
+        for row in rows:
+            occurrences.setdefault(row['hash'], []).append(
+                (row['path'], row['position'], row['start_line'], row['end_line'])
+            )
+        return duplicate_regions(occurrences, min_tokens)
+
+
+def duplicate_proposals(regions: List[Dict]) -> List[Dict]:
+    """Issue proposal fields for each duplicated region from DuplicateIndex.duplicates()
+
+    Stored proposals are keyed by title and path, so the title names both
+    full paths and line ranges. Two regions never share a proposal, even
+    between files with the same name or within one file.
+    """
+    proposals = []
+    for region in regions:
+        first, second = region['first'], region['second']
+        proposals.append({
+            'id': f"dup_{len(proposals) + 1}",
+            'title': (
+                f"Duplicated code in {first['path']}:{first['start_line']}-{first['end_line']} "
+                f"and {second['path']}:{second['start_line']}-{second['end_line']}"
+            ),
+            'description': (
+                f"Lines {first['start_line']}-{first['end_line']} of {first['path']} and lines "
+                f"{second['start_line']}-{second['end_line']} of {second['path']} repeat the same "
+                f"{region['tokens']} tokens apart from names and literals. Extract the shared logic "
+                f"so a fix to one copy cannot miss the other."
+            ),
+            'severity': 'medium' if region['tokens'] >= 150 else 'low',
+            'category': 'enhancement',
+            'file_path': first['path'],
+            'line_number': first['start_line'],
+            'labels': ['code-quality', 'duplication']
+        })
+    return proposals
+
+
+_duplicate_index = None
+_duplicate_index_lock = threading.Lock()
+
+
+def get_duplicate_index() -> DuplicateIndex:
+    """Return the process-wide duplicate code index"""
+    global _duplicate_index
+    with _duplicate_index_lock:
+        if _duplicate_index is None:
+            _duplicate_index = DuplicateIndex()
+        return _duplicate_index
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Local Git Mirror
+====================================
+
+Keeps a bare mirror of the repository on local disk and updates it with
+`git fetch`, so an analysis costs one incremental fetch instead of API
+calls per file or a full tarball. `git diff --name-only old..new` lists
+what changed between two analyzed commits, file listings come from
+`git ls-tree`, and blob contents are streamed from one long-lived
+`git cat-file --batch` process. Snapshots built from the mirror expose the
+same interface as RepositorySnapshot, so the analysis store and the
+analyzers do not know which backend produced them.
+"""
+
+import os
+import base64
+import tempfile
+import threading
+import subprocess
+from typing import Dict, List, Optional
+from repo_snapshot import RepositorySnapshot
+from tree_filter import TreeFilter
+
+
+class GitMirror:
+    """Bare mirror of one repository, updated with git fetch"""
+
+    def __init__(self, repo_name: str, url: str = None, directory: str = None, token: str = None):
+        self.repo_name = repo_name
+        self.url = url or f"https://github.com/{repo_name}.git"
+        base = directory or os.environ.get(
+            'GITHUB_MIRROR_DIR', os.path.join(tempfile.gettempdir(), 'atim-mirrors')
+        )
+        self.path = os.path.join(base, repo_name.replace('/', '__') + '.git')
+        self.token = token
+        self._lock = threading.Lock()
+
+    def _git(self, *args: str, remote: bool = False) -> bytes:
+        command = ['git', '--git-dir', self.path]
+        env = None
+        if remote and self.token:
+            # Sent as a header so the token never lands in the mirror's config, and
+            # through the environment so it never shows up in the process list
+            credentials = base64.b64encode(f"x-access-token:{self.token}".encode('utf-8')).decode('ascii')
+            index = int(os.environ.get('GIT_CONFIG_COUNT', 0))
+            env = dict(os.environ, **{
+                'GIT_CONFIG_COUNT': str(index + 1),
+                f"GIT_CONFIG_KEY_{index}": 'http.extraHeader',
+                f"GIT_CONFIG_VALUE_{index}": f"Authorization: Basic {credentials}"
+            })
+        result = subprocess.run(command + list(args), capture_output=True, check=True, env=env)
+        return result.stdout
+
+    def fetch(self) -> Optional[str]:
+        """Update the mirror and return the SHA at the head of the default branch"""
+        with self._lock:
+            try:
+                if not os.path.isdir(self.path):
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    subprocess.run(['git', 'init', '--quiet', '--bare', self.path], capture_output=True, check=True)
+                    print(f"📦 Created mirror of {self.repo_name} in {self.path}")
+
+                self._git('fetch', '--quiet', '--prune', '--no-tags', self.url,
+                          '+refs/heads/*:refs/heads/*', remote=True)
+
+                # Point HEAD at the remote's default branch
+                for line in self._git('ls-remote', '--symref', self.url, 'HEAD', remote=True).decode('utf-8').splitlines():
+                    if line.startswith('ref: '):
+                        self._git('symbolic-ref', 'HEAD', line[len('ref: '):].split('\t')[0])
+                        break
+
+                return self._git('rev-parse', 'HEAD').decode('utf-8').strip()
+
+            except subprocess.CalledProcessError as e:
+                print(f"❌ Failed to fetch mirror of {self.repo_name}: {e.stderr.decode('utf-8', errors='replace').strip()}")
+                return None
+            except OSError as e:
+                print(f"❌ Error running git for {self.repo_name}: {e}")
+                return None
+
+    def changed_files(self, old_sha: str, new_sha: str) -> Optional[List[str]]:
+        """Paths changed between two commits, or None if either is unknown"""
+        try:
+            output = self._git('diff', '--name-only', '-z', f"{old_sha}..{new_sha}")
+        except subprocess.CalledProcessError:
+            return None
+        return [path for path in output.decode('utf-8').split('\0') if path]
+
+    def diff_files(self, old_sha: str, new_sha: str, context: int = 3) -> Optional[List[Dict]]:
+        """Per-file patches shaped like GitHub's compare files
+
+        Like the compare API, new_sha is diffed against its merge base with
+        old_sha, so changes made on old_sha's side since they forked are
+        left out.
+        """
+        try:
+            # Paths come from the NUL-separated listing, which git never quotes
+            listing = self._git('diff', '--name-status', '--no-renames', '-z', f"{old_sha}...{new_sha}")
+            output = self._git('diff', '--no-color', '--no-ext-diff', '--no-renames', f"-U{context}",
+                               f"{old_sha}...{new_sha}")
+        except subprocess.CalledProcessError:
+            return None
+
+        fields = listing.decode('utf-8', errors='replace').split('\0')
+        entries = list(zip(fields[0::2], fields[1::2]))
+        text = output.decode('utf-8', errors='replace')
+        # One block per listed path, in the same order
+        blocks = text.split('\ndiff --git ') if text else []
+        if len(blocks) != len(entries):
+            print(f"⚠️  Diff of {self.repo_name} {old_sha[:7]}...{new_sha[:7]} has {len(blocks)} patches "
+                  f"for {len(entries)} files")
+            return None
+
+        files = []
+        for (status, path), block in zip(entries, blocks):
+            _, _, patch = block.partition('\n@@')
+            files.append({
+                'filename': path,
+                'status': {'A': 'added', 'D': 'removed'}.get(status, 'modified'),
+                'patch': '@@' + patch if patch else ''
+            })
+        return files
+
+    def tree_entries(self, sha: str) -> List[Dict]:
+        """Blob entries of a commit's tree as {'path', 'sha', 'size'}"""
+        entries = []
+        for record in self._git('ls-tree', '-r', '-l', '-z', sha).decode('utf-8').split('\0'):
+            if not record:
+                continue
+            meta, path = record.split('\t', 1)
+            _, object_type, object_sha, size = meta.split()
+            if object_type == 'blob':
+                entries.append({'path': path, 'sha': object_sha, 'size': int(size) if size != '-' else 0})
+        return entries
+
+    def snapshot(self, sha: str, tree_filter: TreeFilter = None) -> 'MirrorSnapshot':
+        """Snapshot of a commit whose files are read from the mirror on demand"""
+        entries = self.tree_entries(sha)
+        if tree_filter:
+            entries, _ = tree_filter.filter_entries(entries)
+        return MirrorSnapshot(self, sha, entries)
+
+
+class MirrorSnapshot(RepositorySnapshot):
+    """RepositorySnapshot backed by a git mirror instead of downloaded files
+
+    Only the tree listing is held; contents are read through one
+    `git cat-file --batch` process when an analyzer asks for them, so
+    files whose findings are already stored are never read at all.
+    """
+
+    def __init__(self, mirror: GitMirror, sha: str, entries: List[Dict]):
+        super().__init__(mirror.repo_name, sha)
+        self.mirror = mirror
+        for entry in entries:
+            self._sizes[entry['path']] = entry['size']
+            self._shas[entry['path']] = entry['sha']
+            self.total_bytes += entry['size']
+        self._batch = None
+
+    def add(self, path: str, content: bytes, sha: str = None):
+        raise TypeError("Mirror snapshots are read-only")
+
+    def read(self, path: str) -> Optional[bytes]:
+        blob_sha = self._shas.get(path)
+        if blob_sha is None:
+            return None
+
+        with self._lock:
+            if self._batch is None:
+                self._batch = subprocess.Popen(
+                    ['git', '--git-dir', self.mirror.path, 'cat-file', '--batch'],
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE
+                )
+            self._batch.stdin.write(blob_sha.encode('ascii') + b'\n')
+            self._batch.stdin.flush()
+
+            # "<sha> <type> <size>\n<content>\n", or "<sha> missing\n"
+            header = self._batch.stdout.readline().split()
+            if len(header) < 3:
+                return None
+            content = self._batch.stdout.read(int(header[2]))
+            self._batch.stdout.read(1)
+            return content
+
+    def close(self):
+        with self._lock:
+            if self._batch is not None:
+                self._batch.stdin.close()
+                try:
+                    self._batch.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    # A forked worker may still hold the pipe open
+                    self._batch.kill()
+                    self._batch.wait()
+                self._batch = None
+        super().close()
+
+
+def load_mirror_snapshot(repo_name: str, token: str = None, tree_filter: TreeFilter = None) -> Optional[MirrorSnapshot]:
+    """Fetch the repository's mirror and snapshot its default branch head
+
+    Which files changed since the last analysis is decided by the analysis
+    store from blob SHAs, so no diff is needed here.
+    """
+    mirror = get_mirror(repo_name, token)
+    sha = mirror.fetch()
+    if sha is None:
+        return None
+
+    snapshot = mirror.snapshot(sha, tree_filter)
+    print(f"📦 Mirror snapshot of {repo_name}@{sha[:7]}: {snapshot.file_count} files")
+    return snapshot
+
+
+_mirrors = {}
+_mirrors_lock = threading.Lock()
+
+
+def get_mirror(repo_name: str, token: str = None) -> GitMirror:
+    """Return the process-wide mirror of a repository"""
+    with _mirrors_lock:
+        mirror = _mirrors.get(repo_name)
+        if mirror is None:
+            mirror = _mirrors[repo_name] = GitMirror(repo_name)
+        if token:
+            mirror.token = token
+        return mirror
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Conditional Request Cache
+=============================================
+
+Bounded LRU cache for GitHub GET responses. Each body is stored with its
+ETag and Last-Modified validators; later requests revalidate with
+If-None-Match / If-Modified-Since and a 304 is served from the cache.
+GitHub does not count 304 responses against the rate limit.
+
+Responses are also served without any request while they are fresh
+according to GitHub's Cache-Control max-age.
+"""
+
+import os
+import re
+import time
+import hashlib
+import threading
+import requests
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+from requests.structures import CaseInsensitiveDict
+
+MAX_AGE_PATTERN = re.compile(r'max-age=(\d+)')
+
+@dataclass
+class CacheEntry:
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    encoding: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh_until: float
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+
+class ConditionalRequestCache:
+    """LRU cache of GitHub GET responses keyed by URL, params and credentials"""
+
+    def __init__(self, max_entries: int = None, max_bytes: int = None):
+        self.max_entries = max_entries or int(os.environ.get('GITHUB_HTTP_CACHE_ENTRIES', 512))
+        self.max_bytes = max_bytes or int(os.environ.get('GITHUB_HTTP_CACHE_BYTES', 32 * 1024 * 1024))
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._counters = {'hits': 0, 'not_modified': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict], headers: Optional[Dict]) -> str:
+        """Build a cache key; GitHub varies responses on Accept and Authorization"""
+        headers = headers or {}
+        query = '&'.join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        credentials = hashlib.sha256(headers.get('Authorization', '').encode('utf-8')).hexdigest()[:16]
+        return f"{url}?{query}|{headers.get('Accept', '')}|{credentials}"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def conditional_headers(self, entry: CacheEntry) -> Dict[str, str]:
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def store(self, key: str, response: requests.Response) -> Optional[CacheEntry]:
+        """Cache a 200 response if it carries a validator"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code != 200 or not (etag or last_modified):
+            return None
+
+        entry = CacheEntry(
+            url=response.url,
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            content=response.content,
+            encoding=response.encoding,
+            etag=etag,
+            last_modified=last_modified,
+            fresh_until=time.time() + self._max_age(response.headers)
+        )
+
+        if entry.size > self.max_bytes:
+            return None
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+
+            self._entries[key] = entry
+            self._bytes += entry.size
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._counters['evictions'] += 1
+
+        return entry
+
+    def refresh(self, entry: CacheEntry, not_modified: requests.Response):
+        """Extend an entry's freshness after a 304 revalidation"""
+        with self._lock:
+            entry.fresh_until = time.time() + self._max_age(not_modified.headers)
+            entry.etag = not_modified.headers.get('ETag', entry.etag)
+            for name in ('X-RateLimit-Remaining', 'X-RateLimit-Reset', 'Date'):
+                if name in not_modified.headers:
+                    entry.headers[name] = not_modified.headers[name]
+
+    def record(self, outcome: str):
+        with self._lock:
+            self._counters[outcome] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+            size = self._bytes
+
+        lookups = counters['hits'] + counters['not_modified'] + counters['misses']
+
+        def rate(count):
+            return round(count / lookups, 3) if lookups else 0.0
+
+        return {
+            'entries': entries,
+            'bytes': size,
+            'lookups': lookups,
+            'hits': counters['hits'],
+            'not_modified': counters['not_modified'],
+            'misses': counters['misses'],
+            'evictions': counters['evictions'],
+            'hit_rate': rate(counters['hits']),
+            'not_modified_rate': rate(counters['not_modified']),
+            'miss_rate': rate(counters['misses'])
+        }
+
+    @staticmethod
+    def to_response(entry: CacheEntry) -> requests.Response:
+        """Rebuild a requests.Response from a cache entry"""
+        response = requests.Response()
+        response.status_code = entry.status_code
+        response.reason = 'OK'
+        response.url = entry.url
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response.encoding = entry.encoding
+        response._content = entry.content
+        response.from_cache = True
+        return response
+
+    @staticmethod
+    def _max_age(headers) -> int:
+        match = MAX_AGE_PATTERN.search(headers.get('Cache-Control', ''))
+        return int(match.group(1)) if match else 0
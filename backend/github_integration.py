@@ -1,14 +1,23 @@
 #!/usr/bin/env python3
 
 import os
-import re
-import json
-import time
-import requests
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from github import Github, GithubException
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
+from github_stats import get_stats_provider
+from repo_snapshot import CPP_EXTENSIONS, RepositorySnapshot, load_snapshot
+from tree_filter import get_tree_filter
+from analysis_store import get_analysis_store
+from duplicate_index import duplicate_proposals, get_duplicate_index
+from ast_cache import get_structural_analyzer
+from analysis_executor import get_analysis_executor
+from rule_packs import RuleSet, get_rule_packs
+from grep_prefilter import GrepPrefilter
+from rule_engine import Rule, iter_rule_proposals
+
+# Rule packs scanned by this integration, compiled once per rule pack load
+RULE_PACKS = ('security', 'performance', 'quality')
 
 @dataclass
 class IssueProposal:
@@ -50,128 +59,82 @@ class GitHubIntegration:
             except GithubException as e:
                 print(f"Error accessing repository {repo_name}: {e}")
     
-    def analyze_repository(self) -> List[IssueProposal]:
-        """Analyze the repository and generate issue proposals"""
+    def analyze_repository(self, progress: Callable[[Dict], None] = None) -> List[IssueProposal]:
+        """Analyze the repository and generate issue proposals
+
+        progress receives the file scanning counters of the analysis store.
+        """
         if not self.repo:
             return self._generate_sample_proposals()
         
         proposals = []
         
-        # Analyze different aspects of the codebase
-        proposals.extend(self._analyze_security_issues())
-        proposals.extend(self._analyze_performance_issues())
-        proposals.extend(self._analyze_code_quality_issues())
+        # Download the repository once and only scan blobs not analyzed before
+        rule_set = get_rule_packs().current()
+        engine = rule_set.engine(*RULE_PACKS)
+        with self._load_snapshot() as snapshot:
+            file_findings = get_analysis_store().analyze_snapshot(
+                self.repo_name, snapshot, engine.version, engine.scan, CPP_EXTENSIONS,
+                executor=get_analysis_executor(), progress=progress, prefilter=GrepPrefilter(engine)
+            ) or {}
+            get_duplicate_index().update_snapshot(self.repo_name, snapshot, CPP_EXTENSIONS)
+            structural_findings = get_structural_analyzer().analyze_snapshot(snapshot, CPP_EXTENSIONS)
+        
+        proposals.extend(self._analyze_security_issues(file_findings, rule_set))
+        proposals.extend(self._analyze_performance_issues(file_findings, rule_set, structural_findings))
+        proposals.extend(self._analyze_code_quality_issues(file_findings, rule_set))
+        proposals.extend(self._analyze_duplicate_code_issues())
         proposals.extend(self._analyze_documentation_issues())
         proposals.extend(self._analyze_architecture_issues())
         
         return proposals
     
-    def _analyze_security_issues(self) -> List[IssueProposal]:
-        """Analyze potential security issues"""
-        proposals = []
-        
-        # Check for common security patterns
-        security_patterns = [
-            {
-                'pattern': r'strcpy\s*\(',
-                'title': 'Use of unsafe strcpy function',
-                'description': 'The code uses strcpy which is vulnerable to buffer overflows. Consider using strncpy or std::string.',
-                'severity': 'high',
-                'category': 'security',
-                'labels': ['security', 'bug']
-            },
-            {
-                'pattern': r'sprintf\s*\(',
-                'title': 'Use of unsafe sprintf function',
-                'description': 'sprintf is vulnerable to buffer overflows. Use snprintf or std::string formatting.',
-                'severity': 'high',
-                'category': 'security',
-                'labels': ['security', 'bug']
-            },
-            {
-                'pattern': r'rand\s*\(',
-                'title': 'Use of predictable random number generation',
-                'description': 'rand() is not cryptographically secure. Use std::random_device or crypto-secure RNG for cryptographic operations.',
-                'severity': 'medium',
-                'category': 'security',
-                'labels': ['security', 'enhancement']
-            }
-        ]
-        
+    def _load_snapshot(self) -> RepositorySnapshot:
+        """Fetch the default branch head, reusing cached blobs"""
         try:
-            contents = self.repo.get_contents("")
-            for content_file in contents:
-                if content_file.type == "file" and content_file.path.endswith(('.cpp', '.c', '.h', '.hpp')):
-                    try:
-                        file_content = content_file.decoded_content.decode('utf-8')
-                        for pattern_info in security_patterns:
-                            if re.search(pattern_info['pattern'], file_content):
-                                proposals.append(IssueProposal(
-                                    id=f"sec_{len(proposals) + 1}",
-                                    title=pattern_info['title'],
-                                    description=pattern_info['description'],
-                                    severity=pattern_info['severity'],
-                                    category=pattern_info['category'],
-                                    file_path=content_file.path,
-                                    labels=pattern_info['labels']
-                                ))
-                    except Exception as e:
-                        print(f"Error analyzing file {content_file.path}: {e}")
+            sha = self.repo.get_branch(self.repo.default_branch).commit.sha
+            headers = {'Authorization': f'token {self.github_token}'}
+            snapshot = load_snapshot(self.repo_name, sha, headers, tree_filter=get_tree_filter())
+            if snapshot is not None:
+                return snapshot
+            
+            # Tree and tarball unavailable; fall back to walking the contents API
+            return RepositorySnapshot.from_contents(self.repo, sha, get_tree_filter())
         except Exception as e:
             print(f"Error accessing repository contents: {e}")
-        
-        return proposals
+            return RepositorySnapshot(self.repo_name)
     
-    def _analyze_performance_issues(self) -> List[IssueProposal]:
-        """Analyze potential performance issues"""
-        proposals = []
-        
-        performance_patterns = [
-            {
-                'pattern': r'std::vector.*\.push_back\s*\(',
-                'title': 'Inefficient vector operations',
-                'description': 'Consider reserving vector capacity before multiple push_back operations to avoid reallocations.',
-                'severity': 'medium',
-                'category': 'performance',
-                'labels': ['performance', 'enhancement']
-            },
-            {
-                'pattern': r'std::string.*\+.*std::string',
-                'title': 'Inefficient string concatenation',
-                'description': 'String concatenation with + operator creates temporary objects. Consider using std::stringstream or reserve() for better performance.',
-                'severity': 'low',
-                'category': 'performance',
-                'labels': ['performance', 'enhancement']
-            }
+    def _proposals_from_findings(self, rules: List[Rule], file_findings: Dict[str, List[Dict]],
+                                 id_prefix: str) -> List[IssueProposal]:
+        """Turn stored rule hits into one proposal per file and rule"""
+        return [
+            IssueProposal(**fields) for fields in iter_rule_proposals(file_findings.items(), {id_prefix: rules})
         ]
-        
-        # Add performance analysis logic here
-        return proposals
     
-    def _analyze_code_quality_issues(self) -> List[IssueProposal]:
+    def _analyze_security_issues(self, file_findings: Dict[str, List[Dict]], rule_set: RuleSet) -> List[IssueProposal]:
+        """Analyze potential security issues"""
+        return self._proposals_from_findings(rule_set.rules('security'), file_findings, 'sec')
+    
+    def _analyze_performance_issues(self, file_findings: Dict[str, List[Dict]], rule_set: RuleSet,
+                                    structural_findings: Dict[str, List[Dict]] = None) -> List[IssueProposal]:
+        """Analyze potential performance issues"""
+        analyzer = get_structural_analyzer()
+        # Structural rules replace the line regexes they make more precise
+        rules = [rule for rule in rule_set.rules('performance') if rule.id not in analyzer.replaced_rules]
+        merged = {}
+        for findings_by_path in (file_findings, structural_findings or {}):
+            for file_path, findings in findings_by_path.items():
+                merged.setdefault(file_path, []).extend(findings)
+        return self._proposals_from_findings(rules + analyzer.rules, merged, 'perf')
+    
+    def _analyze_code_quality_issues(self, file_findings: Dict[str, List[Dict]], rule_set: RuleSet) -> List[IssueProposal]:
         """Analyze code quality issues"""
-        proposals = []
-        
-        quality_patterns = [
-            {
-                'pattern': r'using namespace std;',
-                'title': 'Avoid using namespace std in headers',
-                'description': 'Using namespace std in headers can cause naming conflicts. Use specific using declarations or namespace qualifiers.',
-                'severity': 'medium',
-                'category': 'enhancement',
-                'labels': ['code-quality', 'enhancement']
-            },
-            {
-                'pattern': r'#define\s+[A-Z_]+',
-                'title': 'Consider using const instead of #define',
-                'description': 'Prefer const variables over #define for better type safety and debugging support.',
-                'severity': 'low',
-                'category': 'enhancement',
-                'labels': ['code-quality', 'enhancement']
-            }
-        ]
-        
-        return proposals
+        return self._proposals_from_findings(rule_set.rules('quality'), file_findings, 'qual')
+    
+    def _analyze_duplicate_code_issues(self) -> List[IssueProposal]:
+        """Analyze code copied between or within files"""
+        regions = get_duplicate_index().duplicates(self.repo_name)
+        return [IssueProposal(**fields) for fields in duplicate_proposals(regions)]
     
     def _analyze_documentation_issues(self) -> List[IssueProposal]:
         """Analyze documentation issues"""
@@ -355,11 +318,23 @@ class GitHubIntegration:
                 'language': 'C++'
             }
         
+        # One GraphQL round trip; falls back to PyGithub if the query fails
+        stats = get_stats_provider().get_stats(self.repo_name, {'Authorization': f'token {self.github_token}'})
+        if stats:
+            return {
+                'name': stats['repository'],
+                'open_issues': stats['open_issues'],
+                'open_pulls': stats['open_pulls'],
+                'stars': stats['stars'],
+                'forks': stats['forks'],
+                'language': stats['language'] or 'C++'
+            }
+        
         try:
             return {
                 'name': self.repo.full_name,
                 'open_issues': self.repo.open_issues_count,
-                'open_pulls': len(list(self.repo.get_pulls(state='open'))),
+                'open_pulls': self.repo.get_pulls(state='open').totalCount,
                 'stars': self.repo.stargazers_count,
                 'forks': self.repo.forks_count,
                 'language': self.repo.language or 'C++'
@@ -1,17 +1,25 @@
 #!/usr/bin/env python3
 
 import os
-import re
-import json
-import time
-import jwt
-import requests
 from datetime import datetime
-from typing import List, Dict, Optional
-from github import Github, GithubException
-from github.Auth import AppAuth
-from dataclasses import dataclass, asdict
+from typing import Callable, List, Dict, Optional
+from github import Auth, Github, GithubException
+from dataclasses import dataclass
 from dotenv import load_dotenv
+from github_token_manager import get_token_manager
+from github_stats import get_stats_provider
+from repo_snapshot import CPP_EXTENSIONS, RepositorySnapshot, load_snapshot
+from tree_filter import get_tree_filter
+from analysis_store import get_analysis_store
+from duplicate_index import duplicate_proposals, get_duplicate_index
+from ast_cache import get_structural_analyzer
+from analysis_executor import get_analysis_executor
+from rule_packs import RuleSet, get_rule_packs
+from grep_prefilter import GrepPrefilter
+from rule_engine import Rule, iter_rule_proposals
+
+# Rule packs scanned by this integration, compiled once per rule pack load
+RULE_PACKS = ('security', 'performance', 'quality')
 
 @dataclass
 class IssueProposal:
@@ -65,11 +73,13 @@ class GitHubIntegrationApp:
             return
             
         try:
-            # Generate JWT for app authentication
-            jwt_token = self._generate_jwt()
+            # Installation tokens come from the process-wide token manager
+            access_token = get_token_manager().get_installation_token(self.repo_name)
+            if not access_token:
+                raise Exception("Failed to get installation token")
             
-            # Initialize GitHub client with JWT token
-            self.github = Github(auth=AppAuth(self.app_id, jwt_token))
+            # Initialize GitHub client with the installation token
+            self.github = Github(auth=Auth.Token(access_token))
             
             # Test repository access
             self.repo = self.github.get_repo(self.repo_name)
@@ -81,190 +91,86 @@ class GitHubIntegrationApp:
             self.github = None
             self.repo = None
     
-    def _generate_jwt(self) -> str:
-        """Generate JWT for GitHub App authentication"""
-        try:
-            with open(self.private_key_path, 'r') as f:
-                private_key = f.read()
-            
-            payload = {
-                'iat': int(time.time()),
-                'exp': int(time.time()) + 600,  # 10 minutes
-                'iss': int(self.app_id)
-            }
-            
-            return jwt.encode(payload, private_key, algorithm='RS256')
-            
-        except Exception as e:
-            raise Exception(f"Failed to generate JWT: {e}")
-    
+    def analyze_repository(self, progress: Callable[[Dict], None] = None) -> List[IssueProposal]:
+        """Analyze the repository and generate issue proposals
 
-    
-    def analyze_repository(self) -> List[IssueProposal]:
-        """Analyze the repository and generate issue proposals"""
+        progress receives the file scanning counters of the analysis store.
+        """
         if not self.repo:
             return self._generate_sample_proposals()
         
         proposals = []
         
-        # Analyze different aspects of the codebase
-        proposals.extend(self._analyze_security_issues())
-        proposals.extend(self._analyze_performance_issues())
-        proposals.extend(self._analyze_code_quality_issues())
+        # Download the repository once and only scan blobs not analyzed before
+        rule_set = get_rule_packs().current()
+        engine = rule_set.engine(*RULE_PACKS)
+        with self._load_snapshot() as snapshot:
+            file_findings = get_analysis_store().analyze_snapshot(
+                self.repo_name, snapshot, engine.version, engine.scan, CPP_EXTENSIONS,
+                executor=get_analysis_executor(), progress=progress, prefilter=GrepPrefilter(engine)
+            ) or {}
+            get_duplicate_index().update_snapshot(self.repo_name, snapshot, CPP_EXTENSIONS)
+            structural_findings = get_structural_analyzer().analyze_snapshot(snapshot, CPP_EXTENSIONS)
+        
+        proposals.extend(self._analyze_security_issues(file_findings, rule_set))
+        proposals.extend(self._analyze_performance_issues(file_findings, rule_set, structural_findings))
+        proposals.extend(self._analyze_code_quality_issues(file_findings, rule_set))
+        proposals.extend(self._analyze_duplicate_code_issues())
         proposals.extend(self._analyze_documentation_issues())
         proposals.extend(self._analyze_architecture_issues())
         
         return proposals
     
-    def _analyze_security_issues(self) -> List[IssueProposal]:
-        """Analyze potential security issues"""
-        proposals = []
-        
-        # Check for common security patterns
-        security_patterns = [
-            {
-                'pattern': r'strcpy\s*\(',
-                'title': 'Use of unsafe strcpy function',
-                'description': 'The code uses strcpy which is vulnerable to buffer overflows. Consider using strncpy or std::string.',
-                'severity': 'high',
-                'category': 'security',
-                'labels': ['security', 'bug']
-            },
-            {
-                'pattern': r'sprintf\s*\(',
-                'title': 'Use of unsafe sprintf function',
-                'description': 'sprintf is vulnerable to buffer overflows. Use snprintf or std::string formatting.',
-                'severity': 'high',
-                'category': 'security',
-                'labels': ['security', 'bug']
-            },
-            {
-                'pattern': r'rand\s*\(',
-                'title': 'Use of predictable random number generation',
-                'description': 'rand() is not cryptographically secure. Use std::random_device or crypto-secure RNG for cryptographic operations.',
-                'severity': 'medium',
-                'category': 'security',
-                'labels': ['security', 'enhancement']
-            }
-        ]
-        
+    def _load_snapshot(self) -> RepositorySnapshot:
+        """Fetch the default branch head, reusing cached blobs"""
         try:
-            contents = self.repo.get_contents("")
-            for content_file in contents:
-                if content_file.type == "file" and content_file.path.endswith(('.cpp', '.c', '.h', '.hpp')):
-                    try:
-                        file_content = content_file.decoded_content.decode('utf-8')
-                        for pattern_info in security_patterns:
-                            if re.search(pattern_info['pattern'], file_content):
-                                proposals.append(IssueProposal(
-                                    id=f"sec_{len(proposals) + 1}",
-                                    title=pattern_info['title'],
-                                    description=pattern_info['description'],
-                                    severity=pattern_info['severity'],
-                                    category=pattern_info['category'],
-                                    file_path=content_file.path,
-                                    labels=pattern_info['labels']
-                                ))
-                    except Exception as e:
-                        print(f"Error analyzing file {content_file.path}: {e}")
+            sha = self.repo.get_branch(self.repo.default_branch).commit.sha
+            token_manager = get_token_manager()
+            headers = token_manager.get_installation_headers(self.repo_name)
+            budget_key = f"installation:{token_manager.get_installation_id(self.repo_name)}"
+            snapshot = load_snapshot(
+                self.repo_name, sha, headers, budget_key=budget_key, tree_filter=get_tree_filter()
+            )
+            if snapshot is not None:
+                return snapshot
+            
+            # Tree and tarball unavailable; fall back to walking the contents API
+            return RepositorySnapshot.from_contents(self.repo, sha, get_tree_filter())
         except Exception as e:
             print(f"Error accessing repository contents: {e}")
-        
-        return proposals
+            return RepositorySnapshot(self.repo_name)
     
-    def _analyze_performance_issues(self) -> List[IssueProposal]:
-        """Analyze potential performance issues"""
-        proposals = []
-        
-        performance_patterns = [
-            {
-                'pattern': r'std::vector.*\.push_back\s*\(',
-                'title': 'Inefficient vector operations',
-                'description': 'Consider reserving vector capacity before multiple push_back operations to avoid reallocations.',
-                'severity': 'medium',
-                'category': 'performance',
-                'labels': ['performance', 'enhancement']
-            },
-            {
-                'pattern': r'std::map.*\.find\s*\(',
-                'title': 'Inefficient map lookups',
-                'description': 'Consider using std::unordered_map for better performance if order is not required.',
-                'severity': 'medium',
-                'category': 'performance',
-                'labels': ['performance', 'enhancement']
-            }
+    def _proposals_from_findings(self, rules: List[Rule], file_findings: Dict[str, List[Dict]],
+                                 id_prefix: str) -> List[IssueProposal]:
+        """Turn stored rule hits into one proposal per file and rule"""
+        return [
+            IssueProposal(**fields) for fields in iter_rule_proposals(file_findings.items(), {id_prefix: rules})
         ]
-        
-        try:
-            contents = self.repo.get_contents("")
-            for content_file in contents:
-                if content_file.type == "file" and content_file.path.endswith(('.cpp', '.c', '.h', '.hpp')):
-                    try:
-                        file_content = content_file.decoded_content.decode('utf-8')
-                        for pattern_info in performance_patterns:
-                            if re.search(pattern_info['pattern'], file_content):
-                                proposals.append(IssueProposal(
-                                    id=f"perf_{len(proposals) + 1}",
-                                    title=pattern_info['title'],
-                                    description=pattern_info['description'],
-                                    severity=pattern_info['severity'],
-                                    category=pattern_info['category'],
-                                    file_path=content_file.path,
-                                    labels=pattern_info['labels']
-                                ))
-                    except Exception as e:
-                        print(f"Error analyzing file {content_file.path}: {e}")
-        except Exception as e:
-            print(f"Error accessing repository contents: {e}")
-        
-        return proposals
     
-    def _analyze_code_quality_issues(self) -> List[IssueProposal]:
+    def _analyze_security_issues(self, file_findings: Dict[str, List[Dict]], rule_set: RuleSet) -> List[IssueProposal]:
+        """Analyze potential security issues"""
+        return self._proposals_from_findings(rule_set.rules('security'), file_findings, 'sec')
+    
+    def _analyze_performance_issues(self, file_findings: Dict[str, List[Dict]], rule_set: RuleSet,
+                                    structural_findings: Dict[str, List[Dict]] = None) -> List[IssueProposal]:
+        """Analyze potential performance issues"""
+        analyzer = get_structural_analyzer()
+        # Structural rules replace the line regexes they make more precise
+        rules = [rule for rule in rule_set.rules('performance') if rule.id not in analyzer.replaced_rules]
+        merged = {}
+        for findings_by_path in (file_findings, structural_findings or {}):
+            for file_path, findings in findings_by_path.items():
+                merged.setdefault(file_path, []).extend(findings)
+        return self._proposals_from_findings(rules + analyzer.rules, merged, 'perf')
+    
+    def _analyze_code_quality_issues(self, file_findings: Dict[str, List[Dict]], rule_set: RuleSet) -> List[IssueProposal]:
         """Analyze code quality issues"""
-        proposals = []
-        
-        quality_patterns = [
-            {
-                'pattern': r'using namespace std;',
-                'title': 'Avoid using namespace std',
-                'description': 'Using namespace std can lead to naming conflicts. Use specific imports instead.',
-                'severity': 'low',
-                'category': 'code-quality',
-                'labels': ['code-quality', 'enhancement']
-            },
-            {
-                'pattern': r'#include <bits/stdc\+\+\.h>',
-                'title': 'Avoid bits/stdc++.h header',
-                'description': 'bits/stdc++.h is not standard and may not be available on all systems. Use specific headers.',
-                'severity': 'medium',
-                'category': 'code-quality',
-                'labels': ['code-quality', 'enhancement']
-            }
-        ]
-        
-        try:
-            contents = self.repo.get_contents("")
-            for content_file in contents:
-                if content_file.type == "file" and content_file.path.endswith(('.cpp', '.c', '.h', '.hpp')):
-                    try:
-                        file_content = content_file.decoded_content.decode('utf-8')
-                        for pattern_info in quality_patterns:
-                            if re.search(pattern_info['pattern'], file_content):
-                                proposals.append(IssueProposal(
-                                    id=f"qual_{len(proposals) + 1}",
-                                    title=pattern_info['title'],
-                                    description=pattern_info['description'],
-                                    severity=pattern_info['severity'],
-                                    category=pattern_info['category'],
-                                    file_path=content_file.path,
-                                    labels=pattern_info['labels']
-                                ))
-                    except Exception as e:
-                        print(f"Error analyzing file {content_file.path}: {e}")
-        except Exception as e:
-            print(f"Error accessing repository contents: {e}")
-        
-        return proposals
+        return self._proposals_from_findings(rule_set.rules('quality'), file_findings, 'qual')
+    
+    def _analyze_duplicate_code_issues(self) -> List[IssueProposal]:
+        """Analyze code copied between or within files"""
+        regions = get_duplicate_index().duplicates(self.repo_name)
+        return [IssueProposal(**fields) for fields in duplicate_proposals(regions)]
     
     def _analyze_documentation_issues(self) -> List[IssueProposal]:
         """Analyze documentation issues"""
@@ -402,11 +308,23 @@ class GitHubIntegrationApp:
                 'language': 'C++'
             }
         
+        # One GraphQL round trip; falls back to PyGithub if the query fails
+        stats = get_stats_provider().get_stats(self.repo_name, get_token_manager().get_installation_headers(self.repo_name))
+        if stats:
+            return {
+                'name': stats['repository'],
+                'open_issues': stats['open_issues'],
+                'open_pulls': stats['open_pulls'],
+                'stars': stats['stars'],
+                'forks': stats['forks'],
+                'language': stats['language'] or 'C++'
+            }
+        
         try:
             return {
                 'name': self.repo.full_name,
                 'open_issues': self.repo.open_issues_count,
-                'open_pulls': len(list(self.repo.get_pulls(state='open'))),
+                'open_pulls': self.repo.get_pulls(state='open').totalCount,
                 'stars': self.repo.stargazers_count,
                 'forks': self.repo.forks_count,
                 'language': self.repo.language or 'C++'
@@ -1,15 +1,30 @@
 #!/usr/bin/env python3
 
 import os
-import re
-import json
-import time
-import jwt
-import requests
 from datetime import datetime
-from typing import List, Dict, Optional
-from dataclasses import dataclass, asdict
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple, Union
+from dataclasses import dataclass
 from dotenv import load_dotenv
+from github_token_manager import get_token_manager
+from github_transport import get_transport
+from github_stats import get_stats_provider
+from repo_snapshot import CPP_EXTENSIONS, load_snapshot
+from tree_filter import get_tree_filter
+from git_mirror import get_mirror, load_mirror_snapshot
+from code_search import get_code_search
+from diff_analysis import analyze_files, fetch_diff_files
+from analysis_store import get_analysis_store
+from duplicate_index import duplicate_proposals, get_duplicate_index
+from ast_cache import get_structural_analyzer
+from analysis_executor import get_analysis_executor
+from rule_packs import RuleSet, get_rule_packs
+from grep_prefilter import GrepPrefilter
+from rule_engine import RuleEngine, iter_rule_proposals
+
+# Rule packs scanned by this integration, compiled once per rule pack load,
+# and the id prefix of the proposals each pack produces
+RULE_PACKS = ('security', 'performance', 'quality')
+PROPOSAL_PREFIXES = {'security': 'sec', 'performance': 'perf', 'quality': 'qual'}
 
 @dataclass
 class IssueProposal:
@@ -51,116 +66,29 @@ class GitHubIntegrationSimple:
         # API configuration
         self.base_url = "https://api.github.com"
         self.headers = {}
+        self.transport = get_transport()
+        self.budget_key = None
         
         # Initialize GitHub App authentication
         self._initialize_github_app()
         
     def _initialize_github_app(self):
-        """Initialize GitHub App authentication"""
+        """Initialize GitHub App authentication from the shared token manager"""
         if not all([self.app_id, self.private_key_path]):
             print("⚠️  GitHub App credentials not fully configured.")
             print("   Required: GITHUB_APP_ID, GITHUB_APP_PRIVATE_KEY_PATH")
             return
             
-        try:
-            # Generate JWT for app authentication
-            jwt_token = self._generate_jwt()
-            
-            # Set headers for app-level API calls
-            app_headers = {
-                'Authorization': f'Bearer {jwt_token}',
-                'Accept': 'application/vnd.github.v3+json',
-                'User-Agent': 'Atim-AI-Assistant/1.0'
-            }
-            
-            # Test app authentication
-            response = requests.get(f"{self.base_url}/app", headers=app_headers)
-            if response.status_code == 200:
-                app_data = response.json()
-                print(f"🤖 Atim GitHub App authenticated successfully")
-                print(f"✅ App name: {app_data.get('name', 'Unknown')}")
-                
-                # Get installation access token for repository access
-                self._get_installation_token(app_headers)
-            else:
-                print(f"❌ GitHub App authentication failed: {response.status_code}")
-                print(f"   Response: {response.text}")
-                self.headers = {}
-                
-        except Exception as e:
-            print(f"❌ Atim GitHub App authentication failed: {e}")
-            self.headers = {}
-    
-    def _get_installation_token(self, app_headers):
-        """Get installation access token for repository access"""
-        try:
-            # First, find the installation for the repository
-            response = requests.get(f"{self.base_url}/app/installations", headers=app_headers)
-            
-            if response.status_code == 200:
-                installations = response.json()
-                
-                # Find installation for our repository
-                target_installation = None
-                for installation in installations:
-                    if installation.get('account', {}).get('login') == self.repo_name.split('/')[0]:
-                        target_installation = installation
-                        break
-                
-                if target_installation:
-                    installation_id = target_installation['id']
-                    print(f"✅ Found installation ID: {installation_id}")
-                    
-                    # Get installation access token
-                    token_response = requests.post(
-                        f"{self.base_url}/app/installations/{installation_id}/access_tokens",
-                        headers=app_headers
-                    )
-                    
-                    if token_response.status_code == 201:
-                        token_data = token_response.json()
-                        access_token = token_data['token']
-                        
-                        # Set headers for repository access
-                        self.headers = {
-                            'Authorization': f'Bearer {access_token}',
-                            'Accept': 'application/vnd.github.v3+json',
-                            'User-Agent': 'Atim-AI-Assistant/1.0'
-                        }
-                        
-                        print(f"✅ Installation token generated successfully")
-                        print(f"✅ App can access repository: {self.repo_name}")
-                    else:
-                        print(f"❌ Failed to get installation token: {token_response.status_code}")
-                        self.headers = {}
-                else:
-                    print(f"❌ No installation found for repository: {self.repo_name}")
-                    print(f"   Please install the GitHub App on the repository")
-                    self.headers = {}
-            else:
-                print(f"❌ Failed to get installations: {response.status_code}")
-                self.headers = {}
-                
-        except Exception as e:
-            print(f"❌ Error getting installation token: {e}")
-            self.headers = {}
-    
-    def _generate_jwt(self) -> str:
-        """Generate JWT for GitHub App authentication"""
-        try:
-            with open(self.private_key_path, 'r') as f:
-                private_key = f.read()
-            
-            payload = {
-                'iat': int(time.time()),
-                'exp': int(time.time()) + 600,  # 10 minutes
-                'iss': int(self.app_id)
-            }
-            
-            return jwt.encode(payload, private_key, algorithm='RS256')
-            
-        except Exception as e:
-            raise Exception(f"Failed to generate JWT: {e}")
+        # The token manager mints the installation token once per process and
+        # refreshes it before expiry, so constructing this class is cheap.
+        token_manager = get_token_manager()
+        self.headers = token_manager.get_installation_headers(self.repo_name)
+        if not self.headers:
+            print(f"❌ Atim GitHub App authentication failed for repository: {self.repo_name}")
+            return
+        
+        # Rate limits are tracked per installation by the request scheduler
+        self.budget_key = f"installation:{token_manager.get_installation_id(self.repo_name)}"
     
     def create_issue(self, title: str, body: str, labels: List[str] = None) -> Dict:
         """Create a GitHub issue"""
@@ -174,9 +102,10 @@ class GitHubIntegrationSimple:
                 "labels": labels or []
             }
             
-            response = requests.post(
+            response = self.transport.post(
                 f"{self.base_url}/repos/{self.repo_name}/issues",
                 headers=self.headers,
+                budget_key=self.budget_key,
                 json=data
             )
             
@@ -199,9 +128,11 @@ class GitHubIntegrationSimple:
             return []
         
         try:
-            response = requests.get(
+            response = self.transport.get(
                 f"{self.base_url}/repos/{self.repo_name}/contents/{path}",
-                headers=self.headers
+                headers=self.headers,
+                budget_key=self.budget_key,
+                use_cache=True
             )
             
             if response.status_code == 200:
@@ -214,95 +145,140 @@ class GitHubIntegrationSimple:
             print(f"❌ Error getting repository contents: {e}")
             return []
     
-    def analyze_repository(self) -> List[IssueProposal]:
-        """Analyze the repository and generate issue proposals"""
+    def analyze_repository(self, progress: Callable[[Dict], None] = None) -> List[IssueProposal]:
+        """Analyze the repository and generate issue proposals
+
+        progress receives the file scanning counters of the analysis store.
+        """
+        return list(self.iter_proposals(progress))
+    
+    def iter_proposals(self, progress: Callable[[Dict], None] = None) -> Iterator[IssueProposal]:
+        """Yield issue proposals as the analysis produces them
+        
+        Rule findings of a file turn into proposals as soon as that file is
+        scanned, so the first proposal does not wait for the whole repository.
+        """
         if not self.headers:
-            return self._generate_sample_proposals()
+            yield from self._generate_sample_proposals()
+            return
         
-        proposals = []
+        # Only blobs not analyzed before under this ruleset are scanned
+        rule_set = get_rule_packs().current()
+        engine = rule_set.engine(*RULE_PACKS)
+        yield from self._iter_rule_issues(self._iter_files(engine, progress), rule_set)
         
         # Analyze different aspects of the codebase
-        proposals.extend(self._analyze_security_issues())
-        proposals.extend(self._analyze_performance_issues())
-        proposals.extend(self._analyze_code_quality_issues())
-        proposals.extend(self._analyze_documentation_issues())
-        proposals.extend(self._analyze_architecture_issues())
+        yield from self._analyze_duplicate_code_issues()
+        yield from self._analyze_documentation_issues()
+        yield from self._analyze_architecture_issues()
+    
+    def _get_head_sha(self) -> Optional[str]:
+        """Get the commit SHA at the head of the default branch"""
+        try:
+            response = self.transport.get(
+                f"{self.base_url}/repos/{self.repo_name}/commits/HEAD",
+                headers=dict(self.headers, Accept='application/vnd.github.sha'),
+                budget_key=self.budget_key,
+                use_cache=True
+            )
+            
+            if response.status_code == 200:
+                return response.text.strip()
+            else:
+                print(f"❌ Failed to get head commit: {response.status_code}")
+                return None
+                
+        except Exception as e:
+            print(f"❌ Error getting head commit: {e}")
+            return None
+    
+    def _iter_files(self, engine: RuleEngine,
+                    progress: Callable[[Dict], None] = None) -> Iterator[Tuple[str, List[Dict]]]:
+        """Rule findings per file at the head commit, as each file is analyzed
+
+        Line rule findings stream first; the search and duplicate indexes
+        and the structural rules follow once every file has been scanned,
+        adding a second entry for each file with structural findings.
+        """
+        if os.environ.get('GITHUB_ANALYSIS_BACKEND') == 'mirror':
+            snapshot = load_mirror_snapshot(
+                self.repo_name, get_token_manager().get_installation_token(self.repo_name),
+                tree_filter=get_tree_filter()
+            )
+        else:
+            sha = self._get_head_sha()
+            if not sha:
+                return
+            snapshot = load_snapshot(
+                self.repo_name, sha, self.headers, budget_key=self.budget_key, tree_filter=get_tree_filter()
+            )
+        if snapshot is None:
+            return
         
-        return proposals
+        with snapshot:
+            yield from get_analysis_store().iter_snapshot(
+                self.repo_name, snapshot, engine.version, engine.scan, CPP_EXTENSIONS,
+                executor=get_analysis_executor(), progress=progress, prefilter=GrepPrefilter(engine)
+            )
+            # The search index follows the analyzed snapshot, reading only new blobs
+            get_code_search().update_snapshot(self.repo_name, snapshot)
+            get_duplicate_index().update_snapshot(self.repo_name, snapshot, CPP_EXTENSIONS)
+            structural_findings = get_structural_analyzer().analyze_snapshot(snapshot, CPP_EXTENSIONS)
+            for path in sorted(structural_findings):
+                yield path, structural_findings[path]
     
-    def _analyze_security_issues(self) -> List[IssueProposal]:
-        """Analyze potential security issues"""
-        proposals = []
+    def analyze_diff(self, target: Union[int, str]) -> Optional[List[Dict]]:
+        """Rule findings on the added lines of a pull request number or 'base..head' range
         
-        # Check for common security patterns
-        security_patterns = [
-            {
-                'pattern': r'strcpy\s*\(',
-                'title': 'Use of unsafe strcpy function',
-                'description': 'The code uses strcpy which is vulnerable to buffer overflows. Consider using strncpy or std::string.',
-                'severity': 'high',
-                'category': 'security',
-                'labels': ['security', 'bug']
-            },
-            {
-                'pattern': r'sprintf\s*\(',
-                'title': 'Use of unsafe sprintf function',
-                'description': 'sprintf is vulnerable to buffer overflows. Use snprintf or std::string formatting.',
-                'severity': 'high',
-                'category': 'security',
-                'labels': ['security', 'bug']
-            },
-            {
-                'pattern': r'rand\s*\(',
-                'title': 'Use of predictable random number generation',
-                'description': 'rand() is not cryptographically secure. Use std::random_device or crypto-secure RNG for cryptographic operations.',
-                'severity': 'medium',
-                'category': 'security',
-                'labels': ['security', 'enhancement']
-            }
-        ]
+        Each finding carries the rule, the line in the new file and the diff
+        position used by review comments. Only line rules run here: patches
+        have no syntax tree, so the vector-push-back regex stays in place of
+        the structural rule that replaces it in full analyses.
+        """
+        if os.environ.get('GITHUB_ANALYSIS_BACKEND') == 'mirror' and '..' in str(target):
+            base, _, head = str(target).partition('..')
+            mirror = get_mirror(self.repo_name, get_token_manager().get_installation_token(self.repo_name))
+            files = mirror.diff_files(base, head.lstrip('.')) if mirror.fetch() else None
+        else:
+            files = fetch_diff_files(self.repo_name, target, self.headers, self.budget_key, self.transport)
+        if files is None:
+            return None
         
-        # For now, return sample security issues
-        proposals.append(IssueProposal(
-            id=str(len(proposals) + 1),
-            title="Potential buffer overflow in string handling",
-            description="The codebase contains instances of unsafe string operations that could lead to buffer overflows. Consider implementing safer alternatives.",
-            severity="high",
-            category="security",
-            labels=["security", "bug", "critical"]
-        ))
+        engine = get_rule_packs().current().engine(*RULE_PACKS)
+        findings = []
+        for file_path, file_findings in analyze_files(files, engine.scan, tree_filter=get_tree_filter()).items():
+            for finding in file_findings:
+                rule = engine.rules_by_id[finding['rule_id']]
+                findings.append({
+                    'rule_id': rule.id,
+                    'title': rule.title,
+                    'severity': rule.severity,
+                    'category': rule.category,
+                    'file_path': file_path,
+                    'line_number': finding['line'],
+                    'column': finding['column'],
+                    'position': finding['position']
+                })
         
-        return proposals
+        print(f"🔍 Diff analysis of {target}: {len(files)} files changed, {len(findings)} findings")
+        return findings
     
-    def _analyze_performance_issues(self) -> List[IssueProposal]:
-        """Analyze potential performance issues"""
-        proposals = []
-        
-        proposals.append(IssueProposal(
-            id=str(len(proposals) + 1),
-            title="Optimize blockchain validation performance",
-            description="The current validation algorithm could be optimized for better performance with large transaction volumes.",
-            severity="medium",
-            category="performance",
-            labels=["performance", "enhancement"]
-        ))
-        
-        return proposals
+    def _iter_rule_issues(self, file_findings: Iterable[Tuple[str, List[Dict]]],
+                          rule_set: RuleSet) -> Iterator[IssueProposal]:
+        """Analyze security, performance and code quality issues found by the rule packs"""
+        analyzer = get_structural_analyzer()
+        rules_by_prefix = {PROPOSAL_PREFIXES[pack]: rule_set.rules(pack) for pack in RULE_PACKS}
+        # Structural rules replace the line regexes they make more precise
+        rules_by_prefix['perf'] = [
+            rule for rule in rules_by_prefix['perf'] if rule.id not in analyzer.replaced_rules
+        ] + analyzer.rules
+        for fields in iter_rule_proposals(file_findings, rules_by_prefix):
+            yield IssueProposal(**fields)
     
-    def _analyze_code_quality_issues(self) -> List[IssueProposal]:
-        """Analyze code quality issues"""
-        proposals = []
-        
-        proposals.append(IssueProposal(
-            id=str(len(proposals) + 1),
-            title="Improve error handling in transaction processing",
-            description="Add more comprehensive error handling and logging for better debugging and reliability.",
-            severity="medium",
-            category="enhancement",
-            labels=["enhancement", "code-quality"]
-        ))
-        
-        return proposals
+    def _analyze_duplicate_code_issues(self) -> List[IssueProposal]:
+        """Analyze code copied between or within files"""
+        regions = get_duplicate_index().duplicates(self.repo_name)
+        return [IssueProposal(**fields) for fields in duplicate_proposals(regions)]
     
     def _analyze_documentation_issues(self) -> List[IssueProposal]:
         """Analyze documentation issues"""
@@ -408,64 +384,25 @@ class GitHubIntegrationSimple:
             }
         
         try:
-            # Get repository information
-            response = requests.get(
-                f"{self.base_url}/repos/{self.repo_name}",
-                headers=self.headers
-            )
+            # Stars, forks, open issue/PR counts and metadata in one GraphQL query
+            stats = get_stats_provider().get_stats(self.repo_name, self.headers, budget_key=self.budget_key)
             
-            if response.status_code == 200:
-                repo_data = response.json()
-                
-                # Get issues count
-                issues_response = requests.get(
-                    f"{self.base_url}/repos/{self.repo_name}/issues",
-                    headers=self.headers,
-                    params={'state': 'open', 'per_page': 1}
-                )
-                
-                issues_count = 0
-                if issues_response.status_code == 200:
-                    # Get total count from Link header if available
-                    link_header = issues_response.headers.get('Link', '')
-                    if 'rel="last"' in link_header:
-                        # Extract page number from last link
-                        import re
-                        match = re.search(r'page=(\d+)>; rel="last"', link_header)
-                        if match:
-                            issues_count = int(match.group(1))
-                
-                # Get pull requests count
-                pr_response = requests.get(
-                    f"{self.base_url}/repos/{self.repo_name}/pulls",
-                    headers=self.headers,
-                    params={'state': 'open', 'per_page': 1}
-                )
-                
-                pr_count = 0
-                if pr_response.status_code == 200:
-                    link_header = pr_response.headers.get('Link', '')
-                    if 'rel="last"' in link_header:
-                        import re
-                        match = re.search(r'page=(\d+)>; rel="last"', link_header)
-                        if match:
-                            pr_count = int(match.group(1))
-                
+            if stats:
                 return {
-                    'repository': repo_data.get('full_name', self.repo_name),
-                    'description': repo_data.get('description', 'No description'),
-                    'issues_count': issues_count,
-                    'pull_requests_count': pr_count,
-                    'stars_count': repo_data.get('stargazers_count', 0),
-                    'forks_count': repo_data.get('forks_count', 0),
-                    'last_updated': repo_data.get('updated_at'),
-                    'default_branch': repo_data.get('default_branch', 'main'),
-                    'language': repo_data.get('language', 'Unknown'),
-                    'size': repo_data.get('size', 0)
+                    'repository': stats['repository'],
+                    'description': stats['description'],
+                    'issues_count': stats['open_issues'],
+                    'pull_requests_count': stats['open_pulls'],
+                    'stars_count': stats['stars'],
+                    'forks_count': stats['forks'],
+                    'last_updated': stats['last_updated'],
+                    'default_branch': stats['default_branch'],
+                    'language': stats['language'],
+                    'size': stats['size']
                 }
             else:
                 return {
-                    'error': f'Failed to get repository data: {response.status_code}',
+                    'error': 'Failed to get repository data',
                     'repository': self.repo_name,
                     'issues_count': 0,
                     'pull_requests_count': 0,
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - GitHub Request Scheduler
+============================================
+
+Rate-limit-aware gate in front of every GitHub call made through the shared
+transport. The scheduler tracks X-RateLimit-Remaining / X-RateLimit-Reset
+per installation, keeps a reserve of the budget for user-facing requests,
+honours Retry-After on primary and secondary limits, and paces
+content-creating writes. When the budget is low, calls are queued by
+priority and delayed instead of failing. Writes are paced by a separate
+write gate before they join the queue, so a write waiting out the write
+interval never holds up reads. Waiting calls sleep on a condition and are
+woken when the call ahead of them leaves or the budget changes.
+"""
+
+import os
+import time
+import heapq
+import itertools
+import threading
+import requests
+from typing import Callable, Dict, Optional
+
+# Lower numbers are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+WRITE_METHODS = {'POST', 'PATCH', 'PUT', 'DELETE'}
+
+# GitHub asks integrations to wait at least a minute after a secondary limit
+SECONDARY_LIMIT_BACKOFF = 60
+
+
+class _Budget:
+    """Rate limit state for one installation or token"""
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset_at = 0.0
+        self.blocked_until = 0.0
+        # Write gate: writes in flight through the queue, and when the next may start
+        self.writers = 0
+        self.next_write_at = 0.0
+        self.queue = []
+        self.delayed_calls = 0
+        self.rate_limited_responses = 0
+
+
+class GitHubRequestScheduler:
+    """Queues, delays and retries GitHub calls according to the remaining budget"""
+
+    def __init__(self, background_reserve: int = None, min_write_interval: float = None,
+                 max_interactive_wait: float = None, max_retries: int = None):
+        self.background_reserve = background_reserve if background_reserve is not None else int(
+            os.environ.get('GITHUB_BACKGROUND_RESERVE', 500)
+        )
+        self.min_write_interval = min_write_interval if min_write_interval is not None else float(
+            os.environ.get('GITHUB_MIN_WRITE_INTERVAL', 1.0)
+        )
+        self.max_interactive_wait = max_interactive_wait if max_interactive_wait is not None else float(
+            os.environ.get('GITHUB_MAX_INTERACTIVE_WAIT', 30)
+        )
+        self.max_retries = max_retries if max_retries is not None else int(
+            os.environ.get('GITHUB_RATE_LIMIT_RETRIES', 3)
+        )
+
+        self._condition = threading.Condition()
+        self._budgets = {}
+        self._sequence = itertools.count()
+
+    def execute(self, send: Callable[[], requests.Response], budget_key: str,
+                priority: int = PRIORITY_INTERACTIVE, is_write: bool = False) -> requests.Response:
+        """Run send() once the budget allows it, retrying on rate limit responses"""
+        response = None
+        for attempt in range(self.max_retries + 1):
+            self.acquire(budget_key, priority, is_write)
+            response = send()
+
+            retry_after = self.record(budget_key, response, attempt)
+            if retry_after is None or attempt == self.max_retries:
+                return response
+
+            if priority <= PRIORITY_INTERACTIVE and retry_after > self.max_interactive_wait:
+                print(f"⚠️  GitHub rate limit reached; retry after {retry_after:.0f}s is too long for an interactive call")
+                return response
+
+            response.close()
+            print(f"⏳ GitHub rate limit reached, retrying in {retry_after:.0f}s (attempt {attempt + 1}/{self.max_retries})")
+
+        return response
+
+    def acquire(self, budget_key: str, priority: int = PRIORITY_INTERACTIVE, is_write: bool = False):
+        """Block until this call may be sent"""
+        with self._condition:
+            budget = self._budgets.setdefault(budget_key, _Budget())
+
+            deadline = None
+            if priority <= PRIORITY_INTERACTIVE:
+                deadline = time.time() + self.max_interactive_wait
+
+            delayed = False
+            if is_write:
+                # One write at a time, min_write_interval apart, waiting outside the queue
+                while budget.writers or time.time() < budget.next_write_at:
+                    timeout = None if budget.writers else budget.next_write_at - time.time()
+                    if not self._wait(timeout, deadline):
+                        break
+                    delayed = True
+                budget.writers += 1
+
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(budget.queue, ticket)
+            try:
+                while True:
+                    delay = self._delay(budget, ticket, priority, time.time())
+                    if delay == 0 or not self._wait(delay, deadline):
+                        break
+                    delayed = True
+            finally:
+                budget.queue.remove(ticket)
+                heapq.heapify(budget.queue)
+                if delayed:
+                    budget.delayed_calls += 1
+                if is_write:
+                    budget.writers -= 1
+                    budget.next_write_at = time.time() + self.min_write_interval
+                self._condition.notify_all()
+
+            if budget.remaining is not None:
+                budget.remaining -= 1
+
+    def _wait(self, timeout: Optional[float], deadline: Optional[float]) -> bool:
+        """Wait on the condition for up to timeout seconds (None: until notified)
+
+        Returns False without waiting once an interactive call's deadline
+        has passed, so it is sent anyway.
+        """
+        if deadline is not None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        self._condition.wait(timeout=timeout)
+        return True
+
+    def record(self, budget_key: str, response: requests.Response, attempt: int = 0) -> Optional[float]:
+        """Update the budget from response headers; return a retry delay when rate limited"""
+        headers = response.headers
+        now = time.time()
+
+        with self._condition:
+            budget = self._budgets.setdefault(budget_key, _Budget())
+
+            if headers.get('X-RateLimit-Remaining') is not None:
+                budget.remaining = int(headers['X-RateLimit-Remaining'])
+                budget.limit = int(headers.get('X-RateLimit-Limit', budget.limit or 0)) or None
+                budget.reset_at = float(headers.get('X-RateLimit-Reset', budget.reset_at))
+
+            retry_after = self._retry_after(response, budget, now, attempt)
+            if retry_after is not None:
+                budget.rate_limited_responses += 1
+                budget.blocked_until = max(budget.blocked_until, now + retry_after)
+
+            self._condition.notify_all()
+            return retry_after
+
+    def stats(self) -> Dict[str, Dict]:
+        now = time.time()
+        with self._condition:
+            return {
+                key: {
+                    'limit': budget.limit,
+                    'remaining': budget.remaining,
+                    'resets_in': max(round(budget.reset_at - now), 0) if budget.reset_at else None,
+                    'blocked_for': max(round(budget.blocked_until - now), 0),
+                    'queued': len(budget.queue),
+                    'delayed_calls': budget.delayed_calls,
+                    'rate_limited_responses': budget.rate_limited_responses
+                }
+                for key, budget in self._budgets.items()
+            }
+
+    def _delay(self, budget: _Budget, ticket, priority: int, now: float) -> Optional[float]:
+        """Seconds this ticket still has to wait, or 0 when it may go
+
+        None means tickets ahead of it are still queued; the one that leaves
+        wakes it.
+        """
+        if budget.queue[0] != ticket:
+            # Someone with a higher priority (or an earlier ticket) goes first
+            return None
+
+        if now < budget.blocked_until:
+            return budget.blocked_until - now
+
+        reserve = self.background_reserve if priority > PRIORITY_INTERACTIVE else 0
+        if budget.remaining is not None and budget.remaining <= reserve and now < budget.reset_at:
+            return budget.reset_at - now
+
+        return 0
+
+    @staticmethod
+    def _retry_after(response: requests.Response, budget: _Budget, now: float, attempt: int) -> Optional[float]:
+        if response.status_code not in (403, 429):
+            return None
+
+        headers = response.headers
+        if headers.get('Retry-After'):
+            return float(headers['Retry-After'])
+
+        if headers.get('X-RateLimit-Remaining') == '0':
+            return max(budget.reset_at - now, 0) + 1
+
+        if 'rate limit' in response.text.lower():
+            # Secondary limit without a Retry-After header: back off exponentially
+            return SECONDARY_LIMIT_BACKOFF * (2 ** attempt)
+
+        return None
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Repository Stats Provider
+=============================================
+
+Fetches repository statistics with a single GraphQL query instead of
+several REST calls (or paging through every open pull request with
+PyGithub). Results are cached per repository for a short TTL.
+"""
+
+import os
+import time
+import threading
+from typing import Dict, Optional
+from github_transport import GitHubTransport, get_transport
+
+STATS_QUERY = """
+query RepositoryStats($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    nameWithOwner
+    description
+    stargazerCount
+    forkCount
+    diskUsage
+    updatedAt
+    defaultBranchRef { name }
+    primaryLanguage { name }
+    issues(states: OPEN) { totalCount }
+    pullRequests(states: OPEN) { totalCount }
+  }
+}
+"""
+
+
+class RepositoryStatsProvider:
+    """One-round-trip repository statistics with a TTL cache"""
+
+    def __init__(self, ttl: float = None, transport: GitHubTransport = None):
+        self.ttl = ttl if ttl is not None else float(os.environ.get('GITHUB_STATS_TTL', 60))
+        self.transport = transport
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    def get_stats(self, repo_name: str, headers: Dict[str, str], budget_key: str = None) -> Optional[Dict]:
+        """Return normalized stats for a repository, or None if the query failed"""
+        with self._lock:
+            cached = self._cache.get(repo_name)
+            if cached and time.time() < cached[0]:
+                return dict(cached[1])
+
+        stats = self._query(repo_name, headers, budget_key)
+        if stats is None:
+            return None
+
+        with self._lock:
+            self._cache[repo_name] = (time.time() + self.ttl, stats)
+        return dict(stats)
+
+    def invalidate(self, repo_name: str = None):
+        with self._lock:
+            if repo_name:
+                self._cache.pop(repo_name, None)
+            else:
+                self._cache.clear()
+
+    def _query(self, repo_name: str, headers: Dict[str, str], budget_key: str = None) -> Optional[Dict]:
+        owner, name = repo_name.split('/', 1)
+
+        try:
+            response = (self.transport or get_transport()).post(
+                '/graphql',
+                headers=headers,
+                json={'query': STATS_QUERY, 'variables': {'owner': owner, 'name': name}},
+                # GraphQL reads are POSTs but have their own point budget
+                budget_key=f"{budget_key}:graphql" if budget_key else None,
+                is_write=False
+            )
+
+            if response.status_code != 200:
+                print(f"❌ Failed to get repository stats: {response.status_code}")
+                return None
+
+            payload = response.json()
+            repository = (payload.get('data') or {}).get('repository')
+            if not repository:
+                print(f"❌ Failed to get repository stats: {payload.get('errors')}")
+                return None
+
+            return {
+                'repository': repository['nameWithOwner'],
+                'description': repository['description'],
+                'stars': repository['stargazerCount'],
+                'forks': repository['forkCount'],
+                'open_issues': repository['issues']['totalCount'],
+                'open_pulls': repository['pullRequests']['totalCount'],
+                'default_branch': (repository['defaultBranchRef'] or {}).get('name', 'main'),
+                'language': (repository['primaryLanguage'] or {}).get('name'),
+                'last_updated': repository['updatedAt'],
+                'size': repository['diskUsage'] or 0
+            }
+
+        except Exception as e:
+            print(f"❌ Error getting repository stats: {e}")
+            return None
+
+
+_stats_provider = None
+_stats_provider_lock = threading.Lock()
+
+
+def get_stats_provider() -> RepositoryStatsProvider:
+    """Return the process-wide stats provider"""
+    global _stats_provider
+    with _stats_provider_lock:
+        if _stats_provider is None:
+            _stats_provider = RepositoryStatsProvider()
+        return _stats_provider
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - GitHub App Token Manager
+============================================
+
+Process-wide cache for GitHub App credentials. The private key is read once,
+the app JWT is reused until shortly before it expires, and installation
+access tokens are minted once and refreshed ahead of their one-hour expiry.
+
+Tokens are also written to a shared cache file guarded by an exclusive file
+lock, so Gunicorn workers on the same host reuse a single installation token
+instead of each minting their own.
+"""
+
+import os
+import json
+import time
+import calendar
+import tempfile
+import threading
+import jwt
+from typing import Dict, Optional
+from dotenv import load_dotenv
+from github_transport import GITHUB_API_URL, USER_AGENT, get_transport
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines
+    fcntl = None
+
+# Refresh installation tokens this many seconds before GitHub expires them
+TOKEN_REFRESH_MARGIN = 300
+# App JWTs are valid for 10 minutes; reuse them for most of that window
+JWT_LIFETIME = 600
+JWT_REFRESH_MARGIN = 60
+
+
+class GitHubTokenManager:
+    """Mints and caches GitHub App JWTs and installation access tokens"""
+
+    def __init__(self, app_id: str = None, private_key_path: str = None,
+                 installation_id: str = None, cache_path: str = None):
+        load_dotenv()
+
+        self.app_id = app_id or os.environ.get('GITHUB_APP_ID')
+        self.private_key_path = private_key_path or os.environ.get('GITHUB_APP_PRIVATE_KEY_PATH')
+        self.installation_id = installation_id or os.environ.get('GITHUB_APP_INSTALLATION_ID')
+        self.base_url = GITHUB_API_URL
+
+        self.cache_path = cache_path or os.environ.get('GITHUB_TOKEN_CACHE_PATH') or os.path.join(
+            tempfile.gettempdir(), f"atim_github_tokens_{self.app_id or 'unconfigured'}.json"
+        )
+
+        self._lock = threading.RLock()
+        self._private_key = None
+        self._jwt = None
+        self._jwt_expires_at = 0
+        # installation id -> {'token': str, 'expires_at': float}
+        self._tokens = {}
+        # repository owner -> installation id
+        self._installations = {}
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.app_id and self.private_key_path)
+
+    def get_app_headers(self) -> Dict[str, str]:
+        """Headers for app-level API calls, authenticated with the app JWT"""
+        return {
+            'Authorization': f'Bearer {self.get_app_jwt()}',
+            'Accept': 'application/vnd.github.v3+json',
+            'User-Agent': USER_AGENT
+        }
+
+    def get_installation_headers(self, repo_name: str = None) -> Dict[str, str]:
+        """Headers for repository API calls, or {} when no token is available"""
+        token = self.get_installation_token(repo_name)
+        if not token:
+            return {}
+
+        return {
+            'Authorization': f'Bearer {token}',
+            'Accept': 'application/vnd.github.v3+json',
+            'User-Agent': USER_AGENT
+        }
+
+    def get_app_jwt(self) -> str:
+        """Return a cached app JWT, signing a new one when it is about to expire"""
+        with self._lock:
+            now = time.time()
+            if self._jwt and now < self._jwt_expires_at - JWT_REFRESH_MARGIN:
+                return self._jwt
+
+            if not self.configured:
+                raise Exception("GitHub App credentials not configured")
+
+            if self._private_key is None:
+                with open(self.private_key_path, 'r') as f:
+                    self._private_key = f.read()
+
+            issued_at = int(now)
+            payload = {
+                'iat': issued_at,
+                'exp': issued_at + JWT_LIFETIME,
+                'iss': str(self.app_id)
+            }
+
+            self._jwt = jwt.encode(payload, self._private_key, algorithm='RS256')
+            self._jwt_expires_at = issued_at + JWT_LIFETIME
+            return self._jwt
+
+    def get_installation_id(self, repo_name: str = None) -> Optional[str]:
+        """Resolve the installation id for a repository owner, cached per process"""
+        if self.installation_id:
+            return str(self.installation_id)
+
+        owner = (repo_name or os.environ.get('GITHUB_REPO', 'NiloticNetwork/NiloticNetworkBlockchain')).split('/')[0]
+
+        with self._lock:
+            if owner in self._installations:
+                return self._installations[owner]
+
+            response = get_transport().get(
+                f"{self.base_url}/app/installations", headers=self.get_app_headers(), budget_key='app'
+            )
+            if response.status_code != 200:
+                print(f"❌ Failed to get installations: {response.status_code}")
+                return None
+
+            for installation in response.json():
+                login = installation.get('account', {}).get('login')
+                if login:
+                    self._installations[login] = str(installation['id'])
+
+            if owner not in self._installations:
+                print(f"❌ No installation found for account: {owner}")
+                print(f"   Please install the GitHub App on the repository")
+                return None
+
+            print(f"✅ Found installation ID: {self._installations[owner]}")
+            return self._installations[owner]
+
+    def get_installation_token(self, repo_name: str = None) -> Optional[str]:
+        """Return a valid installation access token, minting one only when needed"""
+        if not self.configured:
+            return None
+
+        try:
+            installation_id = self.get_installation_id(repo_name)
+            if not installation_id:
+                return None
+
+            with self._lock:
+                cached = self._tokens.get(installation_id)
+                if self._is_fresh(cached):
+                    return cached['token']
+
+                # Another worker may already have refreshed the token
+                with self._shared_cache() as shared:
+                    cached = shared.get(installation_id)
+                    if not self._is_fresh(cached):
+                        cached = self._mint_installation_token(installation_id)
+                        if cached:
+                            shared[installation_id] = cached
+
+                if not cached:
+                    return None
+
+                self._tokens[installation_id] = cached
+                return cached['token']
+
+        except Exception as e:
+            print(f"❌ Error getting installation token: {e}")
+            return None
+
+    def invalidate(self, repo_name: str = None):
+        """Drop cached tokens, e.g. after GitHub rejects one with 401"""
+        with self._lock:
+            installation_id = self.installation_id or self._installations.get(
+                (repo_name or '').split('/')[0]
+            )
+            if installation_id:
+                self._tokens.pop(str(installation_id), None)
+                with self._shared_cache() as shared:
+                    shared.pop(str(installation_id), None)
+            else:
+                self._tokens.clear()
+
+    def _mint_installation_token(self, installation_id: str) -> Optional[Dict]:
+        response = get_transport().post(
+            f"{self.base_url}/app/installations/{installation_id}/access_tokens",
+            headers=self.get_app_headers(),
+            budget_key='app',
+            is_write=False
+        )
+
+        if response.status_code != 201:
+            print(f"❌ Failed to get installation token: {response.status_code}")
+            print(f"   Response: {response.text}")
+            return None
+
+        token_data = response.json()
+        print(f"✅ Installation token generated (expires {token_data['expires_at']})")
+
+        return {
+            'token': token_data['token'],
+            'expires_at': calendar.timegm(time.strptime(token_data['expires_at'], '%Y-%m-%dT%H:%M:%SZ'))
+        }
+
+    @staticmethod
+    def _is_fresh(cached: Optional[Dict]) -> bool:
+        return bool(cached) and time.time() < cached['expires_at'] - TOKEN_REFRESH_MARGIN
+
+    def _shared_cache(self):
+        return _SharedTokenFile(self.cache_path)
+
+
+class _SharedTokenFile:
+    """Exclusive-locked JSON token file shared by worker processes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data = {}
+        self._fd = None
+
+    def __enter__(self) -> Dict:
+        try:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+            raw = b''
+            while True:
+                chunk = os.read(self._fd, 65536)
+                if not chunk:
+                    break
+                raw += chunk
+            self.data = json.loads(raw) if raw else {}
+        except (OSError, ValueError):
+            self.data = {}
+
+        self._original = dict(self.data)
+        return self.data
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._fd is None:
+            return False
+
+        try:
+            if exc_type is None and self.data != self._original:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                os.ftruncate(self._fd, 0)
+                os.write(self._fd, json.dumps(self.data).encode('utf-8'))
+        except OSError as e:
+            print(f"⚠️  Could not update token cache {self.path}: {e}")
+        finally:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+        return False
+
+
+_token_manager = None
+_token_manager_lock = threading.Lock()
+
+
+def get_token_manager() -> GitHubTokenManager:
+    """Return the process-wide token manager"""
+    global _token_manager
+    with _token_manager_lock:
+        if _token_manager is None:
+            _token_manager = GitHubTokenManager()
+        return _token_manager
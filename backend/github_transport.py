@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - GitHub HTTP Transport
+=========================================
+
+Shared keep-alive HTTP layer for GitHub REST calls. Every integration sends
+its requests through one pooled requests.Session, so TLS connections to
+api.github.com are reused instead of being opened per call. Cacheable GETs
+are revalidated through the conditional request cache, and every request
+that reaches the network is gated by the rate-limit-aware scheduler.
+"""
+
+import os
+import time
+import hashlib
+import threading
+import requests
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from github_http_cache import ConditionalRequestCache
+from github_scheduler import GitHubRequestScheduler, PRIORITY_INTERACTIVE, WRITE_METHODS
+
+GITHUB_API_URL = "https://api.github.com"
+USER_AGENT = "Atim-AI-Assistant/1.0"
+
+DEFAULT_HEADERS = {
+    'Accept': 'application/vnd.github.v3+json',
+    'User-Agent': USER_AGENT
+}
+
+
+class GitHubTransport:
+    """Pooled keep-alive session for GitHub API calls"""
+
+    def __init__(self, base_url: str = GITHUB_API_URL, pool_size: int = None,
+                 connect_retries: int = None, timeout: float = None,
+                 cache: ConditionalRequestCache = None,
+                 scheduler: GitHubRequestScheduler = None):
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size or int(os.environ.get('GITHUB_HTTP_POOL_SIZE', 10))
+        self.connect_retries = connect_retries if connect_retries is not None else int(
+            os.environ.get('GITHUB_HTTP_CONNECT_RETRIES', 3)
+        )
+        self.timeout = timeout or float(os.environ.get('GITHUB_HTTP_TIMEOUT', 30))
+
+        # Only connection failures are retried here: the request never reached
+        # GitHub, so retrying is safe for writes as well as reads.
+        retry = Retry(
+            total=self.connect_retries,
+            connect=self.connect_retries,
+            read=0,
+            status=0,
+            backoff_factor=0.3
+        )
+        self._adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retry
+        )
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.session.mount('https://', self._adapter)
+        self.session.mount('http://', self._adapter)
+
+        self.cache = cache or ConditionalRequestCache()
+        self.scheduler = scheduler or GitHubRequestScheduler()
+
+        self._lock = threading.Lock()
+        self._requests_by_host = {}
+
+    def request(self, method: str, url: str, use_cache: bool = False,
+                priority: int = PRIORITY_INTERACTIVE, budget_key: str = None,
+                is_write: Optional[bool] = None, **kwargs) -> requests.Response:
+        """Send a request, resolving paths like '/repos/...' against the API URL
+
+        priority ranks the call in the scheduler queue (user-facing reads use
+        PRIORITY_INTERACTIVE, analysis uses PRIORITY_BACKGROUND). budget_key
+        names the rate limit bucket, normally 'installation:<id>'; it defaults
+        to one derived from the Authorization header.
+        """
+        if url.startswith('/'):
+            url = f"{self.base_url}{url}"
+
+        kwargs.setdefault('timeout', self.timeout)
+
+        if budget_key is None:
+            budget_key = self._default_budget_key(kwargs.get('headers'))
+        if is_write is None:
+            is_write = method.upper() in WRITE_METHODS
+        schedule = {'priority': priority, 'budget_key': budget_key, 'is_write': is_write}
+
+        if use_cache and method == 'GET' and not kwargs.get('stream'):
+            return self._cached_get(url, schedule, **kwargs)
+
+        return self._send(method, url, schedule, **kwargs)
+
+    def get(self, url: str, use_cache: bool = False, **kwargs) -> requests.Response:
+        return self.request('GET', url, use_cache=use_cache, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> requests.Response:
+        return self.request('PATCH', url, **kwargs)
+
+    def _send(self, method: str, url: str, schedule: Dict, **kwargs) -> requests.Response:
+        host = urlsplit(url).hostname
+
+        def send():
+            with self._lock:
+                self._requests_by_host[host] = self._requests_by_host.get(host, 0) + 1
+            return self.session.request(method, url, **kwargs)
+
+        return self.scheduler.execute(send, **schedule)
+
+    def _cached_get(self, url: str, schedule: Dict, **kwargs) -> requests.Response:
+        headers = dict(self.session.headers)
+        headers.update(kwargs.pop('headers', None) or {})
+
+        key = self.cache.make_key(url, kwargs.get('params'), headers)
+        entry = self.cache.get(key)
+
+        if entry is not None and time.time() < entry.fresh_until:
+            self.cache.record('hits')
+            return self.cache.to_response(entry)
+
+        if entry is not None:
+            headers.update(self.cache.conditional_headers(entry))
+
+        response = self._send('GET', url, schedule, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.record('not_modified')
+            self.cache.refresh(entry, response)
+            return self.cache.to_response(entry)
+
+        self.cache.record('misses')
+        self.cache.store(key, response)
+        return response
+
+    @staticmethod
+    def _default_budget_key(headers: Optional[Dict]) -> str:
+        authorization = (headers or {}).get('Authorization')
+        if not authorization:
+            return 'anonymous'
+        return 'token:' + hashlib.sha256(authorization.encode('utf-8')).hexdigest()[:12]
+
+    def connection_stats(self) -> Dict[str, Dict]:
+        """Per-host request counts versus new TCP/TLS connections opened"""
+        connections_by_host = {}
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections_by_host[pool.host] = connections_by_host.get(pool.host, 0) + pool.num_connections
+
+        with self._lock:
+            requests_by_host = dict(self._requests_by_host)
+
+        stats = {}
+        for host, request_count in requests_by_host.items():
+            new_connections = connections_by_host.get(host, 0)
+            stats[host] = {
+                'requests': request_count,
+                'new_connections': new_connections,
+                'reused_connections': max(request_count - new_connections, 0),
+                'reuse_ratio': round(1 - new_connections / request_count, 3) if request_count else 0.0
+            }
+
+        return stats
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> GitHubTransport:
+    """Return the process-wide GitHub transport"""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = GitHubTransport()
+        return _transport
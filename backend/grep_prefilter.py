@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Grep Prefilter
+==================================
+
+Hands candidate-file discovery to native tools. When every rule of an
+engine is anchored on a literal, a file that contains none of those
+literals cannot produce a finding, so `git grep -F` (for mirror snapshots)
+or ripgrep (for snapshots spilled to disk) lists the files worth scanning
+and the Python regex engine only runs on those. Snapshots held in memory,
+engines with unanchored rules, and missing or failing tools all yield
+None, which means "scan everything".
+"""
+
+import os
+import shutil
+import subprocess
+from typing import List, Optional, Set
+from rule_engine import RuleEngine
+
+
+def git_grep_candidates(git_dir: str, sha: str, literals: List[str]) -> Optional[Set[str]]:
+    """Paths at a commit containing any of the literals, via git grep"""
+    command = ['git', '--git-dir', git_dir, 'grep', '-l', '-z', '-F', '-I', '--no-color']
+    for literal in literals:
+        command += ['-e', literal]
+    command.append(sha)
+
+    try:
+        result = subprocess.run(command, capture_output=True)
+    except OSError as e:
+        print(f"⚠️  git grep unavailable: {e}")
+        return None
+
+    # Exit status 1 means no file matched
+    if result.returncode not in (0, 1):
+        print(f"⚠️  git grep failed: {result.stderr.decode('utf-8', errors='replace').strip()}")
+        return None
+
+    prefix = f"{sha}:"
+    return {
+        path[len(prefix):] if path.startswith(prefix) else path
+        for path in result.stdout.decode('utf-8').split('\0') if path
+    }
+
+
+def ripgrep_candidates(directory: str, literals: List[str]) -> Optional[Set[str]]:
+    """Paths under a directory containing any of the literals, via ripgrep"""
+    rg = shutil.which('rg')
+    if rg is None:
+        return None
+
+    command = [rg, '-l', '-0', '-F', '--no-messages', '--no-ignore', '--hidden']
+    for literal in literals:
+        command += ['-e', literal]
+    command += ['--', '.']
+
+    try:
+        result = subprocess.run(command, capture_output=True, cwd=directory)
+    except OSError as e:
+        print(f"⚠️  ripgrep unavailable: {e}")
+        return None
+
+    if result.returncode not in (0, 1):
+        print(f"⚠️  ripgrep failed: {result.stderr.decode('utf-8', errors='replace').strip()}")
+        return None
+
+    return {
+        os.path.normpath(path).replace(os.sep, '/')
+        for path in result.stdout.decode('utf-8').split('\0') if path
+    }
+
+
+class GrepPrefilter:
+    """Candidate files of a snapshot for a fully literal-anchored rule engine"""
+
+    def __init__(self, engine: RuleEngine):
+        self.engine = engine
+
+    def __call__(self, snapshot) -> Optional[Set[str]]:
+        if not self.engine.fully_anchored:
+            return None
+
+        mirror = getattr(snapshot, 'mirror', None)
+        if mirror is not None and snapshot.sha:
+            candidates = git_grep_candidates(mirror.path, snapshot.sha, self.engine.literals)
+        elif snapshot.on_disk:
+            candidates = ripgrep_candidates(snapshot.directory, self.engine.literals)
+        else:
+            candidates = None
+
+        if candidates is not None:
+            print(f"🔍 Prefilter: {len(candidates)} of {snapshot.file_count} files contain a rule literal")
+        return candidates
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Line Index
+==============================
+
+Maps character offsets in a file to line and column numbers. Newline
+offsets are collected once per file; each lookup is then a binary search,
+so attaching positions to thousands of rule matches stays O(log n) per
+match instead of re-splitting the file for every finding.
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import Tuple
+
+
+class LineIndex:
+    """Newline offsets of one file with bisect lookups"""
+
+    def __init__(self, content: str):
+        self.length = len(content)
+
+        # Offset at which each line starts; line 1 starts at 0
+        self._line_starts = array('q', [0])
+        position = content.find('\n')
+        while position != -1:
+            self._line_starts.append(position + 1)
+            position = content.find('\n', position + 1)
+
+    @property
+    def line_count(self) -> int:
+        return len(self._line_starts)
+
+    def line_of(self, offset: int) -> int:
+        """1-based line number containing the offset"""
+        return bisect_right(self._line_starts, offset)
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """1-based (line, column) of the offset"""
+        line = self.line_of(offset)
+        return line, offset - self._line_starts[line - 1] + 1
+
+    def line_start(self, line: int) -> int:
+        """Offset of the first character of a 1-based line"""
+        return self._line_starts[line - 1]
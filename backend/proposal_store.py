@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Proposal Store
+==================================
+
+Persists issue proposals in the `proposals` table. Each proposal gets a
+stable id derived from its content, so the same finding keeps the same id
+across analysis runs and approve/reject become primary key lookups instead
+of a fresh repository analysis. Statuses (approved, rejected, published)
+survive later runs.
+"""
+
+import json
+import hashlib
+import sqlite3
+from typing import Dict, Iterable, List, Optional
+
+PROPOSAL_COLUMNS = (
+    'id', 'repo_name', 'title', 'description', 'severity', 'category', 'file_path',
+    'line_number', 'suggested_fix', 'labels', 'status', 'github_issue_number', 'created_at'
+)
+
+CREATE_PROPOSALS_TABLE = '''
+CREATE TABLE IF NOT EXISTS proposals (
+    id TEXT PRIMARY KEY,
+    repo_name TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    category TEXT NOT NULL,
+    file_path TEXT,
+    line_number INTEGER,
+    suggested_fix TEXT,
+    labels TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    github_issue_number INTEGER,
+    created_at TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+'''
+
+
+def proposal_id(repo_name: str, proposal) -> str:
+    """Content hash identifying a proposal across analysis runs"""
+    key = '|'.join([repo_name, proposal.category, proposal.title, proposal.file_path or ''])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+
+def save_proposals(db: sqlite3.Connection, repo_name: str, proposals: Iterable) -> List[str]:
+    """Write one analysis run's proposals, keeping the status of known ones
+
+    Pending proposals that the run no longer produced are removed; reviewed
+    ones are kept as history. Proposal ids are replaced by their stable ids.
+    """
+    ids = [save_proposal(db, repo_name, proposal, commit=False) for proposal in proposals]
+    prune_proposals(db, repo_name, ids)
+    return ids
+
+
+def save_proposal(db: sqlite3.Connection, repo_name: str, proposal, commit: bool = True) -> str:
+    """Upsert one proposal under its stable id, keeping its status if known"""
+    proposal.id = proposal_id(repo_name, proposal)
+    db.execute('''
+        INSERT INTO proposals (id, repo_name, title, description, severity, category, file_path,
+                               line_number, suggested_fix, labels, status, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending', ?)
+        ON CONFLICT(id) DO UPDATE SET
+            description = excluded.description,
+            severity = excluded.severity,
+            line_number = excluded.line_number,
+            suggested_fix = excluded.suggested_fix,
+            labels = excluded.labels,
+            updated_at = CURRENT_TIMESTAMP
+    ''', (
+        proposal.id,
+        repo_name,
+        proposal.title,
+        proposal.description,
+        proposal.severity,
+        proposal.category,
+        proposal.file_path,
+        proposal.line_number,
+        proposal.suggested_fix,
+        json.dumps(proposal.labels or []),
+        proposal.created_at
+    ))
+    if commit:
+        db.commit()
+    return proposal.id
+
+
+def prune_proposals(db: sqlite3.Connection, repo_name: str, ids: List[str]):
+    """Remove pending proposals of a repository that a completed run did not produce"""
+    placeholders = ','.join('?' * len(ids))
+    db.execute(
+        f"DELETE FROM proposals WHERE repo_name = ? AND status = 'pending' AND id NOT IN ({placeholders})",
+        [repo_name] + ids
+    )
+    db.commit()
+
+
+def list_proposals(db: sqlite3.Connection, repo_name: str) -> List[Dict]:
+    rows = db.execute(
+        f"SELECT {', '.join(PROPOSAL_COLUMNS)} FROM proposals WHERE repo_name = ? "
+        "ORDER BY created_at, rowid",
+        (repo_name,)
+    ).fetchall()
+    return [_row_to_dict(row) for row in rows]
+
+
+def get_proposal(db: sqlite3.Connection, proposal_id: str) -> Optional[Dict]:
+    row = db.execute(
+        f"SELECT {', '.join(PROPOSAL_COLUMNS)} FROM proposals WHERE id = ?",
+        (proposal_id,)
+    ).fetchone()
+    return _row_to_dict(row) if row else None
+
+
+def update_status(db: sqlite3.Connection, proposal_id: str, status: str,
+                  github_issue_number: int = None) -> bool:
+    """Set a proposal's status; returns False if the proposal does not exist"""
+    cursor = db.execute('''
+        UPDATE proposals
+        SET status = ?, github_issue_number = COALESCE(?, github_issue_number), updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    ''', (status, github_issue_number, proposal_id))
+    db.commit()
+    return cursor.rowcount > 0
+
+
+def _row_to_dict(row) -> Dict:
+    proposal = dict(zip(PROPOSAL_COLUMNS, row))
+    proposal['labels'] = json.loads(proposal['labels'])
+    return proposal
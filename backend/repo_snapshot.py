@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Repository Snapshots
+========================================
+
+Downloads a repository tarball for one commit and stream-extracts it, so
+every analyzer reads from the same local snapshot instead of fetching
+files one request at a time through the contents API. Small repositories
+are kept in memory; once the extracted size passes a limit, the snapshot
+spills to a temporary directory.
+
+When the content-addressed blob cache already holds most of a commit's
+files, load_snapshot() reads the commit's recursive tree instead and only
+downloads the blobs whose SHA has not been seen before.
+
+Given a TreeFilter, every builder skips excluded, oversized and binary
+files before their content is downloaded or extracted.
+"""
+
+import os
+import shutil
+import tarfile
+import tempfile
+import posixpath
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+from blob_cache import BlobCache, get_blob_cache, git_blob_sha
+from github_scheduler import PRIORITY_BACKGROUND
+from github_transport import GitHubTransport, get_transport
+from tree_filter import TreeFilter
+
+CPP_EXTENSIONS = ('.cpp', '.c', '.h', '.hpp')
+
+
+class RepositorySnapshot:
+    """Files of one repository commit, held in memory or in a temp dir"""
+
+    def __init__(self, repo_name: str, sha: str = None, memory_limit: int = None):
+        self.repo_name = repo_name
+        self.sha = sha
+        self.memory_limit = memory_limit if memory_limit is not None else int(
+            os.environ.get('GITHUB_SNAPSHOT_MEMORY_LIMIT', 64 * 1024 * 1024)
+        )
+
+        self._lock = threading.Lock()
+        self._files = {}
+        self._sizes = {}
+        self._shas = {}
+        self._directory = None
+        self.total_bytes = 0
+
+    @property
+    def on_disk(self) -> bool:
+        return self._directory is not None
+
+    @property
+    def directory(self) -> Optional[str]:
+        """Temp directory holding the files once the snapshot has spilled"""
+        return self._directory
+
+    @property
+    def file_count(self) -> int:
+        return len(self._sizes)
+
+    def add(self, path: str, content: bytes, sha: str = None):
+        """Add one file, spilling the snapshot to disk once it is too large"""
+        with self._lock:
+            previous = self._sizes.pop(path, 0)
+            self.total_bytes += len(content) - previous
+            self._sizes[path] = len(content)
+            self._shas[path] = sha or git_blob_sha(content)
+
+            if self._directory is None and self.total_bytes > self.memory_limit:
+                self._spill()
+
+            if self._directory is None:
+                self._files[path] = content
+            else:
+                self._write(path, content)
+
+    def paths(self) -> List[str]:
+        with self._lock:
+            return sorted(self._sizes)
+
+    def size(self, path: str) -> int:
+        return self._sizes.get(path, 0)
+
+    def blob_sha(self, path: str) -> Optional[str]:
+        return self._shas.get(path)
+
+    def blob_shas(self) -> Dict[str, str]:
+        """Map of path to git blob SHA for every file"""
+        with self._lock:
+            return dict(self._shas)
+
+    def read(self, path: str) -> Optional[bytes]:
+        with self._lock:
+            if path not in self._sizes:
+                return None
+            if self._directory is None:
+                return self._files[path]
+            directory = self._directory
+
+        with open(os.path.join(directory, path), 'rb') as f:
+            return f.read()
+
+    def read_text(self, path: str) -> Optional[str]:
+        content = self.read(path)
+        if content is None:
+            return None
+        return content.decode('utf-8', errors='replace')
+
+    def iter_files(self, extensions: Tuple[str, ...] = None) -> Iterator[Tuple[str, str]]:
+        """Yield (path, text) for every file, optionally filtered by extension"""
+        for path in self.paths():
+            if extensions and not path.endswith(extensions):
+                continue
+            yield path, self.read_text(path)
+
+    def close(self):
+        """Release the snapshot's memory and temp directory"""
+        with self._lock:
+            self._files.clear()
+            if self._directory is not None:
+                shutil.rmtree(self._directory, ignore_errors=True)
+                self._directory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _spill(self):
+        self._directory = tempfile.mkdtemp(prefix='atim-snapshot-')
+        for path, content in self._files.items():
+            self._write(path, content)
+        self._files.clear()
+        print(f"💾 Snapshot of {self.repo_name} passed {self.memory_limit} bytes; using {self._directory}")
+
+    def _write(self, path: str, content: bytes):
+        target = os.path.join(self._directory, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(content)
+
+    @classmethod
+    def from_tarball(cls, fileobj, repo_name: str, sha: str = None, memory_limit: int = None,
+                     blob_cache: BlobCache = None, tree_filter: TreeFilter = None) -> 'RepositorySnapshot':
+        """Stream-extract a gzipped GitHub tarball without seeking, feeding the blob cache
+
+        Members rejected by the tree filter on path or size are never read.
+        """
+        snapshot = cls(repo_name, sha, memory_limit)
+
+        with tarfile.open(fileobj=fileobj, mode='r|gz') as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+
+                path = _strip_archive_root(member.name)
+                if path is None:
+                    continue
+                if tree_filter and not tree_filter.accepts(path, member.size):
+                    continue
+
+                extracted = archive.extractfile(member)
+                if extracted is not None:
+                    content = extracted.read()
+                    if tree_filter and not tree_filter.accepts_content(path, content):
+                        continue
+                    blob_sha = blob_cache.put(content) if blob_cache else None
+                    snapshot.add(path, content, blob_sha)
+
+        return snapshot
+
+    @classmethod
+    def from_contents(cls, repo, sha: str = None, tree_filter: TreeFilter = None) -> 'RepositorySnapshot':
+        """Build a snapshot by walking every directory through PyGithub's contents API
+
+        Directory listings carry each file's size, so filtered files are never
+        downloaded.
+        """
+        snapshot = cls(repo.full_name, sha)
+        directories = [""]
+        while directories:
+            directory = directories.pop()
+            contents = repo.get_contents(directory, ref=sha) if sha else repo.get_contents(directory)
+            if not isinstance(contents, list):
+                contents = [contents]
+
+            for content_file in contents:
+                if content_file.type == "dir":
+                    directories.append(content_file.path)
+                elif content_file.type == "file":
+                    if tree_filter and not tree_filter.accepts(content_file.path, content_file.size):
+                        continue
+                    content = content_file.decoded_content
+                    if tree_filter and not tree_filter.accepts_content(content_file.path, content):
+                        continue
+                    snapshot.add(content_file.path, content, content_file.sha)
+        return snapshot
+
+
+def _strip_archive_root(name: str) -> Optional[str]:
+    """Drop GitHub's '<owner>-<repo>-<sha>/' prefix and reject unsafe paths"""
+    parts = name.split('/', 1)
+    if len(parts) < 2 or not parts[1]:
+        return None
+
+    path = posixpath.normpath(parts[1])
+    if path.startswith(('/', '../')) or path == '..':
+        return None
+    return path
+
+
+def download_snapshot(repo_name: str, sha: str, headers: Dict[str, str],
+                      budget_key: str = None, memory_limit: int = None,
+                      transport: GitHubTransport = None, blob_cache: BlobCache = None,
+                      tree_filter: TreeFilter = None) -> Optional[RepositorySnapshot]:
+    """Download the tarball for a commit once and extract it as it streams in"""
+    transport = transport or get_transport()
+
+    try:
+        response = transport.get(
+            f"/repos/{repo_name}/tarball/{sha}",
+            headers=headers,
+            stream=True,
+            priority=PRIORITY_BACKGROUND,
+            budget_key=budget_key
+        )
+
+        try:
+            if response.status_code != 200:
+                print(f"❌ Failed to download tarball for {repo_name}@{sha}: {response.status_code}")
+                return None
+
+            snapshot = RepositorySnapshot.from_tarball(
+                response.raw, repo_name, sha, memory_limit, blob_cache, tree_filter
+            )
+        finally:
+            response.close()
+
+        print(f"📦 Snapshot of {repo_name}@{sha[:7]}: {snapshot.file_count} files, {snapshot.total_bytes} bytes")
+        return snapshot
+
+    except Exception as e:
+        print(f"❌ Error downloading tarball for {repo_name}@{sha}: {e}")
+        return None
+
+
+def load_snapshot(repo_name: str, sha: str, headers: Dict[str, str],
+                  budget_key: str = None, memory_limit: int = None,
+                  transport: GitHubTransport = None, blob_cache: BlobCache = None,
+                  max_blob_fetches: int = None,
+                  tree_filter: TreeFilter = None) -> Optional[RepositorySnapshot]:
+    """Build a snapshot from the commit's tree, downloading only unseen blobs
+
+    Tree entries are filtered on path and size before any blob is fetched.
+    Falls back to one tarball download (which fills the blob cache) when the
+    tree is truncated or more blobs are missing than GITHUB_MAX_BLOB_FETCHES.
+    """
+    transport = transport or get_transport()
+    blob_cache = blob_cache or get_blob_cache()
+    max_blob_fetches = max_blob_fetches if max_blob_fetches is not None else int(
+        os.environ.get('GITHUB_MAX_BLOB_FETCHES', 100)
+    )
+
+    def from_tarball():
+        return download_snapshot(
+            repo_name, sha, headers, budget_key, memory_limit, transport, blob_cache, tree_filter
+        )
+
+    entries = _fetch_tree(repo_name, sha, headers, budget_key, transport)
+    if entries is None:
+        return from_tarball()
+
+    skipped = {}
+    if tree_filter:
+        entries, skipped = tree_filter.filter_entries(entries)
+
+    missing = sum(1 for entry in entries if entry['sha'] not in blob_cache)
+    if missing > max_blob_fetches:
+        return from_tarball()
+
+    snapshot = RepositorySnapshot(repo_name, sha, memory_limit)
+    fetched = 0
+    for entry in entries:
+        content = blob_cache.get(entry['sha'])
+        if content is None:
+            content = _fetch_blob(repo_name, entry['sha'], headers, budget_key, transport)
+            if content is None:
+                snapshot.close()
+                return from_tarball()
+            blob_cache.put(content, entry['sha'])
+            fetched += 1
+        if tree_filter and not tree_filter.accepts_content(entry['path'], content):
+            skipped['binary'] = skipped.get('binary', 0) + 1
+            continue
+        snapshot.add(entry['path'], content, entry['sha'])
+
+    print(f"📦 Snapshot of {repo_name}@{sha[:7]}: {snapshot.file_count} files, {fetched} blobs downloaded"
+          + (f", skipped {skipped}" if skipped else ""))
+    return snapshot
+
+
+def _fetch_tree(repo_name: str, sha: str, headers: Dict[str, str], budget_key: str,
+                transport: GitHubTransport) -> Optional[List[Dict]]:
+    """Blob entries of the commit's recursive tree, or None if unavailable"""
+    try:
+        response = transport.get(
+            f"/repos/{repo_name}/git/trees/{sha}",
+            params={'recursive': '1'},
+            headers=headers,
+            use_cache=True,
+            priority=PRIORITY_BACKGROUND,
+            budget_key=budget_key
+        )
+        if response.status_code != 200:
+            print(f"❌ Failed to get tree for {repo_name}@{sha}: {response.status_code}")
+            return None
+
+        tree = response.json()
+        if tree.get('truncated'):
+            print(f"⚠️  Tree for {repo_name}@{sha[:7]} is truncated; using the tarball")
+            return None
+
+        return [entry for entry in tree.get('tree', []) if entry.get('type') == 'blob']
+
+    except Exception as e:
+        print(f"❌ Error getting tree for {repo_name}@{sha}: {e}")
+        return None
+
+
+def _fetch_blob(repo_name: str, blob_sha: str, headers: Dict[str, str], budget_key: str,
+                transport: GitHubTransport) -> Optional[bytes]:
+    try:
+        response = transport.get(
+            f"/repos/{repo_name}/git/blobs/{blob_sha}",
+            headers=dict(headers, Accept='application/vnd.github.raw'),
+            priority=PRIORITY_BACKGROUND,
+            budget_key=budget_key
+        )
+        if response.status_code != 200:
+            print(f"❌ Failed to get blob {blob_sha}: {response.status_code}")
+            return None
+
+        if git_blob_sha(response.content) != blob_sha:
+            print(f"❌ Blob {blob_sha} content does not match its SHA")
+            return None
+
+        return response.content
+
+    except Exception as e:
+        print(f"❌ Error getting blob {blob_sha}: {e}")
+        return None
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Rule Engine
+===============================
+
+Compiles every active analysis rule once and scans a file in a single pass.
+Each rule's leading literal (e.g. `strcpy` for `strcpy\\s*\\(`) goes into one
+combined lookahead alternation; the scanner walks the file once, and only
+at positions where a literal occurs is the owning rule's full regex
+confirmed with `match()`. Rules without a usable literal fall back to their
+own `finditer` pass. The cost per file stays close to linear as the number
+of rules grows. Rules run over the file's code view from `cpp_lexer.py`, so
+comments and string literals never produce hits.
+"""
+
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from analysis_store import ruleset_version
+from cpp_lexer import code_view
+from line_index import LineIndex
+from rule_profiler import RuleClock, get_rule_profiler
+
+# Bumped when the shape of the findings produced by scan() changes
+ENGINE_FORMAT = 'multi-pattern/3'
+
+REGEX_METACHARACTERS = set('.^$*+?{}[]|()')
+QUANTIFIERS = set('*+?{')
+
+# Profiler entry for the shared literal scan that finds candidate positions
+LITERAL_PASS = '(literal pass)'
+
+# Profiler entry for the lexer pass that blanks comments and literals
+LEXER_PASS = '(lexer pass)'
+
+
+@dataclass
+class Rule:
+    id: str
+    pattern: str
+    title: str
+    description: str
+    severity: str  # 'low', 'medium', 'high', 'critical'
+    category: str
+    labels: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.regex = re.compile(self.pattern)
+        self.literal = literal_prefix(self.pattern)
+
+
+def literal_prefix(pattern: str) -> Optional[str]:
+    """Leading characters every match of the pattern must start with"""
+    if '|' in pattern:
+        # An alternation may let a match start elsewhere
+        return None
+
+    literal = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            if i + 1 >= len(pattern) or pattern[i + 1].isalnum():
+                # \s, \d, \b and friends are classes or assertions, not literals
+                break
+            char = pattern[i + 1]
+            step = 2
+        elif char in REGEX_METACHARACTERS:
+            break
+        else:
+            step = 1
+
+        # A quantifier makes the preceding character optional or repeated
+        if i + step < len(pattern) and pattern[i + step] in QUANTIFIERS:
+            break
+
+        literal.append(char)
+        i += step
+
+    return ''.join(literal) or None
+
+
+def iter_rule_proposals(file_findings: Iterable[Tuple[str, List[Dict]]],
+                        rules_by_prefix: Dict[str, Iterable]) -> Iterator[Dict]:
+    """Issue proposal fields for the first hit of each rule in each file
+
+    rules_by_prefix maps an id prefix such as 'sec' to the rules whose
+    proposals are numbered under it. Files are consumed as they arrive, so
+    a streamed analysis yields proposals before it finishes.
+    """
+    rules_by_id = {}
+    for prefix, rules in rules_by_prefix.items():
+        for rule in rules:
+            rules_by_id[rule.id] = (rule, prefix)
+    counts = dict.fromkeys(rules_by_prefix, 0)
+
+    for file_path, findings in file_findings:
+        reported = set()
+        for finding in findings:
+            rule, prefix = rules_by_id.get(finding['rule_id'], (None, None))
+            if rule is None or rule.id in reported:
+                continue
+            reported.add(rule.id)
+            counts[prefix] += 1
+            yield {
+                'id': f"{prefix}_{counts[prefix]}",
+                'title': rule.title,
+                'description': rule.description,
+                'severity': rule.severity,
+                'category': rule.category,
+                'file_path': file_path,
+                'line_number': finding.get('line'),
+                'labels': list(rule.labels)
+            }
+
+
+class RuleEngine:
+    """Single-pass matcher over a fixed set of compiled rules"""
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules = list(rules)
+        self.rules_by_id = {rule.id: rule for rule in self.rules}
+        self.version = ruleset_version([{'engine': ENGINE_FORMAT}] + [asdict(rule) for rule in self.rules])
+
+        anchored = [rule for rule in self.rules if rule.literal]
+        self._unanchored = [rule for rule in self.rules if not rule.literal]
+
+        # Longest literals first, so the alternation reports the longest literal
+        # at each position; shorter literals matching there are its prefixes.
+        literals = sorted({rule.literal for rule in anchored}, key=len, reverse=True)
+        self.literals = literals
+        self._rules_by_literal = {
+            literal: [rule for rule in anchored if literal.startswith(rule.literal)]
+            for literal in literals
+        }
+        self._prefilter = None
+        if literals:
+            alternation = '|'.join(re.escape(literal) for literal in literals)
+            self._prefilter = re.compile(f"(?=({alternation}))")
+
+    @property
+    def fully_anchored(self) -> bool:
+        """True when every rule needs one of self.literals to match"""
+        return bool(self.rules) and not self._unanchored
+
+    def scan(self, content: str) -> List[Dict]:
+        """Every rule hit as {'rule_id', 'offset', 'line', 'column'}, ordered by offset
+
+        Hits inside comments and string or character literals are not
+        reported. Each rule's time, matches and timeouts on this file are
+        recorded in the process-wide rule profiler. If the lexer pass runs
+        out of time, no rule is matched and the file reports no hits; the
+        analysis store does not keep the result of a scan with a timeout.
+        """
+        hits = []
+        matches = dict.fromkeys(self.rules_by_id, 0)
+
+        with RuleClock() as clock:
+            # Same length and line breaks as the content, so offsets carry over
+            code = None
+            with clock.run(LEXER_PASS):
+                code = code_view(content)
+            # Rules never fall back to the raw text, where comments and strings would
+            # produce hits. The lexer timeout is recorded, so the file is scanned again
+            if code is not None:
+                if self._prefilter is not None:
+                    candidates = []
+                    with clock.run(LITERAL_PASS):
+                        for candidate in self._prefilter.finditer(code):
+                            candidates.append((candidate.start(), candidate.group(1)))
+                    for position, literal in candidates:
+                        for rule in self._rules_by_literal[literal]:
+                            if clock.exhausted(rule.id):
+                                continue
+                            matched = None
+                            with clock.run(rule.id):
+                                matched = rule.regex.match(code, position)
+                            if matched:
+                                hits.append((position, rule.id))
+                                matches[rule.id] += 1
+
+                for rule in self._unanchored:
+                    with clock.run(rule.id):
+                        for match in rule.regex.finditer(code):
+                            hits.append((match.start(), rule.id))
+                            matches[rule.id] += 1
+                            if clock.exhausted(rule.id):
+                                break
+
+        profiler = get_rule_profiler()
+        path = profiler.current_file
+        evaluated = [LEXER_PASS] + ([LITERAL_PASS] if self._prefilter is not None else []) + list(self.rules_by_id)
+        for rule_id in evaluated:
+            timed_out = rule_id in clock.timed_out
+            if timed_out:
+                print(f"⚠️  Rule {rule_id} exceeded its {clock.timeout}s budget on {path or 'a file'}")
+            profiler.record(rule_id, clock.seconds.get(rule_id, 0.0), len(content),
+                            matches.get(rule_id, 0), timed_out, path)
+
+        order = {rule.id: index for index, rule in enumerate(self.rules)}
+        hits.sort(key=lambda hit: (hit[0], order[hit[1]]))
+
+        findings = []
+        line_index = LineIndex(content) if hits else None
+        for offset, rule_id in hits:
+            line, column = line_index.position(offset)
+            findings.append({'rule_id': rule_id, 'offset': offset, 'line': line, 'column': column})
+        return findings
+
+    def __call__(self, content: str) -> List[Dict]:
+        return self.scan(content)
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Rule Packs
+==============================
+
+Loads analysis rules from versioned JSON or YAML packs instead of Python
+literals. Every pack is validated and its patterns compiled once into an
+immutable RuleSet, and the validated packs are cached on disk under the
+SHA-256 of the pack files, so later startups skip parsing and validation
+when nothing changed. Compiled regexes cannot be serialized, so patterns
+are still compiled once per process. A running server picks up edited packs
+without a restart: reload() builds a complete new RuleSet and swaps it in
+with a single assignment. Analyses already running keep the RuleSet they
+started with, and a pack that fails validation leaves the current rules
+in place.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from rule_engine import Rule, RuleEngine
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+PACKS_DIR = os.path.join(os.path.dirname(__file__), 'rule_packs')
+PACK_EXTENSIONS = ('.json', '.yaml', '.yml')
+
+SEVERITIES = ('low', 'medium', 'high', 'critical')
+REQUIRED_FIELDS = ('id', 'pattern', 'title', 'description', 'severity', 'category')
+
+# Bumped when the layout of cached packs changes
+CACHE_FORMAT = 1
+
+
+@dataclass
+class RulePack:
+    name: str
+    version: str
+    source: str
+    rules: List[Rule]
+
+
+def parse_pack(path: str, data: bytes) -> Optional[Dict]:
+    """Decode a pack file as JSON or YAML depending on its extension"""
+    try:
+        if path.endswith('.json'):
+            return json.loads(data.decode('utf-8'))
+        if yaml is None:
+            print(f"⚠️  Skipping {os.path.basename(path)}: install PyYAML to load YAML rule packs")
+            return None
+        return yaml.safe_load(data.decode('utf-8'))
+    except Exception as e:
+        # ValueError for JSON, yaml.YAMLError for YAML
+        print(f"❌ Could not parse rule pack {os.path.basename(path)}: {e}")
+        return None
+
+
+def validate_pack(data, source: str) -> List[str]:
+    """Problems that keep a pack from loading; empty when it is valid"""
+    if not isinstance(data, dict):
+        return [f"{source}: a pack must be a mapping with name, version and rules"]
+
+    errors = []
+    for key in ('name', 'version'):
+        if not isinstance(data.get(key), (str, int, float)) or str(data.get(key)) == '':
+            errors.append(f"{source}: missing pack {key}")
+    rules = data.get('rules')
+    if not isinstance(rules, list) or not rules:
+        return errors + [f"{source}: rules must be a non-empty list"]
+
+    for index, rule in enumerate(rules):
+        where = f"{source} rule {rule.get('id', index) if isinstance(rule, dict) else index}"
+        if not isinstance(rule, dict):
+            errors.append(f"{where}: must be a mapping")
+            continue
+        for key in REQUIRED_FIELDS:
+            if not isinstance(rule.get(key), str) or not rule[key]:
+                errors.append(f"{where}: missing {key}")
+        unknown = set(rule) - set(REQUIRED_FIELDS) - {'labels'}
+        if unknown:
+            errors.append(f"{where}: unknown fields {', '.join(sorted(unknown))}")
+        if rule.get('severity') not in SEVERITIES:
+            errors.append(f"{where}: severity must be one of {', '.join(SEVERITIES)}")
+        labels = rule.get('labels', [])
+        if not isinstance(labels, list) or not all(isinstance(label, str) for label in labels):
+            errors.append(f"{where}: labels must be a list of strings")
+        if isinstance(rule.get('pattern'), str):
+            try:
+                re.compile(rule['pattern'])
+            except re.error as e:
+                errors.append(f"{where}: invalid pattern: {e}")
+    return errors
+
+
+class RuleSet:
+    """Immutable set of compiled rule packs; replaced as a whole on reload"""
+
+    def __init__(self, packs: List[RulePack], digest: str):
+        self.packs = {pack.name: pack for pack in packs}
+        self.digest = digest
+        self.loaded_at = time.time()
+        self._engines = {}
+        self._lock = threading.Lock()
+
+    def rules(self, *names: str) -> List[Rule]:
+        """Rules of the named packs in the order given, or of every pack"""
+        names = names or tuple(self.packs)
+        return [rule for name in names if name in self.packs for rule in self.packs[name].rules]
+
+    def engine(self, *names: str) -> RuleEngine:
+        """RuleEngine over the named packs, built once per RuleSet"""
+        with self._lock:
+            engine = self._engines.get(names)
+            if engine is None:
+                engine = self._engines[names] = RuleEngine(self.rules(*names))
+            return engine
+
+    def describe(self) -> List[Dict]:
+        return [
+            {'name': pack.name, 'version': pack.version, 'source': pack.source, 'rules': len(pack.rules)}
+            for pack in self.packs.values()
+        ]
+
+
+class RulePackRegistry:
+    """Loads rule packs from a directory and hot-swaps them when they change"""
+
+    def __init__(self, directory: str = None, cache_dir: str = None, check_interval: float = None):
+        self.directory = directory or os.environ.get('GITHUB_RULE_PACKS_DIR', PACKS_DIR)
+        self.cache_dir = cache_dir or os.environ.get(
+            'GITHUB_RULE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'atim-rule-cache')
+        )
+        self.check_interval = check_interval if check_interval is not None else float(
+            os.environ.get('GITHUB_RULE_PACKS_INTERVAL', 5)
+        )
+        self._rule_set = None
+        self._signature = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _pack_files(self) -> List[str]:
+        try:
+            names = sorted(name for name in os.listdir(self.directory) if name.endswith(PACK_EXTENSIONS))
+        except OSError as e:
+            print(f"❌ Cannot list rule packs in {self.directory}: {e}")
+            return []
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _file_signature(self) -> Tuple:
+        # Cheap change check: names, sizes and modification times
+        signature = []
+        for path in self._pack_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature.append((path, stat.st_size, stat.st_mtime_ns))
+        return tuple(signature)
+
+    def _cache_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _read_cache(self, digest: str) -> Optional[List[Dict]]:
+        try:
+            with open(self._cache_path(digest), 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get('format') != CACHE_FORMAT:
+            return None
+        return cached['packs']
+
+    def _write_cache(self, digest: str, packs: List[Dict]):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'format': CACHE_FORMAT, 'packs': packs}, f)
+            os.replace(temp_path, self._cache_path(digest))
+        except OSError as e:
+            print(f"⚠️  Could not cache compiled rule packs: {e}")
+
+    def build(self) -> Optional[RuleSet]:
+        """Read, validate and compile every pack; None if any pack is invalid"""
+        files = []
+        for path in self._pack_files():
+            try:
+                with open(path, 'rb') as f:
+                    files.append((path, f.read()))
+            except OSError as e:
+                print(f"❌ Could not read rule pack {path}: {e}")
+                return None
+        if not files:
+            print(f"❌ No rule packs found in {self.directory}")
+            return None
+
+        sha = hashlib.sha256(CACHE_FORMAT.to_bytes(2, 'big'))
+        for path, data in files:
+            sha.update(os.path.basename(path).encode('utf-8') + b'\0' + data + b'\0')
+        digest = sha.hexdigest()
+
+        packs = self._read_cache(digest)
+        if packs is None:
+            packs = []
+            errors = []
+            for path, data in files:
+                source = os.path.basename(path)
+                parsed = parse_pack(path, data)
+                if parsed is None:
+                    if path.endswith('.json') or yaml is not None:
+                        errors.append(f"{source}: could not be parsed")
+                    continue
+                errors.extend(validate_pack(parsed, source))
+                if not errors:
+                    packs.append({
+                        'name': str(parsed['name']),
+                        'version': str(parsed['version']),
+                        'source': source,
+                        'rules': [dict({'labels': []}, **rule) for rule in parsed['rules']]
+                    })
+
+            rule_ids = [rule['id'] for pack in packs for rule in pack['rules']]
+            duplicates = sorted({rule_id for rule_id in rule_ids if rule_ids.count(rule_id) > 1})
+            if duplicates:
+                errors.append(f"duplicate rule ids across packs: {', '.join(duplicates)}")
+            pack_names = [pack['name'] for pack in packs]
+            if len(set(pack_names)) != len(pack_names):
+                errors.append("two packs share a name")
+
+            if errors:
+                for error in errors:
+                    print(f"❌ Invalid rule pack {error}")
+                return None
+            self._write_cache(digest, packs)
+        else:
+            print(f"💾 Rule packs loaded from cache {digest[:12]}")
+
+        return RuleSet([
+            RulePack(name=pack['name'], version=pack['version'], source=pack['source'],
+                     rules=[Rule(**rule) for rule in pack['rules']])
+            for pack in packs
+        ], digest)
+
+    def reload(self) -> Optional[RuleSet]:
+        """Rebuild the packs and swap them in; the current rules stay on failure"""
+        with self._lock:
+            signature = self._file_signature()
+            rule_set = self.build()
+            self._checked_at = time.monotonic()
+            if rule_set is None:
+                return None
+            self._signature = signature
+            if self._rule_set is None or rule_set.digest != self._rule_set.digest:
+                self._rule_set = rule_set
+                total = sum(len(pack.rules) for pack in rule_set.packs.values())
+                print(f"✅ Loaded {total} rules from {len(rule_set.packs)} rule packs ({rule_set.digest[:12]})")
+            return self._rule_set
+
+    def current(self) -> RuleSet:
+        """The active RuleSet, reloaded first if the pack files changed
+
+        The files are checked at most once per check interval; an interval
+        of 0 turns automatic reloading off.
+        """
+        if self._rule_set is None:
+            if self.reload() is None:
+                # Analyses run without rules until a valid pack appears
+                with self._lock:
+                    if self._rule_set is None:
+                        self._rule_set = RuleSet([], '')
+            return self._rule_set
+
+        if self.check_interval > 0 and time.monotonic() - self._checked_at >= self.check_interval:
+            self._checked_at = time.monotonic()
+            if self._file_signature() != self._signature:
+                print("🔄 Rule packs changed on disk, reloading")
+                self.reload()
+        return self._rule_set
+
+    def stats(self) -> Dict:
+        rule_set = self._rule_set
+        return {
+            'directory': self.directory,
+            'digest': rule_set.digest if rule_set else None,
+            'loaded_at': rule_set.loaded_at if rule_set else None,
+            'packs': rule_set.describe() if rule_set else []
+        }
+
+
+_rule_packs = None
+_rule_packs_lock = threading.Lock()
+
+
+def get_rule_packs() -> RulePackRegistry:
+    """Return the process-wide rule pack registry"""
+    global _rule_packs
+    with _rule_packs_lock:
+        if _rule_packs is None:
+            _rule_packs = RulePackRegistry()
+        return _rule_packs
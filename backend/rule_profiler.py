@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Rule Profiler
+=================================
+
+Measures every rule evaluation of the rule engine: cumulative time, bytes
+scanned, matches, and the file where the rule was slowest. Each rule also
+gets a time budget per file. A pattern that backtracks catastrophically on
+one long line is interrupted with SIGALRM when the scan runs on a process's
+main thread (the CLI and the analysis executor's worker processes). On
+other threads the budget is checked between evaluations. Either way the
+rule is dropped for the rest of that file and a timeout is recorded, so
+one rule cannot stall an analysis.
+"""
+
+import os
+import time
+import signal
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class RuleTimeout(Exception):
+    """Raised inside a rule evaluation that ran past its budget"""
+
+
+@dataclass
+class RuleProfile:
+    rule_id: str
+    files: int = 0
+    seconds: float = 0.0
+    bytes: int = 0
+    matches: int = 0
+    timeouts: int = 0
+    worst_file: Optional[str] = None
+    worst_seconds: float = 0.0
+
+    def add(self, other: 'RuleProfile'):
+        self.files += other.files
+        self.seconds += other.seconds
+        self.bytes += other.bytes
+        self.matches += other.matches
+        self.timeouts += other.timeouts
+        if other.worst_seconds > self.worst_seconds:
+            self.worst_file = other.worst_file
+            self.worst_seconds = other.worst_seconds
+
+
+class RuleProfiler:
+    """Cumulative per-rule statistics for this process"""
+
+    def __init__(self):
+        self._profiles = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def file(self, path: str) -> Iterator[None]:
+        """Attribute the rule evaluations inside the block to a file path"""
+        previous = getattr(self._local, 'path', None), getattr(self._local, 'timeouts', 0)
+        self._local.path, self._local.timeouts = path, 0
+        try:
+            yield
+        finally:
+            self._local.path, self._local.timeouts = previous
+
+    @property
+    def current_file(self) -> Optional[str]:
+        return getattr(self._local, 'path', None)
+
+    @property
+    def file_timeouts(self) -> int:
+        """Rule timeouts recorded so far inside the current file() block"""
+        return getattr(self._local, 'timeouts', 0)
+
+    def record(self, rule_id: str, seconds: float, size: int, matches: int,
+               timed_out: bool = False, path: str = None):
+        """Add one rule's evaluation over one file"""
+        if timed_out:
+            self._local.timeouts = self.file_timeouts + 1
+        self.merge([RuleProfile(
+            rule_id=rule_id, files=1, seconds=seconds, bytes=size, matches=matches,
+            timeouts=int(timed_out), worst_file=path, worst_seconds=seconds
+        )])
+
+    def merge(self, profiles: Iterable[RuleProfile]):
+        """Fold in statistics collected elsewhere, e.g. in a worker process"""
+        with self._lock:
+            for profile in profiles:
+                total = self._profiles.get(profile.rule_id)
+                if total is None:
+                    total = self._profiles[profile.rule_id] = RuleProfile(rule_id=profile.rule_id)
+                total.add(profile)
+
+    def drain(self) -> List[RuleProfile]:
+        """Return and forget everything recorded so far"""
+        with self._lock:
+            profiles = list(self._profiles.values())
+            self._profiles = {}
+        return profiles
+
+    def reset(self):
+        self.drain()
+
+    def profiles(self) -> List[RuleProfile]:
+        """Copies of every rule's statistics, slowest rule first"""
+        with self._lock:
+            profiles = [RuleProfile(**asdict(profile)) for profile in self._profiles.values()]
+        return sorted(profiles, key=lambda profile: profile.seconds, reverse=True)
+
+    def stats(self) -> Dict:
+        profiles = self.profiles()
+        return {
+            'timeout_seconds': rule_timeout(),
+            'rules': [asdict(profile) for profile in profiles],
+            'total_seconds': sum(profile.seconds for profile in profiles),
+            'total_timeouts': sum(profile.timeouts for profile in profiles)
+        }
+
+
+def rule_timeout() -> float:
+    """Seconds one rule may spend on one file; 0 disables the guard"""
+    return float(os.environ.get('GITHUB_RULE_TIMEOUT', 2.0))
+
+
+class RuleClock:
+    """Times the rules evaluated over one file and enforces their budget
+
+    Use as a context manager around the whole file so the SIGALRM handler
+    is installed once, then wrap each evaluation in run(rule_id).
+    """
+
+    def __init__(self, timeout: float = None):
+        self.timeout = rule_timeout() if timeout is None else timeout
+        self.seconds = {}
+        self.timed_out = set()
+        self._alarm = (
+            self.timeout > 0 and hasattr(signal, 'setitimer')
+            and threading.current_thread() is threading.main_thread()
+        )
+        self._previous_handler = None
+        self._armed = False
+        self._started = None
+
+    def __enter__(self) -> 'RuleClock':
+        if self._alarm:
+            self._previous_handler = signal.signal(signal.SIGALRM, self._on_alarm)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self._previous_handler)
+
+    def _on_alarm(self, signum, frame):
+        # A late alarm after the evaluation finished is ignored
+        if self._armed:
+            raise RuleTimeout()
+
+    def exhausted(self, rule_id: str) -> bool:
+        """True once a rule has used up its budget for this file"""
+        if rule_id in self.timed_out:
+            return True
+        spent = self.seconds.get(rule_id, 0.0)
+        if self._started is not None:
+            spent += time.perf_counter() - self._started
+        if self.timeout > 0 and spent >= self.timeout:
+            self.timed_out.add(rule_id)
+            return True
+        return False
+
+    @contextmanager
+    def run(self, rule_id: str) -> Iterator[None]:
+        """Time one evaluation; a RuleTimeout inside it is swallowed and recorded"""
+        spent = self.seconds.get(rule_id, 0.0)
+        self._started = time.perf_counter()
+        if self._alarm:
+            self._armed = True
+            signal.setitimer(signal.ITIMER_REAL, max(self.timeout - spent, 1e-6))
+        try:
+            try:
+                yield
+            finally:
+                self._armed = False
+        except RuleTimeout:
+            self.timed_out.add(rule_id)
+        finally:
+            if self._alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+            self.seconds[rule_id] = spent + time.perf_counter() - self._started
+            self._started = None
+
+
+_rule_profiler = None
+_rule_profiler_lock = threading.Lock()
+
+
+def get_rule_profiler() -> RuleProfiler:
+    """Return the process-wide rule profiler"""
+    global _rule_profiler
+    with _rule_profiler_lock:
+        if _rule_profiler is None:
+            _rule_profiler = RuleProfiler()
+        return _rule_profiler
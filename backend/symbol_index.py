@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Symbol Index
+================================
+
+Cross-file facts for rules that span headers and sources. The functions,
+classes and macros declared or defined in each C/C++ blob are extracted
+once and stored in SQLite per (blob SHA, extractor version), and every
+repository keeps a table of its symbols by name at the last indexed commit.
+An update only extracts blobs it has never seen and only rewrites the rows
+of changed or removed paths. A SymbolTable loaded from the index answers
+"is X defined anywhere?" with a dictionary lookup, so a rule never
+rescans the repository.
+"""
+
+import os
+import re
+import json
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+from cpp_lexer import code_view
+from line_index import LineIndex
+
+DB_PATH = os.path.join(os.path.dirname(__file__), 'db.sqlite')
+
+# Bumped when extract_symbols() changes, so every blob is extracted again
+EXTRACTOR_VERSION = 'symbols/2'
+
+# SQLite limits the number of bound parameters per statement
+QUERY_CHUNK_SIZE = 500
+
+KEYWORDS = {
+    'if', 'else', 'for', 'while', 'do', 'switch', 'case', 'return', 'sizeof', 'catch', 'throw',
+    'new', 'delete', 'goto', 'using', 'typedef', 'namespace', 'co_return', 'co_await', 'co_yield'
+}
+
+MACRO = re.compile(r'^[ \t]*#[ \t]*define[ \t]+([A-Za-z_]\w*)', re.MULTILINE)
+
+# class/struct/union Name [final] [: bases] followed by a body or a semicolon;
+# an all-caps export macro may sit between the keyword and the name
+CLASS = re.compile(
+    r'(?<!enum )\b(class|struct|union)[ \t]+(?:[A-Z_][A-Z0-9_]*[ \t]+)?([A-Za-z_]\w*)'
+    r'[ \t]*(?:final[ \t]*)?(?::[^;{()]*)?([{;])'
+)
+
+# A function at the start of a line: specifiers, up to four return type
+# tokens, a possibly qualified name, parameters, trailing qualifiers, and
+# then a body, a constructor initializer list or a semicolon
+FUNCTION = re.compile(
+    r'^[ \t]*(?:template[ \t]*<[^;{}]*>\s*)?'
+    r'((?:(?:inline|static|virtual|explicit|constexpr|extern|friend)[ \t]+)*)'
+    r'((?:[\w:<>,*&~]+[ \t*&]+){0,4})'
+    r'((?:\w+::)*~?[A-Za-z_]\w*)[ \t]*\(([^;{}()]*(?:\([^;{}()]*\)[^;{}()]*)*)\)\s*'
+    r'(?:const\s*)?(?:noexcept\s*)?(?:(?:override|final)\s*)*(?:->[ \t]*[\w:<>,*& ]+?\s*)?'
+    r'(\{|:[^;{]*\{|;|=[ \t]*(?:0|default|delete)[ \t]*;)',
+    re.MULTILINE
+)
+
+
+def extract_symbols(content: str) -> List[Dict]:
+    """Functions, classes and macros in one C/C++ file
+
+    Each symbol is {'name', 'qualified_name', 'kind', 'role', 'line'} where
+    kind is 'function', 'class' or 'macro' and role is 'declaration' or
+    'definition'. Extraction is lexical: it needs no build and tolerates
+    code that does not compile, at the price of occasional false hits.
+    Comments and literals are blanked first, so commented-out code and
+    strings declare nothing.
+    """
+    symbols = []
+    line_index = LineIndex(content)
+    # Same offsets as content, so lines come from the original text
+    code = code_view(content)
+
+    for match in MACRO.finditer(code):
+        symbols.append({
+            'name': match.group(1), 'qualified_name': match.group(1), 'kind': 'macro',
+            'role': 'definition', 'line': line_index.line_of(match.start(1))
+        })
+
+    for match in CLASS.finditer(code):
+        symbols.append({
+            'name': match.group(2), 'qualified_name': match.group(2), 'kind': 'class',
+            'role': 'definition' if match.group(3) == '{' else 'declaration',
+            'line': line_index.line_of(match.start(2))
+        })
+
+    for match in FUNCTION.finditer(code):
+        specifiers, return_type, qualified_name, _, ending = match.groups()
+        name = qualified_name.rsplit('::', 1)[-1]
+        type_tokens = return_type.split()
+        if name in KEYWORDS or (type_tokens and type_tokens[0] in KEYWORDS):
+            continue
+        # Without a return type only constructors and destructors declare anything;
+        # a bare unqualified one looks like a call statement, so it is skipped
+        if (not type_tokens and ending == ';' and not specifiers
+                and '::' not in qualified_name and not name.startswith('~')):
+            continue
+        symbols.append({
+            'name': name, 'qualified_name': qualified_name, 'kind': 'function',
+            'role': 'definition' if ending.endswith('{') or 'default' in ending else 'declaration',
+            'line': line_index.line_of(match.start(3))
+        })
+
+    symbols.sort(key=lambda symbol: (symbol['line'], symbol['kind'], symbol['name']))
+    return symbols
+
+
+class SymbolTable:
+    """In-memory view of a repository's symbols keyed by name"""
+
+    def __init__(self, rows: Iterable[Dict] = ()):
+        self._by_name = {}
+        for row in rows:
+            self._by_name.setdefault(row['name'], []).append(row)
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self._by_name.values())
+
+    def locations(self, name: str, kind: str = None, role: str = None) -> List[Dict]:
+        """Every place a symbol is declared or defined, optionally filtered"""
+        return [
+            row for row in self._by_name.get(name, [])
+            if (kind is None or row['kind'] == kind) and (role is None or row['role'] == role)
+        ]
+
+    def is_defined(self, name: str, kind: str = None) -> bool:
+        return bool(self.locations(name, kind, 'definition'))
+
+    def is_declared(self, name: str, kind: str = None) -> bool:
+        return bool(self.locations(name, kind))
+
+
+class SymbolIndex:
+    """Per-blob symbols and per-repository symbol tables in SQLite"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or DB_PATH
+        self._lock = threading.Lock()
+        self._create_tables()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _create_tables(self):
+        conn = self._connect()
+        try:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS blob_symbols (
+                blob_sha TEXT NOT NULL,
+                extractor_version TEXT NOT NULL,
+                symbols TEXT NOT NULL,
+                PRIMARY KEY (blob_sha, extractor_version)
+            )
+            ''')
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS repo_symbols (
+                repo_name TEXT NOT NULL,
+                name TEXT NOT NULL,
+                qualified_name TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                role TEXT NOT NULL,
+                path TEXT NOT NULL,
+                line INTEGER NOT NULL
+            )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_repo_symbols_name ON repo_symbols (repo_name, name)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_repo_symbols_path ON repo_symbols (repo_name, path)')
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS symbol_index_runs (
+                repo_name TEXT PRIMARY KEY,
+                extractor_version TEXT NOT NULL,
+                commit_sha TEXT NOT NULL,
+                files TEXT NOT NULL,
+                indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _blob_symbols(self, conn: sqlite3.Connection, blob_shas: List[str]) -> Dict[str, List[Dict]]:
+        found = {}
+        for start in range(0, len(blob_shas), QUERY_CHUNK_SIZE):
+            chunk = blob_shas[start:start + QUERY_CHUNK_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f'SELECT blob_sha, symbols FROM blob_symbols '
+                f'WHERE extractor_version = ? AND blob_sha IN ({placeholders})',
+                [EXTRACTOR_VERSION] + chunk
+            ).fetchall()
+            for row in rows:
+                found[row['blob_sha']] = json.loads(row['symbols'])
+        return found
+
+    def update(self, repo_name: str, commit_sha: str, files: Dict[str, str],
+               read: Callable[[str], Optional[str]]) -> Dict:
+        """Bring a repository's symbol table to the given {path: blob SHA} map
+
+        read(path) returns a file's text and is only called for blobs that
+        were never indexed. A path whose read returns None is not indexed
+        and is read again by the next update. Returns counts of what the
+        update touched.
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                run = conn.execute(
+                    'SELECT extractor_version, files FROM symbol_index_runs WHERE repo_name = ?', (repo_name,)
+                ).fetchone()
+                previous = json.loads(run['files']) if run and run['extractor_version'] == EXTRACTOR_VERSION else {}
+
+                changed = sorted(path for path, blob_sha in files.items() if previous.get(path) != blob_sha)
+                removed = sorted(path for path in previous if path not in files)
+
+                needed = sorted({files[path] for path in changed})
+                known = self._blob_symbols(conn, needed)
+                extracted = {}
+                for path in changed:
+                    blob_sha = files[path]
+                    if blob_sha in known or blob_sha in extracted:
+                        continue
+                    content = read(path)
+                    if content is not None:
+                        extracted[blob_sha] = extract_symbols(content)
+                known.update(extracted)
+                # Blobs that could not be read are left out of the run, so the next update retries them
+                unread = {path for path in changed if files[path] not in known}
+                indexed = {path: blob_sha for path, blob_sha in files.items() if path not in unread}
+
+                conn.executemany(
+                    'INSERT OR REPLACE INTO blob_symbols (blob_sha, extractor_version, symbols) VALUES (?, ?, ?)',
+                    [(blob_sha, EXTRACTOR_VERSION, json.dumps(symbols)) for blob_sha, symbols in extracted.items()]
+                )
+                if not previous:
+                    conn.execute('DELETE FROM repo_symbols WHERE repo_name = ?', (repo_name,))
+                else:
+                    stale = changed + removed
+                    for start in range(0, len(stale), QUERY_CHUNK_SIZE):
+                        chunk = stale[start:start + QUERY_CHUNK_SIZE]
+                        conn.execute(
+                            f"DELETE FROM repo_symbols WHERE repo_name = ? AND path IN ({','.join('?' * len(chunk))})",
+                            [repo_name] + chunk
+                        )
+                conn.executemany(
+                    'INSERT INTO repo_symbols (repo_name, name, qualified_name, kind, role, path, line) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    [
+                        (repo_name, symbol['name'], symbol['qualified_name'], symbol['kind'],
+                         symbol['role'], path, symbol['line'])
+                        for path in changed if path not in unread for symbol in known[files[path]]
+                    ]
+                )
+                conn.execute(
+                    'INSERT OR REPLACE INTO symbol_index_runs (repo_name, extractor_version, commit_sha, files) '
+                    'VALUES (?, ?, ?, ?)',
+                    (repo_name, EXTRACTOR_VERSION, commit_sha or '', json.dumps(indexed, sort_keys=True))
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+        summary = {'files': len(files), 'changed': len(changed), 'removed': len(removed), 'extracted': len(extracted)}
+        print(f"🔍 Symbol index of {repo_name}: {summary['changed']} files updated, "
+              f"{summary['removed']} removed, {summary['extracted']} blobs extracted")
+        if unread:
+            print(f"⚠️  Could not read {len(unread)} files for the symbol index of {repo_name}; they will be retried")
+        return summary
+
+    def lookup(self, repo_name: str, name: str, kind: str = None, role: str = None) -> List[Dict]:
+        """Declarations and definitions of a name at the last indexed commit"""
+        query = 'SELECT name, qualified_name, kind, role, path, line FROM repo_symbols WHERE repo_name = ? AND name = ?'
+        params = [repo_name, name]
+        if kind:
+            query += ' AND kind = ?'
+            params.append(kind)
+        if role:
+            query += ' AND role = ?'
+            params.append(role)
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(query + ' ORDER BY path, line', params).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+    def table(self, repo_name: str) -> SymbolTable:
+        """Load a repository's symbols for lookups without further queries"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                'SELECT name, qualified_name, kind, role, path, line FROM repo_symbols '
+                'WHERE repo_name = ? ORDER BY path, line',
+                (repo_name,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return SymbolTable(dict(row) for row in rows)
+
+
+_symbol_index = None
+_symbol_index_lock = threading.Lock()
+
+
+def get_symbol_index() -> SymbolIndex:
+    """Return the process-wide symbol index"""
+    global _symbol_index
+    with _symbol_index_lock:
+        if _symbol_index is None:
+            _symbol_index = SymbolIndex()
+        return _symbol_index
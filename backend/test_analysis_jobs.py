@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+"""
+Test background analysis jobs and their progress reporting
+"""
+
+import os
+import tempfile
+import threading
+from analysis_jobs import COMPLETED, FAILED, AnalysisJobQueue
+from analysis_store import AnalysisStore
+from repo_snapshot import RepositorySnapshot
+from rule_engine import Rule, RuleEngine
+
+REPO = 'NiloticNetwork/NiloticNetworkBlockchain'
+
+def test_job_runs_in_background():
+    """submit() should return at once and the worker should record the result"""
+    release = threading.Event()
+    queue = AnalysisJobQueue(workers=1)
+
+    def run(job):
+        job.update_progress({'scanned': 1, 'findings': 2})
+        release.wait(5)
+        return 3
+
+    job = queue.submit(REPO, run)
+    assert job.active
+
+    # A second submission while the first is pending reuses it
+    assert queue.submit(REPO, run) is job
+
+    release.set()
+    assert job.wait(5)
+    assert job.status == COMPLETED
+    assert job.to_dict()['proposals'] == 3
+    assert job.to_dict()['progress'] == {'scanned': 1, 'findings': 2}
+    assert queue.latest(REPO) is job
+    assert queue.get(job.id) is job
+    print(f"✅ Job {job.id[:8]} completed: {job.to_dict()['status']}")
+
+def test_failed_job():
+    """An exception in the job should mark it failed with the error"""
+    queue = AnalysisJobQueue(workers=1)
+
+    def run(job):
+        raise RuntimeError('tarball unavailable')
+
+    job = queue.submit(REPO, run)
+    assert job.wait(5)
+    assert job.status == FAILED
+    assert job.error == 'tarball unavailable'
+
+    # A finished job does not block a new one
+    assert queue.submit(REPO, lambda job: 0) is not job
+    print("✅ Failed job reports its error")
+
+def test_followers_receive_published_items():
+    """A follower joining late should get earlier items first, then live ones until the job ends"""
+    queue = AnalysisJobQueue(workers=1)
+    first_published = threading.Event()
+    release = threading.Event()
+
+    def run(job):
+        job.publish({'id': 'sec_1'})
+        first_published.set()
+        release.wait(5)
+        job.publish({'id': 'perf_1'})
+        return 2
+
+    job = queue.submit(REPO, run)
+    assert first_published.wait(5)
+
+    received = []
+    follower = threading.Thread(target=lambda: received.extend(job.follow()))
+    follower.start()
+    release.set()
+    follower.join(5)
+
+    assert not follower.is_alive()
+    assert received == [{'id': 'sec_1'}, {'id': 'perf_1'}]
+
+    # Once the job is finished its items are released and read from storage
+    assert job.wait(5)
+    assert job._published is None
+    assert list(job.follow()) == []
+    assert list(job.follow(stored=lambda: received)) == received
+
+    # Heartbeats are None; a job that publishes nothing still ends the stream
+    empty = AnalysisJobQueue(workers=1).submit(REPO, lambda job: 0)
+    assert [item for item in empty.follow(heartbeat=0.05) if item is not None] == []
+    print("✅ Followers receive published items")
+
+def test_analysis_progress():
+    """The analysis store should report files scanned and findings so far"""
+    engine = RuleEngine([
+        Rule(id='rand', pattern=r'rand\s*\(', title='rand', description='', severity='medium', category='security')
+    ])
+    updates = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot = RepositorySnapshot(REPO, 'c1')
+        for i in range(5):
+            snapshot.add(f"src/core/file{i}.cpp", f"int seed{i} = {'rand()' if i % 2 else i};\n".encode('utf-8'))
+
+        store = AnalysisStore(os.path.join(directory, 'analysis.sqlite'))
+        store.analyze_snapshot(REPO, snapshot, engine.version, engine.scan, progress=updates.append)
+
+    assert updates[0] == {'files': 5, 'to_scan': 5, 'scanned': 0, 'findings': 0}
+    assert updates[-1] == {'files': 5, 'to_scan': 5, 'scanned': 5, 'findings': 2}
+    assert [update['scanned'] for update in updates] == list(range(6))
+    print(f"✅ Progress reported {len(updates)} times")
+
+if __name__ == "__main__":
+    print("⏳ Testing Analysis Jobs")
+    print("=" * 50)
+    test_job_runs_in_background()
+    test_failed_job()
+    test_followers_receive_published_items()
+    test_analysis_progress()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+"""
+Test incremental analysis with per-blob findings persisted in SQLite
+"""
+
+import os
+import tempfile
+from analysis_store import AnalysisStore
+from repo_snapshot import RepositorySnapshot
+from rule_engine import Rule, RuleEngine
+from rule_profiler import get_rule_profiler
+
+REPO = 'NiloticNetwork/NiloticNetworkBlockchain'
+
+RULES = [
+    Rule(id='strcpy', pattern=r'strcpy\s*\(', title='strcpy', description='', severity='high', category='security'),
+    Rule(id='rand', pattern=r'rand\s*\(', title='rand', description='', severity='medium', category='security')
+]
+
+def _snapshot(sha, files):
+    snapshot = RepositorySnapshot(REPO, sha)
+    for path, content in files.items():
+        snapshot.add(path, content)
+    return snapshot
+
+def test_unchanged_files_are_carried_forward():
+    """Only added or modified blobs should be scanned on the next run"""
+    files = {f"src/core/file{i}.cpp": f"int value{i} = {i};\n".encode('utf-8') for i in range(50)}
+    files['src/core/wallet.cpp'] = b'void copy(char *d, const char *s) { strcpy(d, s); }\n'
+
+    scanned = []
+    engine = RuleEngine(RULES)
+
+    def counting_scan(content):
+        scanned.append(content)
+        return engine.scan(content)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = AnalysisStore(os.path.join(directory, 'analysis.sqlite'))
+        version = engine.version
+
+        first = store.analyze_snapshot(REPO, _snapshot('c1', files), version, counting_scan)
+        assert len(scanned) == 51
+        assert first['src/core/wallet.cpp'] == [{'rule_id': 'strcpy', 'offset': 36, 'line': 1, 'column': 37}]
+
+        files['src/core/file7.cpp'] = b'int seed = rand();\n'
+        files['src/core/new.cpp'] = b'int fresh = 1;\n'
+        scanned.clear()
+
+        second = store.analyze_snapshot(REPO, _snapshot('c2', files), version, counting_scan)
+        assert len(scanned) == 2
+        assert second['src/core/wallet.cpp'] == first['src/core/wallet.cpp']
+        assert second['src/core/file7.cpp'][0]['rule_id'] == 'rand'
+        assert store.last_summary['carried_forward'] == 50
+        assert store.last_summary['since_commit'] == 'c1'
+        print(f"✅ Incremental run: {store.last_summary}")
+
+def test_new_ruleset_rescans():
+    """Findings from another ruleset version should not be reused"""
+    files = {'src/main.cpp': b'int seed = rand();\n'}
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = AnalysisStore(os.path.join(directory, 'analysis.sqlite'))
+        first_engine, second_engine = RuleEngine(RULES[:1]), RuleEngine(RULES)
+        store.analyze_snapshot(REPO, _snapshot('c1', files), first_engine.version, first_engine.scan)
+
+        results = store.analyze_snapshot(REPO, _snapshot('c1', files), second_engine.version, second_engine.scan)
+        assert results['src/main.cpp'][0]['rule_id'] == 'rand'
+        assert store.last_summary['scanned'] == 1
+        print("✅ Ruleset change triggers a rescan")
+
+def test_findings_stream_before_scan_finishes():
+    """iter_snapshot should yield a file's findings before later files are scanned"""
+    files = {f"src/core/file{i}.cpp": f"int seed{i} = rand();\n".encode('utf-8') for i in range(10)}
+    scanned = []
+    engine = RuleEngine(RULES)
+
+    def counting_scan(content):
+        scanned.append(content)
+        return engine.scan(content)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = AnalysisStore(os.path.join(directory, 'analysis.sqlite'))
+        stream = store.iter_snapshot(REPO, _snapshot('c1', files), engine.version, counting_scan)
+
+        path, findings = next(stream)
+        assert findings[0]['rule_id'] == 'rand'
+        assert len(scanned) == 1
+
+        rest = list(stream)
+        assert len(rest) == 9 and len(scanned) == 10
+        assert store.last_run(REPO, engine.version)['commit_sha'] == 'c1'
+        print("✅ Findings streamed as files are scanned")
+
+def test_timed_out_scan_is_not_stored():
+    """A blob where a rule ran out of time should be scanned again by the next run"""
+    files = {'src/fast.cpp': b'int seed = rand();\n', 'src/slow.cpp': b'int slow = rand();\n'}
+    engine = RuleEngine(RULES)
+    scanned = []
+
+    def timing_out_scan(content):
+        scanned.append(content)
+        if 'slow' in content:
+            profiler = get_rule_profiler()
+            profiler.record('rand', 2.0, len(content), 0, True, profiler.current_file)
+        return engine.scan(content)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = AnalysisStore(os.path.join(directory, 'analysis.sqlite'))
+        first = store.analyze_snapshot(REPO, _snapshot('c1', files), engine.version, timing_out_scan)
+        assert first['src/slow.cpp'][0]['rule_id'] == 'rand'
+        assert store.last_summary['incomplete'] == 1
+
+        scanned.clear()
+        store.analyze_snapshot(REPO, _snapshot('c1', files), engine.version, timing_out_scan)
+        assert scanned == ['int slow = rand();\n']
+    get_rule_profiler().reset()
+    print("✅ Timed-out scans are retried")
+
+if __name__ == "__main__":
+    print("🔍 Testing Incremental Analysis Store")
+    print("=" * 50)
+    test_unchanged_files_are_carried_forward()
+    test_new_ruleset_rescans()
+    test_findings_stream_before_scan_finishes()
+    test_timed_out_scan_is_not_stored()
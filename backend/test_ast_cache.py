@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+"""
+Test structural rules over cached, incrementally reparsed tree-sitter trees
+"""
+
+import os
+import tempfile
+import pytest
+from analysis_store import AnalysisStore
+from ast_cache import ASTCache, StructuralAnalyzer, ast_available, text_edit
+from repo_snapshot import RepositorySnapshot
+
+# tree-sitter and tree-sitter-cpp are pinned in requirements.txt
+requires_tree_sitter = pytest.mark.skipif(not ast_available(), reason="tree-sitter is not installed")
+
+SOURCE = '''#include <vector>
+void collect(const std::vector<Tx>& txs, int n) {
+    std::vector<int> ids;
+    std::vector<int> kept;
+    kept.reserve(txs.size());
+    for (const auto& tx : txs) {
+        ids.push_back(tx.id);
+        kept.push_back(tx.id);
+        chain.push_back(tx);
+    }
+    for (int i = 0; i < n; ++i) {
+        std::vector<int> row;
+        row.push_back(i);
+    }
+    // ids.push_back(0) in a loop is only a comment
+}
+'''
+
+def test_text_edit():
+    """The changed byte range should exclude the common prefix and suffix"""
+    assert text_edit(b'int a = 1;', b'int a = 12;') == (9, 9, 10)
+    assert text_edit(b'abcabc', b'abc') == (3, 6, 3)
+    assert text_edit(b'same', b'same') == (4, 4, 4)
+    print("✅ Text edit test passed")
+
+@requires_tree_sitter
+def test_push_back_in_loop():
+    """Only local vectors grown in a loop without reserve() should be reported"""
+    findings = StructuralAnalyzer().scan(SOURCE, 'b1', 'src/collect.cpp')
+    # kept is reserved, chain is not local and row is declared inside its loop
+    assert [(f['rule_id'], f['line'], f['column']) for f in findings] == [('vector-push-back-in-loop', 7, 9)]
+    print("✅ Structural rule test passed")
+
+@requires_tree_sitter
+def test_incremental_reparse():
+    """An edited path should be reparsed from its previous tree and match a full parse"""
+    cache = ASTCache(max_trees=2)
+    old = SOURCE.encode('utf-8')
+    new = SOURCE.replace('ids.push_back(tx.id);', 'ids.push_back(tx.id * 2);').encode('utf-8')
+
+    first = cache.parse(old, 'b1', 'src/collect.cpp')
+    assert cache.parse(old, 'b1', 'src/collect.cpp') is first
+    edited = cache.parse(new, 'b2', 'src/collect.cpp')
+    assert str(edited.root_node) == str(ASTCache().parse(new, 'fresh').root_node)
+    assert str(first.root_node) == str(ASTCache().parse(old, 'fresh').root_node)
+
+    cache.parse(b'int x;', 'b3')
+    stats = cache.stats()
+    assert (stats['hits'], stats['parsed'], stats['reparsed'], stats['evictions'], stats['trees']) == (1, 2, 1, 1, 2)
+    print("✅ Incremental reparse test passed")
+
+@requires_tree_sitter
+def test_findings_stored_by_blob():
+    """A second analysis should reuse stored findings instead of parsing again"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = AnalysisStore(os.path.join(directory, 'analysis.sqlite'))
+        snapshot = RepositorySnapshot('owner/repo', 'c1')
+        snapshot.add('src/collect.cpp', SOURCE.encode('utf-8'))
+        snapshot.add('README.md', b'std::vector<int> v; for (;;) v.push_back(1);')
+
+        analyzer = StructuralAnalyzer()
+        findings = analyzer.analyze_snapshot(snapshot, ('.cpp', '.h'), store=store)
+        assert list(findings) == ['src/collect.cpp']
+
+        analyzer = StructuralAnalyzer()
+        assert analyzer.analyze_snapshot(snapshot, ('.cpp', '.h'), store=store) == findings
+        assert analyzer.cache.stats()['parsed'] == 0
+    print("✅ Stored findings test passed")
+
+if __name__ == "__main__":
+    print("🧪 Testing AST Cache")
+    print("=" * 50)
+
+    test_text_edit()
+    if ast_available():
+        test_push_back_in_loop()
+        test_incremental_reparse()
+        test_findings_stored_by_blob()
+    else:
+        print("⚠️  tree-sitter not installed - skipping structural rule tests")
+
+    print("\n🎉 All AST cache tests passed!")
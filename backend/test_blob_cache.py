@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+"""
+Test the content-addressed blob cache and tree-based snapshot loading
+"""
+
+import io
+import json
+import tarfile
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from blob_cache import BlobCache, git_blob_sha
+from github_transport import GitHubTransport
+from repo_snapshot import load_snapshot
+
+REPO = 'NiloticNetwork/NiloticNetworkBlockchain'
+
+class _GitHandler(BaseHTTPRequestHandler):
+    """Serves a tree, its blobs and a tarball; counts what was requested"""
+    protocol_version = 'HTTP/1.1'
+    files = {}
+    requests_seen = []
+
+    def do_GET(self):
+        type(self).requests_seen.append(self.path.split('?')[0])
+        by_sha = {git_blob_sha(content): content for content in self.files.values()}
+
+        if '/git/trees/' in self.path:
+            tree = [{'path': path, 'type': 'blob', 'sha': git_blob_sha(content)} for path, content in self.files.items()]
+            self._send(json.dumps({'tree': tree, 'truncated': False}).encode('utf-8'))
+        elif '/git/blobs/' in self.path:
+            self._send(by_sha[self.path.rsplit('/', 1)[1]])
+        else:
+            buffer = io.BytesIO()
+            with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+                for path, content in self.files.items():
+                    info = tarfile.TarInfo(f"root/{path}")
+                    info.size = len(content)
+                    archive.addfile(info, io.BytesIO(content))
+            self._send(buffer.getvalue())
+
+    def _send(self, body):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def test_git_blob_sha():
+    """Blob SHAs should match git hash-object"""
+    assert git_blob_sha(b'hello\n') == 'ce013625030ba8dba906f756967f9e9ca394464a'
+    print("✅ Blob SHA matches git")
+
+def test_lru_eviction_and_compression():
+    """Entries should be compressed and evicted least recently used first"""
+    with tempfile.TemporaryDirectory() as directory:
+        first, second, third = (bytes([i]) * 4000 for i in range(3))
+
+        # Each blob compresses to about 30 bytes, so two of them fit
+        cache = BlobCache(directory, max_bytes=60, compress=True)
+
+        a = cache.put(first)
+        b = cache.put(second)
+        assert cache.get(a) == first
+        c = cache.put(third)
+
+        assert b not in cache
+        assert cache.stats()['evictions'] == 1
+
+        # A new cache over the same directory sees the surviving blobs
+        cache = BlobCache(directory, max_bytes=60, compress=True)
+        assert cache.get(a) == first
+        assert cache.get(c) == third
+        print(f"✅ Blob cache: {cache.stats()}")
+
+def test_only_changed_blobs_downloaded():
+    """After a small change only the new blob should be fetched"""
+    files = {f"src/core/file{i}.cpp": f"int value{i} = {i};\n".encode('utf-8') for i in range(20)}
+    handler = type('Handler', (_GitHandler,), {'files': dict(files), 'requests_seen': []})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            transport = GitHubTransport(base_url=f"http://127.0.0.1:{server.server_port}")
+            cache = BlobCache(directory)
+
+            # First run: nothing cached, so the tarball fills the cache
+            with load_snapshot(REPO, 'c1', {}, transport=transport, blob_cache=cache, max_blob_fetches=5) as snapshot:
+                assert snapshot.file_count == 20
+            assert any('/tarball/' in path for path in handler.requests_seen)
+
+            handler.files['src/core/file3.cpp'] = b'int value3 = 42;\n'
+            handler.requests_seen.clear()
+
+            with load_snapshot(REPO, 'c2', {}, transport=transport, blob_cache=cache, max_blob_fetches=5) as snapshot:
+                assert snapshot.read('src/core/file3.cpp') == b'int value3 = 42;\n'
+
+            blob_requests = [path for path in handler.requests_seen if '/git/blobs/' in path]
+            assert len(blob_requests) == 1
+            assert not any('/tarball/' in path for path in handler.requests_seen)
+            print("✅ Only the changed blob was downloaded")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    print("🧱 Testing Blob Cache")
+    print("=" * 50)
+    test_git_blob_sha()
+    test_lru_eviction_and_compression()
+    test_only_changed_blobs_downloaded()
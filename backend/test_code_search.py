@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+"""
+Test trigram query planning and incremental code search
+"""
+
+import os
+import tempfile
+from blob_cache import BlobCache
+from code_search import CodeSearch, get_regex_workers, pattern_problem, plan_query, required_literals
+
+BLOCKCHAIN_CPP = b'''#include "blockchain.h"
+double Blockchain::getTotalSupply() const {
+    return totalSupply;
+}
+void Blockchain::addBlock(const Block& block) {
+    chain.push_back(block);
+}
+'''
+
+WALLET_CPP = b'''#include "wallet.h"
+void Wallet::sign(const std::string& data) {
+    strcpy(buffer, data.c_str());
+}
+'''
+
+def test_plan_query():
+    """Only literals every match must contain should become required trigrams"""
+    assert required_literals(r'total\w+Supply') == ['total', 'Supply']
+    assert required_literals(r'getChain\(\)\.size\(\)') == ['getChain().size()']
+    assert required_literals(r'ab+cd') == ['ab', 'cd']
+    assert required_literals(r'x{0,2}yyy') == ['yyy']
+    assert required_literals(r'\x41BCD') == ['BCD']
+
+    assert plan_query('strcpy') == [{'str', 'trc', 'rcp', 'cpy'}]
+    assert plan_query('foo|[abc]bar') == [{'foo'}, {'bar'}]
+    assert plan_query('(?i)Wallet') == [{'wal', 'all', 'lle', 'let'}]
+    # Nothing to narrow by: every file is a candidate
+    assert plan_query('a.b') is None
+    assert plan_query('foo|b') is None
+    assert plan_query('(?x)a b c') is None
+    print("✅ Query planning test passed")
+
+def test_incremental_search():
+    """Only new blobs should be read, and changed or removed paths should leave the postings"""
+    with tempfile.TemporaryDirectory() as directory:
+        search = CodeSearch(os.path.join(directory, 'search.sqlite'), BlobCache(os.path.join(directory, 'blobs')))
+        contents = {'src/blockchain.cpp': BLOCKCHAIN_CPP, 'src/wallet.cpp': WALLET_CPP}
+        reads = []
+
+        def read(path):
+            reads.append(path)
+            return contents[path]
+
+        summary = search.update('owner/repo', 'c1', {'src/blockchain.cpp': 'b1', 'src/wallet.cpp': 'w1'}, read)
+        assert summary == {'files': 2, 'changed': 2, 'removed': 0, 'indexed': 2}
+
+        result = search.search('owner/repo', 'strcpy(')
+        assert result['candidates'] == 1
+        assert [(r['path'], r['line'], r['column']) for r in result['results']] == [('src/wallet.cpp', 3, 5)]
+        assert result['results'][0]['text'] == '    strcpy(buffer, data.c_str());'
+
+        result = search.search('owner/repo', r'Blockchain::\w+\(', regex=True)
+        assert [r['line'] for r in result['results']] == [2, 5]
+        assert search.search('owner/repo', 'RETURN TOTALSUPPLY', case_sensitive=False)['results'][0]['line'] == 3
+        assert search.search('owner/repo', 'RETURN TOTALSUPPLY')['results'] == []
+        assert search.search('owner/repo', 'strcpy(', regex=True) is None
+
+        # Replace the wallet and delete the blockchain source
+        contents['src/wallet.cpp'] = WALLET_CPP.replace(b'strcpy', b'strncpy')
+        reads.clear()
+        summary = search.update('owner/repo', 'c2', {'src/wallet.cpp': 'w2'}, read)
+        assert summary == {'files': 1, 'changed': 1, 'removed': 1, 'indexed': 1}
+        assert reads == ['src/wallet.cpp']
+        assert search.search('owner/repo', 'strcpy')['candidates'] == 0
+        assert search.search('owner/repo', 'totalSupply')['candidates'] == 0
+
+        # A fresh instance rebuilds the postings from SQLite without reading blobs
+        restarted = CodeSearch(os.path.join(directory, 'search.sqlite'), BlobCache(os.path.join(directory, 'blobs')))
+        reads.clear()
+        restarted.update('owner/repo', 'c2', {'src/wallet.cpp': 'w2'}, read)
+        assert reads == []
+        assert restarted.search('owner/repo', 'strncpy')['results'][0]['path'] == 'src/wallet.cpp'
+    print("✅ Incremental search test passed")
+
+def test_regex_limits():
+    """Runaway regexes should be refused or stopped, returning the matches found so far"""
+    assert pattern_problem(r'Blockchain::\w+\(') is None
+    assert pattern_problem(r'(?:ab)+|(abc)*|x{2,}') is None
+    assert pattern_problem('a' * 300) is not None
+    assert pattern_problem(r'(\w)\1') is not None
+    assert pattern_problem(r'(a+)+$') is not None
+    assert pattern_problem(r'(?:x|\w*){3,}') is not None
+
+    with tempfile.TemporaryDirectory() as directory:
+        search = CodeSearch(os.path.join(directory, 'search.sqlite'), BlobCache(os.path.join(directory, 'blobs')))
+        contents = {'a.cpp': b'int x;\n', 'b.cpp': b'a' * 40 + b'\n'}
+        search.update('owner/repo', 'c1', {'a.cpp': 'a1', 'b.cpp': 'b1'}, contents.get)
+
+        assert search.search('owner/repo', r'(a+)+$', regex=True) is None
+        assert search.search('owner/repo', r'int', regex=True)['timed_out'] is False
+
+        # Later queries reuse the idle worker instead of starting a process
+        worker = get_regex_workers().acquire()
+        get_regex_workers().release(worker)
+        assert search.search('owner/repo', r'x;', regex=True)['results'][0]['path'] == 'a.cpp'
+        assert get_regex_workers().acquire() is worker
+        get_regex_workers().release(worker)
+
+        # Catastrophic backtracking that slips past the checks is stopped by the budget
+        os.environ['GITHUB_CODE_SEARCH_TIMEOUT'] = '0.5'
+        try:
+            result = search.search('owner/repo', r'int|(?:a|a)*!', regex=True)
+        finally:
+            del os.environ['GITHUB_CODE_SEARCH_TIMEOUT']
+        assert result['timed_out'] is True
+        assert [r['path'] for r in result['results']] == ['a.cpp']
+        assert result['elapsed_ms'] < 2000
+
+        # The overrunning worker was killed and the next search gets a fresh one
+        assert not worker.alive
+        assert search.search('owner/repo', r'int', regex=True)['results'][0]['path'] == 'a.cpp'
+    print("✅ Regex limits test passed")
+
+if __name__ == "__main__":
+    print("🧪 Testing Code Search")
+    print("=" * 50)
+
+    test_plan_query()
+    test_incremental_search()
+    test_regex_limits()
+
+    print("\n🎉 All code search tests passed!")
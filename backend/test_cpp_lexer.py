@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+"""
+Test the comment- and literal-aware C++ lexer
+"""
+
+from cpp_lexer import code_view, lex, masked_spans
+
+SOURCE = r'''#include "wallet.h"
+#define LIMIT 1'000'000 // strcpy(a, b)
+/* sprintf(buf, "x");
+   rand() */
+char quote = '"'; auto raw = R"sql(select "strcpy(" from t)sql";
+strcpy(dest, "it's");
+'''
+
+def lex_text(text):
+    return [(kind, text[start:end]) for kind, start, end in lex(text)]
+
+def test_tokens():
+    """Every token should come back as a span of the original text"""
+    tokens = [(kind, SOURCE[start:end]) for kind, start, end in lex(SOURCE) if kind != 'space']
+    assert tokens[:4] == [
+        ('include', '#include "wallet.h"'),
+        ('directive', "#define LIMIT 1'000'000 "),
+        ('comment', '// strcpy(a, b)'),
+        ('comment', '/* sprintf(buf, "x");\n   rand() */')
+    ]
+    assert ('character', "'\"'") in tokens
+    assert ('string', 'R"sql(select "strcpy(" from t)sql"') in tokens
+    assert ('number', "1'000") in lex_text("x = 1'000;")
+    assert ''.join(SOURCE[start:end] for _, start, end in lex(SOURCE)) == SOURCE
+    print("✅ Token span test passed")
+
+def test_code_view():
+    """Comments and literals should be blanked without moving any offset"""
+    view = code_view(SOURCE)
+    assert len(view) == len(SOURCE)
+    assert view.count('\n') == SOURCE.count('\n')
+    assert 'strcpy' not in view.replace('strcpy(dest', '')
+    assert 'sprintf' not in view and 'rand' not in view
+    # Header names and digit separators stay visible to rules
+    assert view.startswith('#include "wallet.h"\n#define LIMIT 1\'000\'000 ')
+    assert view.splitlines()[5] == 'strcpy(dest,       );'
+    text = 'a = "x"; // y\n'
+    assert [text[start:end] for start, end in masked_spans(text)] == ['"x"', '// y']
+    # Literals in directive bodies are masked; header names are not
+    text = '#include "a.h"\n#define MSG "strcpy(" /* x */\n'
+    assert [text[start:end] for start, end in masked_spans(text)] == ['"strcpy("', '/* x */']
+    print("✅ Code view test passed")
+
+if __name__ == "__main__":
+    print("🧪 Testing C++ Lexer")
+    print("=" * 50)
+
+    test_tokens()
+    test_code_view()
+
+    print("\n🎉 All C++ lexer tests passed!")
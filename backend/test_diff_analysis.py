@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+"""
+Test diff-only analysis: patch parsing, added-line findings and mirror diffs
+"""
+
+import os
+import tempfile
+import subprocess
+from diff_analysis import analyze_files, analyze_patch, parse_patch
+from git_mirror import GitMirror
+from rule_engine import Rule, RuleEngine
+from tree_filter import TreeFilter
+
+ENGINE = RuleEngine([
+    Rule(id='strcpy', pattern=r'strcpy\s*\(', title='strcpy', description='', severity='high', category='security'),
+    Rule(id='rand', pattern=r'\brand\s*\(', title='rand', description='', severity='medium', category='security')
+])
+
+PATCH = (
+    "@@ -10,4 +10,5 @@ void Storage::save() {\n"
+    "     char buffer[64];\n"
+    "-    memcpy(buffer, key, 64);\n"
+    "+    strcpy(buffer, key);\n"
+    "+    int salt = rand();\n"
+    "     write(buffer);\n"
+    "     strcpy(old, buffer);\n"
+    "@@ -40,2 +41,3 @@ void Storage::load() {\n"
+    "     read(buffer);\n"
+    "+    strcpy(buffer, path);\n"
+    "     close();\n"
+)
+
+def test_parse_patch_positions():
+    """New-file lines and diff positions should follow GitHub's numbering"""
+    hunks = parse_patch(PATCH)
+    assert len(hunks) == 2
+
+    first = [(entry['kind'], entry['line'], entry['position']) for entry in hunks[0]]
+    # The removed line takes position 2 but has no new-file line
+    assert first == [(' ', 10, 1), ('+', 11, 3), ('+', 12, 4), (' ', 13, 5), (' ', 14, 6)]
+
+    # The second hunk header counts as a position too
+    second = [(entry['kind'], entry['line'], entry['position']) for entry in hunks[1]]
+    assert second == [(' ', 41, 8), ('+', 42, 9), (' ', 43, 10)]
+    print("✅ Patch parsing test passed")
+
+def test_analyze_patch_reports_added_lines():
+    """Only findings that start on an added line should be reported"""
+    findings = analyze_patch(PATCH, ENGINE.scan, context=1)
+    reported = [(finding['rule_id'], finding['line'], finding['position']) for finding in findings]
+
+    # strcpy on the unchanged line 14 is context, not part of the change
+    assert reported == [('strcpy', 11, 3), ('rand', 12, 4), ('strcpy', 42, 9)]
+    assert all(finding['column'] == 5 for finding in findings if finding['rule_id'] == 'strcpy')
+    print("✅ Added-line findings test passed")
+
+def test_window_inside_comment():
+    """A context window starting inside a block comment should not lex the comment body as code"""
+    patch = (
+        "@@ -1,6 +1,8 @@\n"
+        " /*\n"
+        "  * Storage notes\n"
+        "  * kept for reference\n"
+        "+ * strcpy(dest, src) must not come back\n"
+        "  */\n"
+        " int version;\n"
+        "+void copy(char *d) { strcpy(d, \"x\"); }\n"
+    )
+    findings = analyze_patch(patch, ENGINE.scan, context=1)
+    assert [(finding['rule_id'], finding['line']) for finding in findings] == [('strcpy', 7)]
+    print("✅ Comment window test passed")
+
+def test_analyze_files_skips():
+    """Removed, patchless and filtered files should not be analyzed"""
+    files = [
+        {'filename': 'src/persistence/storage.cpp', 'status': 'modified', 'patch': PATCH},
+        {'filename': 'src/old.cpp', 'status': 'removed', 'patch': PATCH},
+        {'filename': 'assets/logo.png', 'status': 'added'},
+        {'filename': 'third_party/json.hpp', 'status': 'modified', 'patch': PATCH}
+    ]
+    results = analyze_files(files, ENGINE.scan, tree_filter=TreeFilter())
+    assert list(results) == ['src/persistence/storage.cpp']
+    assert len(results['src/persistence/storage.cpp']) == 3
+    print("✅ File filtering test passed")
+
+def _git(directory, *args):
+    return subprocess.run(
+        ['git', '-C', directory, '-c', 'user.name=Atim', '-c', 'user.email=atim@example.com'] + list(args),
+        capture_output=True, check=True
+    ).stdout.decode('utf-8').strip()
+
+def _write(directory, path, content):
+    target = os.path.join(directory, path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'w') as f:
+        f.write(content)
+
+def test_mirror_diff_files():
+    """A mirror range diff should be analyzable like GitHub's compare files"""
+    with tempfile.TemporaryDirectory() as origin, tempfile.TemporaryDirectory() as mirrors:
+        _git(origin, 'init', '--quiet', '--initial-branch=main')
+        _write(origin, 'src/storage.cpp', ''.join(f"int line{i} = {i};\n" for i in range(1, 21)))
+        _write(origin, 'src/legacy.cpp', 'void legacy() {}\n')
+        _git(origin, 'add', '.')
+        _git(origin, 'commit', '--quiet', '-m', 'Initial commit')
+
+        mirror = GitMirror('NiloticNetwork/NiloticNetworkBlockchain', url=origin, directory=mirrors)
+        first = mirror.fetch()
+
+        lines = [f"int line{i} = {i};\n" for i in range(1, 21)]
+        lines.insert(15, 'void copy(char *d, const char *s) { strcpy(d, s); }\n')
+        _write(origin, 'src/storage.cpp', ''.join(lines))
+        _write(origin, 'src/wallet.cpp', 'int seed() { return rand(); }\n')
+        _write(origin, 'src/naïve "copy".cpp', 'void copy(char *d) { strcpy(d, "x"); }\n')
+        os.remove(os.path.join(origin, 'src/legacy.cpp'))
+        _git(origin, 'add', '-A')
+        _git(origin, 'commit', '--quiet', '-m', 'Second commit')
+        second = mirror.fetch()
+
+        files = mirror.diff_files(first, second)
+        statuses = {entry['filename']: entry['status'] for entry in files}
+        assert statuses == {
+            'src/legacy.cpp': 'removed', 'src/naïve "copy".cpp': 'added',
+            'src/storage.cpp': 'modified', 'src/wallet.cpp': 'added'
+        }
+
+        results = analyze_files(files, ENGINE.scan)
+        assert [(f['rule_id'], f['line'], f['position']) for f in results['src/storage.cpp']] == [('strcpy', 16, 4)]
+        assert [(f['rule_id'], f['line'], f['position']) for f in results['src/wallet.cpp']] == [('rand', 1, 1)]
+        assert [f['rule_id'] for f in results['src/naïve "copy".cpp']] == ['strcpy']
+        assert 'src/legacy.cpp' not in results
+    print("✅ Mirror diff test passed")
+
+def test_mirror_diff_from_merge_base():
+    """Commits on the base branch since the fork should not show up as reverted"""
+    with tempfile.TemporaryDirectory() as origin, tempfile.TemporaryDirectory() as mirrors:
+        _git(origin, 'init', '--quiet', '--initial-branch=main')
+        _write(origin, 'src/main.cpp', 'int main() { return 0; }\n')
+        _git(origin, 'add', '.')
+        _git(origin, 'commit', '--quiet', '-m', 'Initial commit')
+
+        _git(origin, 'checkout', '--quiet', '-b', 'feature')
+        _write(origin, 'src/wallet.cpp', 'void copy(char *d) { strcpy(d, "x"); }\n')
+        _git(origin, 'add', '.')
+        _git(origin, 'commit', '--quiet', '-m', 'Feature commit')
+        feature = _git(origin, 'rev-parse', 'HEAD')
+
+        _git(origin, 'checkout', '--quiet', 'main')
+        _write(origin, 'src/seed.cpp', 'int seed() { return rand(); }\n')
+        _git(origin, 'add', '.')
+        _git(origin, 'commit', '--quiet', '-m', 'Main commit')
+
+        mirror = GitMirror('NiloticNetwork/NiloticNetworkBlockchain', url=origin, directory=mirrors)
+        main = mirror.fetch()
+
+        files = mirror.diff_files(main, feature)
+        assert [(entry['filename'], entry['status']) for entry in files] == [('src/wallet.cpp', 'added')]
+    print("✅ Merge base diff test passed")
+
+if __name__ == "__main__":
+    print("🧪 Testing Diff Analysis")
+    print("=" * 50)
+
+    test_parse_patch_positions()
+    test_analyze_patch_reports_added_lines()
+    test_window_inside_comment()
+    test_analyze_files_skips()
+    test_mirror_diff_files()
+    test_mirror_diff_from_merge_base()
+
+    print("\n🎉 All diff analysis tests passed!")
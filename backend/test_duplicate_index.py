@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+"""
+Test winnowing fingerprints and incremental duplicate code detection
+"""
+
+import os
+import tempfile
+from duplicate_index import DuplicateIndex, duplicate_proposals, fingerprint, tokenize, winnow
+
+VALIDATE_BLOCK = '''bool Blockchain::isValidTransaction(const Transaction& tx) const {
+    if (tx.amount <= 0 || tx.fee < 0) {
+        return false;
+    }
+    if (tx.sender.empty() || tx.receiver.empty()) {
+        return false;
+    }
+    if (getBalance(tx.sender) < tx.amount + tx.fee) {
+        return false;
+    }
+    return verifySignature(tx.sender, tx.signature, tx.hash());
+}
+'''
+
+# The same logic with every name changed and a comment added
+VALIDATE_COPY = '''#include "mempool.h"
+
+int unrelated(int value) { return value * 2; }
+
+bool Mempool::acceptTransfer(const Transfer& t) const {
+    // Copied from the blockchain so the mempool can reject early
+    if (t.value <= 0 || t.cost < 0) {
+        return false;
+    }
+    if (t.from.empty() || t.to.empty()) {
+        return false;
+    }
+    if (balanceOf(t.from) < t.value + t.cost) {
+        return false;
+    }
+    return checkSignature(t.from, t.sig, t.digest());
+}
+'''
+
+UNRELATED = '''void Wallet::save(const std::string& path) {
+    std::ofstream out(path);
+    for (const auto& key : keys) {
+        out << key.serialize() << "\\n";
+    }
+}
+'''
+
+def test_fingerprints():
+    """Renamed copies should share fingerprints; comments and directives should not count"""
+    assert [token for token, _ in tokenize('#include <x>\nint a = 1; // note\n')] == ['int', 'I', '=', 'N', ';']
+    assert [token for token, _ in tokenize('f("a \\" b", \'c\');')] == ['I', '(', 'S', ',', 'S', ')', ';']
+
+    hashes = [5, 3, 8, 3, 9, 1, 7, 7, 2, 6]
+    assert winnow(hashes, 4) == [3, 5, 8]
+
+    original = {value for value, _, _, _ in fingerprint(VALIDATE_BLOCK)}
+    copy = {value for value, _, _, _ in fingerprint(VALIDATE_COPY)}
+    assert len(original & copy) >= len(original) - 1
+    print("✅ Fingerprint test passed")
+
+def test_incremental_duplicates():
+    """Copies across files should be found and updates should only fingerprint new blobs"""
+    with tempfile.TemporaryDirectory() as directory:
+        index = DuplicateIndex(os.path.join(directory, 'duplicates.sqlite'))
+        contents = {
+            'src/blockchain.cpp': '#include "blockchain.h"\n' + VALIDATE_BLOCK,
+            'src/mempool.cpp': VALIDATE_COPY,
+            'src/wallet.cpp': UNRELATED
+        }
+        reads = []
+
+        def read(path):
+            reads.append(path)
+            return contents[path]
+
+        summary = index.update('owner/repo', 'c1', {'src/blockchain.cpp': 'b1', 'src/mempool.cpp': 'm1',
+                                                     'src/wallet.cpp': 'w1'}, read)
+        assert summary == {'files': 3, 'changed': 3, 'removed': 0, 'fingerprinted': 3}
+
+        regions = index.duplicates('owner/repo', min_tokens=40)
+        assert len(regions) == 1
+        first, second = regions[0]['first'], regions[0]['second']
+        assert first['path'] == 'src/blockchain.cpp' and second['path'] == 'src/mempool.cpp'
+        assert first['start_line'] <= 3 and first['end_line'] >= 10
+        assert second['start_line'] <= 7 and second['end_line'] >= 15
+        assert index.duplicates('owner/repo', min_tokens=500) == []
+
+        # Removing the copy removes the duplicate without reading anything
+        reads.clear()
+        index.update('owner/repo', 'c2', {'src/blockchain.cpp': 'b1', 'src/wallet.cpp': 'w1'}, read)
+        assert reads == []
+        assert index.duplicates('owner/repo', min_tokens=40) == []
+
+        # A copy within one file is found too
+        contents['src/blockchain.cpp'] = VALIDATE_BLOCK + '\n' + VALIDATE_BLOCK.replace('isValidTransaction', 'isValidReward')
+        index.update('owner/repo', 'c3', {'src/blockchain.cpp': 'b2', 'src/wallet.cpp': 'w1'}, read)
+        assert reads == ['src/blockchain.cpp']
+        regions = index.duplicates('owner/repo', min_tokens=40)
+        assert [(r['first']['path'], r['second']['path']) for r in regions] == [('src/blockchain.cpp',) * 2]
+        assert regions[0]['second']['start_line'] > regions[0]['first']['end_line']
+    print("✅ Incremental duplicate detection test passed")
+
+def test_duplicate_proposals():
+    """Regions between same-named files or within one file should get distinct titles"""
+    def copy(path, start, end):
+        return {'path': path, 'start_line': start, 'end_line': end}
+
+    regions = [
+        {'tokens': 160, 'first': copy('src/a/util.cpp', 1, 20), 'second': copy('src/b/util.cpp', 5, 24)},
+        {'tokens': 60, 'first': copy('src/a/util.cpp', 40, 48), 'second': copy('src/b/util.cpp', 60, 68)},
+        {'tokens': 60, 'first': copy('src/a/util.cpp', 40, 48), 'second': copy('src/a/util.cpp', 70, 78)}
+    ]
+    proposals = duplicate_proposals(regions)
+    assert len({p['title'] for p in proposals}) == 3
+    assert proposals[0]['title'] == 'Duplicated code in src/a/util.cpp:1-20 and src/b/util.cpp:5-24'
+    assert [(p['id'], p['severity'], p['line_number']) for p in proposals] == [
+        ('dup_1', 'medium', 1), ('dup_2', 'low', 40), ('dup_3', 'low', 40)
+    ]
+    print("✅ Duplicate proposals test passed")
+
+if __name__ == "__main__":
+    print("🧪 Testing Duplicate Index")
+    print("=" * 50)
+
+    test_fingerprints()
+    test_incremental_duplicates()
+    test_duplicate_proposals()
+
+    print("\n🎉 All duplicate index tests passed!")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+"""
+Test the local git mirror backend against a repository fixture on disk
+"""
+
+import os
+import tempfile
+import subprocess
+from analysis_executor import AnalysisExecutor
+from analysis_store import AnalysisStore
+from git_mirror import GitMirror
+from rule_engine import Rule, RuleEngine
+from tree_filter import TreeFilter
+
+REPO = 'NiloticNetwork/NiloticNetworkBlockchain'
+
+ENGINE = RuleEngine([
+    Rule(id='strcpy', pattern=r'strcpy\s*\(', title='strcpy', description='', severity='high', category='security')
+])
+
+def _git(directory, *args):
+    subprocess.run(
+        ['git', '-C', directory, '-c', 'user.name=Atim', '-c', 'user.email=atim@example.com'] + list(args),
+        capture_output=True, check=True
+    )
+
+def _write(directory, path, content):
+    target = os.path.join(directory, path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'w') as f:
+        f.write(content)
+
+def _fixture(directory):
+    """A local repository with sources in subdirectories and a vendored file"""
+    _git(directory, 'init', '--quiet', '--initial-branch=main')
+    _write(directory, 'src/core/blockchain.cpp', 'void Blockchain::addBlock() {}\n')
+    _write(directory, 'src/persistence/storage.cpp', 'void copy(char *d, const char *s) { strcpy(d, s); }\n')
+    _write(directory, 'third_party/json.hpp', 'namespace nlohmann { void f(char *d) { strcpy(d, "x"); } }\n')
+    _write(directory, 'README.md', '# Nilotic Network\n')
+    _git(directory, 'add', '.')
+    _git(directory, 'commit', '--quiet', '-m', 'Initial commit')
+
+def test_fetch_and_diff():
+    """The mirror should fetch new commits and list the files they changed"""
+    with tempfile.TemporaryDirectory() as origin, tempfile.TemporaryDirectory() as mirrors:
+        _fixture(origin)
+        mirror = GitMirror(REPO, url=origin, directory=mirrors)
+
+        first = mirror.fetch()
+        assert first and len(first) == 40
+
+        _write(origin, 'src/core/blockchain.cpp', 'void Blockchain::addBlock() { rand(); }\n')
+        _write(origin, 'src/core/wallet.h', 'class Wallet;\n')
+        _git(origin, 'add', '.')
+        _git(origin, 'commit', '--quiet', '-m', 'Second commit')
+
+        second = mirror.fetch()
+        assert second != first
+        assert mirror.changed_files(first, second) == ['src/core/blockchain.cpp', 'src/core/wallet.h']
+        assert mirror.changed_files('0' * 40, second) is None
+        print(f"✅ Mirror fetched {first[:7]}..{second[:7]}")
+
+def test_token_stays_off_the_command_line():
+    """The auth header should reach git through its environment, not argv or the config file"""
+    with tempfile.TemporaryDirectory() as origin, tempfile.TemporaryDirectory() as mirrors:
+        _fixture(origin)
+        mirror = GitMirror(REPO, url=origin, directory=mirrors, token='secret-token')
+        assert mirror.fetch()
+
+        header = mirror._git('config', '--get', 'http.extraHeader', remote=True).decode('utf-8').strip()
+        assert header.startswith('Authorization: Basic ')
+        with open(os.path.join(mirror.path, 'config')) as f:
+            assert 'Authorization' not in f.read()
+        print("✅ Token passed through the environment")
+
+def test_snapshot_analysis():
+    """Mirror snapshots should work with the analysis store like downloaded ones"""
+    with tempfile.TemporaryDirectory() as origin, tempfile.TemporaryDirectory() as mirrors:
+        _fixture(origin)
+        mirror = GitMirror(REPO, url=origin, directory=mirrors)
+        sha = mirror.fetch()
+
+        with mirror.snapshot(sha, TreeFilter()) as snapshot:
+            assert snapshot.paths() == ['src/core/blockchain.cpp', 'src/persistence/storage.cpp']
+            assert snapshot.read_text('src/core/blockchain.cpp') == 'void Blockchain::addBlock() {}\n'
+            assert snapshot.read('missing.cpp') is None
+
+            store = AnalysisStore(os.path.join(mirrors, 'analysis.sqlite'))
+            findings = store.analyze_snapshot(
+                REPO, snapshot, ENGINE.version, ENGINE.scan, executor=AnalysisExecutor(max_workers=1)
+            )
+
+        assert findings['src/core/blockchain.cpp'] == []
+        assert findings['src/persistence/storage.cpp'][0]['rule_id'] == 'strcpy'
+        assert store.last_run(REPO, ENGINE.version)['commit_sha'] == sha
+        print("✅ Mirror snapshot analyzed offline")
+
+if __name__ == "__main__":
+    print("🪞 Testing Git Mirror")
+    print("=" * 50)
+    test_fetch_and_diff()
+    test_token_stays_off_the_command_line()
+    test_snapshot_analysis()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+"""
+Test ETag revalidation and LRU eviction in the GitHub conditional request cache
+"""
+
+import json
+import threading
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from github_http_cache import ConditionalRequestCache
+from github_transport import GitHubTransport
+
+class _ETagHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    max_age = 0
+    full_responses = 0
+
+    def do_GET(self):
+        etag = '"v1"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        type(self).full_responses += 1
+        body = json.dumps({'full_name': 'NiloticNetwork/NiloticNetworkBlockchain'}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', f'private, max-age={self.max_age}')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def _start_server(max_age):
+    handler = type('Handler', (_ETagHandler,), {'max_age': max_age, 'full_responses': 0})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, handler
+
+def test_not_modified_served_from_cache():
+    """A 304 should return the cached body"""
+    server, handler = _start_server(max_age=0)
+    try:
+        transport = GitHubTransport(base_url=f"http://127.0.0.1:{server.server_port}")
+
+        for _ in range(3):
+            response = transport.get('/repos/NiloticNetwork/NiloticNetworkBlockchain', use_cache=True)
+            assert response.status_code == 200
+            assert response.json()['full_name'] == 'NiloticNetwork/NiloticNetworkBlockchain'
+
+        stats = transport.cache.stats()
+        assert handler.full_responses == 1
+        assert stats['misses'] == 1
+        assert stats['not_modified'] == 2
+        print(f"✅ Conditional requests: {stats}")
+    finally:
+        server.shutdown()
+
+def test_fresh_entries_skip_the_network():
+    """Responses inside max-age should not be revalidated"""
+    server, handler = _start_server(max_age=60)
+    try:
+        transport = GitHubTransport(base_url=f"http://127.0.0.1:{server.server_port}")
+
+        transport.get('/repos/NiloticNetwork/NiloticNetworkBlockchain', use_cache=True)
+        transport.get('/repos/NiloticNetwork/NiloticNetworkBlockchain', use_cache=True)
+
+        stats = transport.cache.stats()
+        assert stats['hits'] == 1
+        assert transport.connection_stats()['127.0.0.1']['requests'] == 1
+        print("✅ Fresh cache entries served without a request")
+    finally:
+        server.shutdown()
+
+def test_lru_eviction():
+    """The least recently used entry should be evicted first"""
+    cache = ConditionalRequestCache(max_entries=2)
+
+    def fake_response(name):
+        response = requests.Response()
+        response.status_code = 200
+        response.url = f"https://api.github.com/{name}"
+        response.headers['ETag'] = f'"{name}"'
+        response._content = name.encode('utf-8')
+        return response
+
+    cache.store('a', fake_response('a'))
+    cache.store('b', fake_response('b'))
+    cache.get('a')
+    cache.store('c', fake_response('c'))
+
+    assert cache.get('a') is not None
+    assert cache.get('b') is None
+    assert cache.get('c') is not None
+    assert cache.stats()['evictions'] == 1
+    print("✅ LRU eviction keeps recently used entries")
+
+if __name__ == "__main__":
+    print("🗄️  Testing GitHub Conditional Request Cache")
+    print("=" * 50)
+    test_not_modified_served_from_cache()
+    test_fresh_entries_skip_the_network()
+    test_lru_eviction()
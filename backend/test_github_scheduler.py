@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+"""
+Test rate limit budgeting, retries and write pacing in the GitHub scheduler
+"""
+
+import io
+import time
+import threading
+import requests
+from github_scheduler import GitHubRequestScheduler, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+
+def _response(status_code=200, **headers):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers)
+    response._content = b'{}'
+    response.raw = io.BytesIO(b'{}')
+    return response
+
+def test_retry_after_is_honoured():
+    """A 429 with Retry-After should be retried instead of returned"""
+    scheduler = GitHubRequestScheduler(max_retries=2, min_write_interval=0)
+    responses = iter([_response(429, **{'Retry-After': '0.2'}), _response(201)])
+
+    started = time.time()
+    response = scheduler.execute(lambda: next(responses), 'installation:1', is_write=True)
+
+    assert response.status_code == 201
+    assert time.time() - started >= 0.2
+    assert scheduler.stats()['installation:1']['rate_limited_responses'] == 1
+    print("✅ Retry-After honoured before retrying")
+
+def test_background_calls_wait_for_reset():
+    """Background calls should wait when only the interactive reserve is left"""
+    scheduler = GitHubRequestScheduler(background_reserve=10, min_write_interval=0)
+    reset_at = time.time() + 0.3
+    scheduler.record('installation:1', _response(**{
+        'X-RateLimit-Limit': '5000',
+        'X-RateLimit-Remaining': '5',
+        'X-RateLimit-Reset': str(reset_at)
+    }))
+
+    started = time.time()
+    scheduler.acquire('installation:1', PRIORITY_INTERACTIVE)
+    assert time.time() - started < 0.1
+
+    scheduler.acquire('installation:1', PRIORITY_BACKGROUND)
+    assert time.time() >= reset_at
+    print("✅ Background call delayed until the budget reset")
+
+def test_writes_are_paced():
+    """Content-creating writes should be spaced by the minimum interval"""
+    scheduler = GitHubRequestScheduler(min_write_interval=0.2)
+
+    started = time.time()
+    for _ in range(3):
+        scheduler.acquire('installation:1', is_write=True)
+
+    assert time.time() - started >= 0.4
+    print("✅ Writes paced by the minimum interval")
+
+def test_paced_write_does_not_block_reads():
+    """A write waiting out the write interval should not hold up reads queued after it"""
+    scheduler = GitHubRequestScheduler(min_write_interval=0.5)
+    scheduler.acquire('installation:1', is_write=True)
+
+    writer = threading.Thread(target=scheduler.acquire, args=('installation:1',), kwargs={'is_write': True})
+    writer.start()
+    time.sleep(0.05)
+
+    started = time.time()
+    scheduler.acquire('installation:1')
+    assert time.time() - started < 0.2
+    assert writer.is_alive()
+
+    writer.join(5)
+    assert time.time() - started >= 0.35
+    print("✅ Reads pass a write waiting for its interval")
+
+if __name__ == "__main__":
+    print("⏱️  Testing GitHub Request Scheduler")
+    print("=" * 50)
+    test_retry_after_is_honoured()
+    test_background_calls_wait_for_reset()
+    test_writes_are_paced()
+    test_paced_write_does_not_block_reads()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+"""
+Test the single-query GraphQL repository stats provider against a local server
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from github_stats import RepositoryStatsProvider
+from github_transport import GitHubTransport
+
+class _GraphQLHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    queries = 0
+
+    def do_POST(self):
+        type(self).queries += 1
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        assert request['variables'] == {'owner': 'NiloticNetwork', 'name': 'NiloticNetworkBlockchain'}
+
+        body = json.dumps({'data': {'repository': {
+            'nameWithOwner': 'NiloticNetwork/NiloticNetworkBlockchain',
+            'description': 'Nilotic Network blockchain',
+            'stargazerCount': 12,
+            'forkCount': 3,
+            'diskUsage': 2048,
+            'updatedAt': '2024-01-01T00:00:00Z',
+            'defaultBranchRef': {'name': 'main'},
+            'primaryLanguage': {'name': 'C++'},
+            'issues': {'totalCount': 7},
+            'pullRequests': {'totalCount': 2}
+        }}}).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def test_stats_in_one_query():
+    """Stats should come from one GraphQL call and then from the TTL cache"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _GraphQLHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        transport = GitHubTransport(base_url=f"http://127.0.0.1:{server.server_port}")
+        provider = RepositoryStatsProvider(ttl=60, transport=transport)
+        headers = {'Authorization': 'Bearer test'}
+
+        stats = provider.get_stats('NiloticNetwork/NiloticNetworkBlockchain', headers)
+        assert stats['open_issues'] == 7
+        assert stats['open_pulls'] == 2
+        assert stats['default_branch'] == 'main'
+        assert stats['language'] == 'C++'
+
+        provider.get_stats('NiloticNetwork/NiloticNetworkBlockchain', headers)
+        assert _GraphQLHandler.queries == 1
+        print(f"✅ Repository stats: {stats}")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    print("📊 Testing Repository Stats Provider")
+    print("=" * 50)
+    test_stats_in_one_query()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+"""
+Test connection reuse in the shared GitHub transport against a local server
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from github_transport import GitHubTransport
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = json.dumps({'path': self.path, 'agent': self.headers.get('User-Agent')}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def _start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def test_connections_are_reused():
+    """Sequential calls should share one keep-alive connection"""
+    server = _start_server()
+    try:
+        transport = GitHubTransport(base_url=f"http://127.0.0.1:{server.server_port}", pool_size=2)
+
+        for _ in range(5):
+            response = transport.get('/repos/NiloticNetwork/NiloticNetworkBlockchain')
+            assert response.status_code == 200
+            assert response.json()['agent'] == 'Atim-AI-Assistant/1.0'
+
+        stats = transport.connection_stats()['127.0.0.1']
+        assert stats['requests'] == 5
+        assert stats['new_connections'] == 1
+        assert stats['reused_connections'] == 4
+        print(f"✅ Connection reuse: {stats}")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    print("🔌 Testing GitHub Transport")
+    print("=" * 50)
+    test_connections_are_reused()
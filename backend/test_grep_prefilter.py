@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+"""
+Test the git grep candidate-file prefilter
+"""
+
+import os
+import tempfile
+import subprocess
+from analysis_store import AnalysisStore
+from git_mirror import GitMirror
+from grep_prefilter import GrepPrefilter, git_grep_candidates
+from repo_snapshot import RepositorySnapshot
+from rule_engine import Rule, RuleEngine
+
+REPO = 'NiloticNetwork/NiloticNetworkBlockchain'
+
+RULES = [
+    Rule(id='strcpy', pattern=r'strcpy\s*\(', title='strcpy', description='', severity='high', category='security'),
+    Rule(id='using-namespace-std', pattern=r'using namespace std;', title='std', description='', severity='low', category='quality')
+]
+
+def _mirror(origin, mirrors):
+    """A repository where only two of fifty files contain a rule literal"""
+    git = ['git', '-C', origin, '-c', 'user.name=Atim', '-c', 'user.email=atim@example.com']
+    subprocess.run(git + ['init', '--quiet'], capture_output=True, check=True)
+    os.makedirs(os.path.join(origin, 'src', 'core'))
+    for i in range(48):
+        with open(os.path.join(origin, 'src', 'core', f"file{i}.cpp"), 'w') as f:
+            f.write(f"int value{i} = {i};\n")
+    with open(os.path.join(origin, 'src', 'core', 'wallet.cpp'), 'w') as f:
+        f.write('void copy(char *d, const char *s) { strcpy(d, s); }\n')
+    with open(os.path.join(origin, 'src', 'main.cpp'), 'w') as f:
+        f.write('#include <iostream>\nusing namespace std;\n')
+    subprocess.run(git + ['add', '.'], capture_output=True, check=True)
+    subprocess.run(git + ['commit', '--quiet', '-m', 'Initial commit'], capture_output=True, check=True)
+
+    mirror = GitMirror(REPO, url=origin, directory=mirrors)
+    return mirror, mirror.fetch()
+
+def test_git_grep_candidates():
+    """git grep should list only files containing a literal"""
+    with tempfile.TemporaryDirectory() as origin, tempfile.TemporaryDirectory() as mirrors:
+        mirror, sha = _mirror(origin, mirrors)
+        assert git_grep_candidates(mirror.path, sha, ['strcpy', 'using namespace std;']) == {
+            'src/core/wallet.cpp', 'src/main.cpp'
+        }
+        assert git_grep_candidates(mirror.path, sha, ['memcpy']) == set()
+        print("✅ git grep finds candidate files")
+
+def test_only_candidates_scanned():
+    """Files without any rule literal should get empty findings without a scan"""
+    engine = RuleEngine(RULES)
+    scanned = []
+
+    def counting_scan(content):
+        scanned.append(content)
+        return engine.scan(content)
+
+    with tempfile.TemporaryDirectory() as origin, tempfile.TemporaryDirectory() as mirrors:
+        mirror, sha = _mirror(origin, mirrors)
+        store = AnalysisStore(os.path.join(mirrors, 'analysis.sqlite'))
+
+        with mirror.snapshot(sha) as snapshot:
+            findings = store.analyze_snapshot(REPO, snapshot, engine.version, counting_scan, prefilter=GrepPrefilter(engine))
+
+        assert len(scanned) == 2
+        assert len(findings) == 50
+        assert findings['src/core/wallet.cpp'][0]['rule_id'] == 'strcpy'
+        assert findings['src/main.cpp'][0]['rule_id'] == 'using-namespace-std'
+        assert findings['src/core/file7.cpp'] == []
+        assert store.last_summary['prefiltered'] == 48
+        print(f"✅ Prefilter skipped {store.last_summary['prefiltered']} files")
+
+def test_no_prefilter_without_anchors():
+    """Unanchored rules or in-memory snapshots should fall back to a full scan"""
+    unanchored = RuleEngine(RULES + [
+        Rule(id='any-cast', pattern=r'(static|reinterpret)_cast', title='cast', description='', severity='low', category='quality')
+    ])
+    assert not unanchored.fully_anchored
+
+    snapshot = RepositorySnapshot(REPO, 'c1')
+    snapshot.add('src/main.cpp', b'int main() {}\n')
+    assert GrepPrefilter(unanchored)(snapshot) is None
+    assert GrepPrefilter(RuleEngine(RULES))(snapshot) is None
+    print("✅ Full scan when the prefilter cannot apply")
+
+if __name__ == "__main__":
+    print("🔎 Testing Grep Prefilter")
+    print("=" * 50)
+    test_git_grep_candidates()
+    test_only_candidates_scanned()
+    test_no_prefilter_without_anchors()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+"""
+Test offset to line and column lookups
+"""
+
+from atim import find_line_number
+from line_index import LineIndex
+from rule_engine import Rule, RuleEngine
+
+SOURCE = "#include <cstring>\n\nvoid copy(char *d, const char *s) {\n    strcpy(d, s);\n}\n"
+
+def test_positions():
+    """Offsets should map to 1-based lines and columns"""
+    index = LineIndex(SOURCE)
+    assert index.line_count == 6
+    assert index.position(0) == (1, 1)
+    assert index.position(SOURCE.index('\n')) == (1, 19)
+    assert index.position(SOURCE.index('\n') + 1) == (2, 1)
+    assert index.position(SOURCE.index('strcpy')) == (4, 5)
+    assert index.line_start(4) == SOURCE.index('    strcpy')
+    print("✅ Offsets resolve to line and column")
+
+def test_engine_findings_carry_positions():
+    """Rule hits should include the line and column of the match"""
+    engine = RuleEngine([
+        Rule(id='strcpy', pattern=r'strcpy\s*\(', title='strcpy', description='', severity='high', category='security')
+    ])
+    hits = engine.scan(SOURCE)
+    assert hits == [{'rule_id': 'strcpy', 'offset': SOURCE.index('strcpy'), 'line': 4, 'column': 5}]
+    print("✅ Rule hits carry line and column")
+
+def test_find_line_number():
+    """find_line_number should return the first line containing the string, 0 if absent"""
+    assert find_line_number(SOURCE, 'strcpy(d, s)') == 4
+    assert find_line_number(SOURCE, 'const char') == 3
+    assert find_line_number(SOURCE, 'memcpy') == 0
+    print("✅ find_line_number uses the line index")
+
+if __name__ == "__main__":
+    print("📏 Testing Line Index")
+    print("=" * 50)
+    test_positions()
+    test_engine_findings_carry_positions()
+    test_find_line_number()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+"""
+Test stable proposal ids and status persistence in the proposals table
+"""
+
+import sqlite3
+from github_integration_simple import IssueProposal
+from proposal_store import CREATE_PROPOSALS_TABLE, get_proposal, list_proposals, save_proposals, update_status
+
+REPO = 'NiloticNetwork/NiloticNetworkBlockchain'
+
+def _db():
+    db = sqlite3.connect(':memory:', detect_types=sqlite3.PARSE_DECLTYPES)
+    db.row_factory = sqlite3.Row
+    db.execute(CREATE_PROPOSALS_TABLE)
+    return db
+
+def _analysis_run():
+    return [
+        IssueProposal(id='sec_1', title='Use of unsafe strcpy function', description='strcpy overflows',
+                      severity='high', category='security', file_path='src/core/wallet.cpp', labels=['security']),
+        IssueProposal(id='sec_2', title='Use of unsafe strcpy function', description='strcpy overflows',
+                      severity='high', category='security', file_path='src/core/block.cpp', labels=['security'])
+    ]
+
+def test_ids_are_stable_across_runs():
+    """The same finding should keep its id in every analysis run"""
+    db = _db()
+    first = save_proposals(db, REPO, _analysis_run())
+    second = save_proposals(db, REPO, list(reversed(_analysis_run())))
+
+    assert sorted(first) == sorted(second)
+    assert len(set(first)) == 2
+    assert len(list_proposals(db, REPO)) == 2
+    print(f"✅ Stable proposal ids: {first}")
+
+def test_status_survives_reanalysis():
+    """Rejected proposals stay rejected; stale pending ones are dropped"""
+    db = _db()
+    rejected_id, stale_id = save_proposals(db, REPO, _analysis_run())
+
+    assert update_status(db, rejected_id, 'rejected')
+    assert not update_status(db, 'missing', 'rejected')
+
+    # The next run no longer finds either proposal
+    save_proposals(db, REPO, [])
+
+    assert get_proposal(db, rejected_id)['status'] == 'rejected'
+    assert get_proposal(db, stale_id) is None
+    print("✅ Statuses persisted across analysis runs")
+
+if __name__ == "__main__":
+    print("🗂️  Testing Proposal Store")
+    print("=" * 50)
+    test_ids_are_stable_across_runs()
+    test_status_survives_reanalysis()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+"""
+Test tarball ingestion into in-memory and on-disk repository snapshots
+"""
+
+import io
+import os
+import tarfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from github_transport import GitHubTransport
+from repo_snapshot import CPP_EXTENSIONS, RepositorySnapshot, download_snapshot
+
+FILES = {
+    'src/core/blockchain.cpp': b'void copy(char *d, const char *s) { strcpy(d, s); }\n',
+    'src/core/blockchain.h': b'#pragma once\n',
+    'README.md': b'# Nilotic Network\n'
+}
+
+def _tarball() -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        for path, content in FILES.items():
+            info = tarfile.TarInfo(f"NiloticNetwork-NiloticNetworkBlockchain-abc1234/{path}")
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+class _TarballHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    downloads = 0
+
+    def do_GET(self):
+        type(self).downloads += 1
+        body = _tarball()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def test_tarball_extracted_in_memory():
+    """The archive root should be stripped and files kept in memory"""
+    snapshot = RepositorySnapshot.from_tarball(io.BytesIO(_tarball()), 'NiloticNetwork/NiloticNetworkBlockchain')
+
+    assert snapshot.paths() == sorted(FILES)
+    assert not snapshot.on_disk
+    assert [path for path, _ in snapshot.iter_files(CPP_EXTENSIONS)] == ['src/core/blockchain.cpp', 'src/core/blockchain.h']
+    print(f"✅ In-memory snapshot: {snapshot.file_count} files")
+
+def test_large_snapshot_spills_to_disk():
+    """Snapshots over the memory limit should move to a temp dir"""
+    snapshot = RepositorySnapshot.from_tarball(io.BytesIO(_tarball()), 'NiloticNetwork/NiloticNetworkBlockchain', memory_limit=32)
+
+    assert snapshot.on_disk
+    directory = snapshot._directory
+    assert snapshot.read('src/core/blockchain.h') == FILES['src/core/blockchain.h']
+
+    snapshot.close()
+    assert not os.path.exists(directory)
+    print("✅ Large snapshot spilled to disk and cleaned up")
+
+def test_download_once():
+    """One tarball request should provide every file"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _TarballHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        transport = GitHubTransport(base_url=f"http://127.0.0.1:{server.server_port}")
+        with download_snapshot('NiloticNetwork/NiloticNetworkBlockchain', 'abc1234', {}, transport=transport) as snapshot:
+            assert 'strcpy' in snapshot.read_text('src/core/blockchain.cpp')
+            assert snapshot.file_count == len(FILES)
+        assert _TarballHandler.downloads == 1
+        print("✅ Repository downloaded in one request")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    print("📦 Testing Repository Snapshots")
+    print("=" * 50)
+    test_tarball_extracted_in_memory()
+    test_large_snapshot_spills_to_disk()
+    test_download_once()
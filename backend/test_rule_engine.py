@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+"""
+Test the single-pass multi-pattern rule engine against per-rule regex search
+"""
+
+import re
+from rule_engine import Rule, RuleEngine, iter_rule_proposals, literal_prefix
+from rule_packs import get_rule_packs
+
+ALL_RULES = get_rule_packs().current().rules()
+
+SOURCE = '''#include <bits/stdc++.h>
+using namespace std;
+
+void Wallet::copyAddress(char *dest, const char *src) {
+    strcpy(dest, src);
+    sprintf(dest, "%s", src);
+    std::vector<int> ids; ids.push_back(rand());
+    std::map<int, int> index; index.find(1);
+    srand (42);
+}
+'''
+
+def test_literal_prefix():
+    """Leading literals should stop at classes, quantifiers and alternations"""
+    assert literal_prefix(r'strcpy\s*\(') == 'strcpy'
+    assert literal_prefix(r'#include <bits/stdc\+\+\.h>') == '#include <bits/stdc++.h>'
+    assert literal_prefix(r'ab*c') == 'a'
+    assert literal_prefix(r'foo|bar') is None
+    assert literal_prefix(r'\bfoo') is None
+    print("✅ Literal prefixes extracted")
+
+def test_matches_every_rule_hit():
+    """One pass should report the same hits as running each regex separately"""
+    engine = RuleEngine(ALL_RULES)
+
+    expected = sorted(
+        (match.start(), rule.id)
+        for rule in ALL_RULES
+        for match in re.finditer(rule.pattern, SOURCE)
+    )
+    found = sorted((hit['offset'], hit['rule_id']) for hit in engine.scan(SOURCE))
+
+    assert found == expected
+    assert {'strcpy', 'sprintf', 'rand', 'vector-push-back', 'map-find', 'using-namespace-std', 'bits-stdc'} <= {rule_id for _, rule_id in found}
+    print(f"✅ {len(found)} rule hits found in one pass")
+
+def test_shared_and_missing_literals():
+    """Rules sharing a literal prefix, or without one, should all be checked"""
+    rules = [
+        Rule(id='std', pattern=r'std::\w+', title='', description='', severity='low', category='test'),
+        Rule(id='vector', pattern=r'std::vector<', title='', description='', severity='low', category='test'),
+        Rule(id='any-define', pattern=r'\s*#define', title='', description='', severity='low', category='test')
+    ]
+    hits = RuleEngine(rules).scan('std::vector<int> v;\n#define X 1\n')
+
+    assert [hit['rule_id'] for hit in hits] == ['std', 'vector', 'any-define']
+    print("✅ Overlapping and unanchored rules handled")
+
+def test_comments_and_literals_skipped():
+    """Rule text inside comments and literals should not produce hits"""
+    source = (
+        '// strcpy(dest, src) is unsafe\n'
+        'log("strcpy(") ; /* rand() */ strcpy(dest, src);\n'
+        'auto q = R"(sprintf(buf))";\n'
+    )
+    hits = RuleEngine(ALL_RULES).scan(source)
+
+    assert [(hit['rule_id'], hit['line'], hit['column']) for hit in hits] == [('strcpy', 2, 31)]
+    print("✅ Comments and literals skipped")
+
+def test_rule_proposals():
+    """Each rule should give one proposal per file, numbered under its prefix"""
+    rules = {rule.id: rule for rule in ALL_RULES}
+    file_findings = [
+        ('src/wallet.cpp', [{'rule_id': 'strcpy', 'line': 3}, {'rule_id': 'strcpy', 'line': 9},
+                            {'rule_id': 'vector-push-back', 'line': 4}]),
+        ('src/main.cpp', [{'rule_id': 'strcpy', 'line': 1}, {'rule_id': 'unknown', 'line': 2}])
+    ]
+    proposals = list(iter_rule_proposals(file_findings, {
+        'sec': [rules['strcpy']], 'perf': [rules['vector-push-back']]
+    }))
+    assert [(p['id'], p['file_path'], p['line_number']) for p in proposals] == [
+        ('sec_1', 'src/wallet.cpp', 3), ('perf_1', 'src/wallet.cpp', 4), ('sec_2', 'src/main.cpp', 1)
+    ]
+    assert proposals[0]['title'] == rules['strcpy'].title
+    print("✅ Rule proposals test passed")
+
+if __name__ == "__main__":
+    print("⚙️  Testing Rule Engine")
+    print("=" * 50)
+    test_literal_prefix()
+    test_matches_every_rule_hit()
+    test_shared_and_missing_literals()
+    test_comments_and_literals_skipped()
+    test_rule_proposals()
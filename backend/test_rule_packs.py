@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+"""
+Test loading, validating, caching and hot-reloading rule packs
+"""
+
+import os
+import json
+import tempfile
+from rule_packs import PACKS_DIR, RulePackRegistry, validate_pack
+
+STRCPY = {
+    'id': 'strcpy', 'pattern': r'strcpy\s*\(', 'title': 'strcpy', 'description': 'Unsafe copy',
+    'severity': 'high', 'category': 'security', 'labels': ['security']
+}
+
+def _write_pack(directory, name, rules, version='1.0.0'):
+    with open(os.path.join(directory, f"{name}.json"), 'w') as f:
+        json.dump({'name': name, 'version': version, 'rules': rules}, f)
+
+def test_default_packs():
+    """The shipped packs should load and cover every rule category"""
+    with tempfile.TemporaryDirectory() as cache:
+        rule_set = RulePackRegistry(PACKS_DIR, cache, check_interval=0).current()
+    assert set(rule_set.packs) == {'security', 'performance', 'quality'}
+    assert [rule.id for rule in rule_set.rules('security')] == ['strcpy', 'sprintf', 'rand']
+
+    engine = rule_set.engine('security')
+    assert engine is rule_set.engine('security')
+    assert [finding['rule_id'] for finding in engine.scan('strcpy(a, b);\n')] == ['strcpy']
+
+    # Constants defined with a value are reported; include guards are not
+    quality = rule_set.engine('quality')
+    assert [f['rule_id'] for f in quality.scan('#ifndef WALLET_H\n#define WALLET_H\n#define MAX_SUPPLY 21000000\n')] == [
+        'define-constant'
+    ]
+    print("✅ Default packs test passed")
+
+def test_validation_errors():
+    """Broken rules should be reported with the pack and rule they come from"""
+    errors = validate_pack({
+        'name': 'broken', 'version': '1',
+        'rules': [
+            dict(STRCPY, pattern='strcpy('),
+            dict(STRCPY, id='rand', severity='urgent', extra=True),
+            {'id': 'partial', 'pattern': 'x'}
+        ]
+    }, 'broken.json')
+    assert any('strcpy: invalid pattern' in error for error in errors)
+    assert any('rand: severity must be one of' in error for error in errors)
+    assert any('rand: unknown fields extra' in error for error in errors)
+    assert any('partial: missing title' in error for error in errors)
+    assert validate_pack({'name': 'empty', 'version': '1', 'rules': []}, 'empty.json')
+    assert validate_pack({'name': 'ok', 'version': '1', 'rules': [STRCPY]}, 'ok.json') == []
+    print("✅ Validation test passed")
+
+def test_cache_by_pack_hash():
+    """A second registry over the same packs should load them from the cache"""
+    with tempfile.TemporaryDirectory() as packs, tempfile.TemporaryDirectory() as cache:
+        _write_pack(packs, 'security', [STRCPY])
+        first = RulePackRegistry(packs, cache, check_interval=0).current()
+        assert os.listdir(cache) == [f"{first.digest}.json"]
+
+        second = RulePackRegistry(packs, cache, check_interval=0).current()
+        assert second.digest == first.digest
+        assert [rule.id for rule in second.rules()] == ['strcpy']
+        assert second.engine().version == first.engine().version
+    print("✅ Pack cache test passed")
+
+def test_hot_reload():
+    """Edited packs should swap in as a whole; invalid ones should keep the old rules"""
+    with tempfile.TemporaryDirectory() as packs, tempfile.TemporaryDirectory() as cache:
+        _write_pack(packs, 'security', [STRCPY])
+        registry = RulePackRegistry(packs, cache, check_interval=0)
+        before = registry.current()
+
+        rand = dict(STRCPY, id='rand', pattern=r'rand\s*\(')
+        _write_pack(packs, 'security', [STRCPY, rand], version='1.1.0')
+        after = registry.reload()
+        assert after is registry.current() and after is not before
+        assert [rule.id for rule in after.rules()] == ['strcpy', 'rand']
+        assert after.engine().version != before.engine().version
+        # The old rule set is untouched for analyses still using it
+        assert [rule.id for rule in before.rules()] == ['strcpy']
+
+        _write_pack(packs, 'security', [dict(STRCPY, pattern='rand(')], version='1.2.0')
+        assert registry.reload() is None
+        assert registry.current() is after
+
+        # With a check interval, edits are picked up by current() itself
+        registry.check_interval = 0.001
+        _write_pack(packs, 'security', [rand], version='2.0.0')
+        os.utime(os.path.join(packs, 'security.json'), ns=(0, 1))
+        registry._checked_at = 0
+        assert [rule.id for rule in registry.current().rules()] == ['rand']
+    print("✅ Hot reload test passed")
+
+if __name__ == "__main__":
+    print("🧪 Testing Rule Packs")
+    print("=" * 50)
+
+    test_default_packs()
+    test_validation_errors()
+    test_cache_by_pack_hash()
+    test_hot_reload()
+
+    print("\n🎉 All rule pack tests passed!")
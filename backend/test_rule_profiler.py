@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+"""
+Test per-rule profiling and the per-file rule time budget
+"""
+
+import os
+import time
+import functools
+import threading
+from analysis_executor import AnalysisExecutor
+from analysis_store import _scan_file
+from rule_engine import LEXER_PASS, LITERAL_PASS, Rule, RuleEngine
+from rule_profiler import RuleClock, get_rule_profiler
+
+ENGINE = RuleEngine([
+    Rule(id='strcpy', pattern=r'strcpy\s*\(', title='strcpy', description='', severity='high', category='security'),
+    Rule(id='concat', pattern=r'std::string.*\+.*std::string', title='concat', description='', severity='low', category='performance')
+])
+
+def _profiles():
+    return {profile.rule_id: profile for profile in get_rule_profiler().profiles()}
+
+def test_profile_per_rule():
+    """Every rule should record files, bytes, matches and its worst file"""
+    get_rule_profiler().reset()
+    small = 'void f(char *d) { strcpy(d, "x"); }\n'
+    large = small * 20 + 'std::string a = b + std::string("x");\n'
+
+    with get_rule_profiler().file('src/small.cpp'):
+        ENGINE.scan(small)
+    with get_rule_profiler().file('src/large.cpp'):
+        ENGINE.scan(large)
+
+    profiles = _profiles()
+    assert set(profiles) == {LEXER_PASS, LITERAL_PASS, 'strcpy', 'concat'}
+    assert profiles['strcpy'].files == 2
+    assert profiles['strcpy'].bytes == len(small) + len(large)
+    assert profiles['strcpy'].matches == 21
+    assert profiles['concat'].matches == 1
+    assert profiles['concat'].worst_file in ('src/small.cpp', 'src/large.cpp')
+    assert all(profile.timeouts == 0 for profile in profiles.values())
+    print("✅ Per-rule profile test passed")
+
+def test_runaway_rule_is_aborted():
+    """A catastrophically backtracking rule should time out without losing other findings"""
+    engine = RuleEngine([
+        Rule(id='strcpy', pattern=r'strcpy\s*\(', title='strcpy', description='', severity='high', category='security'),
+        Rule(id='nested', pattern=r'(a+)+$', title='nested', description='', severity='low', category='enhancement')
+    ])
+    content = 'strcpy(d, s);\n' + 'a' * 40 + '!\n'
+
+    get_rule_profiler().reset()
+    os.environ['GITHUB_RULE_TIMEOUT'] = '0.2'
+    try:
+        started = time.perf_counter()
+        findings = engine.scan(content)
+        elapsed = time.perf_counter() - started
+    finally:
+        del os.environ['GITHUB_RULE_TIMEOUT']
+
+    assert elapsed < 2
+    assert [finding['rule_id'] for finding in findings] == ['strcpy']
+    assert _profiles()['nested'].timeouts == 1
+    assert _profiles()['strcpy'].timeouts == 0
+    print("✅ Runaway rule test passed")
+
+def test_lexer_timeout_skips_rules():
+    """Rules should not run on the raw text when the lexer pass runs out of time"""
+    engine = RuleEngine([
+        Rule(id='strcpy', pattern=r'strcpy\s*\(', title='strcpy', description='', severity='high', category='security')
+    ])
+    content = '// strcpy(d, s);\n' * 100000
+
+    get_rule_profiler().reset()
+    os.environ['GITHUB_RULE_TIMEOUT'] = '0.001'
+    try:
+        findings = engine.scan(content)
+    finally:
+        del os.environ['GITHUB_RULE_TIMEOUT']
+
+    assert findings == []
+    assert _profiles()[LEXER_PASS].timeouts == 1
+    assert _profiles()['strcpy'].matches == 0
+    print("✅ Lexer timeout test passed")
+
+def test_budget_off_main_thread():
+    """Off the main thread the budget should be enforced between evaluations"""
+    results = {}
+
+    def run():
+        clock = RuleClock(timeout=0.05)
+        with clock:
+            with clock.run('slow'):
+                time.sleep(0.1)
+            results['exhausted'] = clock.exhausted('slow')
+            results['other'] = clock.exhausted('other')
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert results == {'exhausted': True, 'other': False}
+    print("✅ Off-main-thread budget test passed")
+
+def test_worker_profiles_are_merged():
+    """Statistics gathered in worker processes should reach the parent's profiler"""
+    get_rule_profiler().reset()
+    items = [(f"blob{i}", (f"src/file{i}.cpp", f"strcpy(a{i}, b);\n")) for i in range(6)]
+    results = AnalysisExecutor(max_workers=2, chunk_size=2).map(functools.partial(_scan_file, ENGINE.scan), items)
+
+    assert all(len(findings) == 1 and complete for findings, complete in results.values())
+    profiles = _profiles()
+    assert profiles['strcpy'].files == 6
+    assert profiles['strcpy'].matches == 6
+    assert profiles['strcpy'].worst_file.startswith('src/file')
+    print("✅ Worker profile merge test passed")
+
+def test_repeated_parallel_runs_count_once():
+    """A second run's workers should not report statistics inherited from the first"""
+    get_rule_profiler().reset()
+    items = [(f"blob{i}", (f"src/file{i}.cpp", f"strcpy(a{i}, b);\n")) for i in range(16)]
+    for _ in range(2):
+        AnalysisExecutor(max_workers=4, chunk_size=2).map(functools.partial(_scan_file, ENGINE.scan), items)
+
+    profiles = _profiles()
+    assert profiles['strcpy'].files == 32
+    assert profiles['concat'].files == 32
+    print("✅ Repeated parallel run test passed")
+
+if __name__ == "__main__":
+    print("🧪 Testing Rule Profiler")
+    print("=" * 50)
+
+    test_profile_per_rule()
+    test_runaway_rule_is_aborted()
+    test_lexer_timeout_skips_rules()
+    test_budget_off_main_thread()
+    test_worker_profiles_are_merged()
+    test_repeated_parallel_runs_count_once()
+
+    print("\n🎉 All rule profiler tests passed!")
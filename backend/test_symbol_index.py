@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+"""
+Test symbol extraction and the incremental cross-file symbol index
+"""
+
+import os
+import tempfile
+from symbol_index import SymbolIndex, extract_symbols
+
+BLOCKCHAIN_H = '''#ifndef BLOCKCHAIN_H
+#define BLOCKCHAIN_H
+class Block;
+class Blockchain : public Ledger {
+public:
+    explicit Blockchain(int difficulty);
+    void addBlock(const Block& block);
+    const std::vector<Block>& getChain() const;
+    virtual int size() const = 0;
+};
+#endif
+'''
+
+BLOCKCHAIN_CPP = '''#include "blockchain.h"
+Blockchain::Blockchain(int difficulty) : difficulty(difficulty) {
+    addBlock(genesis());
+    if (ready(difficulty)) {
+        return;
+    }
+}
+void Blockchain::addBlock(const Block& block) {
+    chain.push_back(block);
+}
+'''
+
+def test_extract_symbols():
+    """Declarations, definitions, classes and macros should be told apart"""
+    symbols = {(s['qualified_name'], s['kind'], s['role'], s['line']) for s in extract_symbols(BLOCKCHAIN_H)}
+    assert symbols == {
+        ('BLOCKCHAIN_H', 'macro', 'definition', 2),
+        ('Block', 'class', 'declaration', 3),
+        ('Blockchain', 'class', 'definition', 4),
+        ('Blockchain', 'function', 'declaration', 6),
+        ('addBlock', 'function', 'declaration', 7),
+        ('getChain', 'function', 'declaration', 8),
+        ('size', 'function', 'declaration', 9)
+    }
+
+    # Calls and control statements inside bodies are not symbols
+    symbols = [(s['qualified_name'], s['role'], s['line']) for s in extract_symbols(BLOCKCHAIN_CPP)]
+    assert symbols == [('Blockchain::Blockchain', 'definition', 2), ('Blockchain::addBlock', 'definition', 8)]
+
+    # Commented-out code and string contents declare nothing
+    text = '// void legacy();\n/*\nclass Old {};\n*/\nconst char *doc = "int helper();";\nvoid live();\n'
+    assert [(s['name'], s['line']) for s in extract_symbols(text)] == [('live', 6)]
+    print("✅ Symbol extraction test passed")
+
+def test_incremental_index():
+    """Only new blobs should be read, and changed paths should replace their symbols"""
+    with tempfile.TemporaryDirectory() as directory:
+        index = SymbolIndex(os.path.join(directory, 'symbols.sqlite'))
+        contents = {'src/blockchain.h': BLOCKCHAIN_H, 'src/blockchain.cpp': BLOCKCHAIN_CPP}
+        reads = []
+
+        def read(path):
+            reads.append(path)
+            return contents[path]
+
+        summary = index.update('owner/repo', 'c1', {'src/blockchain.h': 'h1', 'src/blockchain.cpp': 'c1'}, read)
+        assert summary == {'files': 2, 'changed': 2, 'removed': 0, 'extracted': 2}
+
+        table = index.table('owner/repo')
+        assert table.is_defined('addBlock', kind='function')
+        assert table.is_declared('getChain') and not table.is_defined('getChain')
+        assert not table.is_declared('getCurrentSupply')
+        assert table.locations('Blockchain', kind='class', role='definition')[0]['path'] == 'src/blockchain.h'
+        assert [row['path'] for row in index.lookup('owner/repo', 'addBlock')] == ['src/blockchain.cpp', 'src/blockchain.h']
+
+        # Add getCurrentSupply to the source and delete the header
+        contents['src/blockchain.cpp'] = BLOCKCHAIN_CPP + 'double Blockchain::getCurrentSupply() const {\n    return 0;\n}\n'
+        reads.clear()
+        summary = index.update('owner/repo', 'c2', {'src/blockchain.cpp': 'c2'}, read)
+        assert summary == {'files': 1, 'changed': 1, 'removed': 1, 'extracted': 1}
+        assert reads == ['src/blockchain.cpp']
+
+        table = index.table('owner/repo')
+        assert table.is_defined('getCurrentSupply', kind='function')
+        assert not table.is_declared('Blockchain', kind='class')
+
+        # A blob already extracted for another path or repository is not read again
+        reads.clear()
+        index.update('owner/fork', 'c2', {'blockchain.cpp': 'c2'}, read)
+        assert reads == []
+        assert index.table('owner/fork').is_defined('getCurrentSupply')
+    print("✅ Incremental index test passed")
+
+def test_unreadable_blob_is_retried():
+    """A blob whose read failed should not be stored as having no symbols"""
+    with tempfile.TemporaryDirectory() as directory:
+        index = SymbolIndex(os.path.join(directory, 'symbols.sqlite'))
+        contents = {'src/blockchain.h': None}
+        files = {'src/blockchain.h': 'h1'}
+
+        index.update('owner/repo', 'c1', files, contents.get)
+        assert len(index.table('owner/repo')) == 0
+
+        contents['src/blockchain.h'] = BLOCKCHAIN_H
+        summary = index.update('owner/repo', 'c1', files, contents.get)
+        assert summary['extracted'] == 1
+        assert index.table('owner/repo').is_declared('getChain')
+    print("✅ Unreadable blob retry test passed")
+
+if __name__ == "__main__":
+    print("🧪 Testing Symbol Index")
+    print("=" * 50)
+
+    test_extract_symbols()
+    test_incremental_index()
+    test_unreadable_blob_is_retried()
+
+    print("\n🎉 All symbol index tests passed!")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+"""
+Test the process-wide GitHub App token manager without network access
+"""
+
+import os
+import time
+import tempfile
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from github_token_manager import GitHubTokenManager
+
+def _write_private_key(directory):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    path = os.path.join(directory, 'app.pem')
+    with open(path, 'wb') as f:
+        f.write(key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.TraditionalOpenSSL,
+            encryption_algorithm=serialization.NoEncryption()
+        ))
+    return path
+
+def test_jwt_is_reused():
+    """The app JWT should be signed once and reused until near expiry"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = GitHubTokenManager(
+            app_id='12345',
+            private_key_path=_write_private_key(tmp),
+            installation_id='678',
+            cache_path=os.path.join(tmp, 'tokens.json')
+        )
+
+        first = manager.get_app_jwt()
+        second = manager.get_app_jwt()
+        assert first == second
+        print("✅ App JWT reused between calls")
+
+def test_installation_token_shared_between_workers():
+    """A token minted by one worker should be picked up by another"""
+    with tempfile.TemporaryDirectory() as tmp:
+        key_path = _write_private_key(tmp)
+        cache_path = os.path.join(tmp, 'tokens.json')
+
+        worker_one = GitHubTokenManager('12345', key_path, '678', cache_path)
+        worker_two = GitHubTokenManager('12345', key_path, '678', cache_path)
+
+        minted = []
+
+        def fake_mint(installation_id):
+            minted.append(installation_id)
+            return {'token': 'ghs_cached', 'expires_at': time.time() + 3600}
+
+        worker_one._mint_installation_token = fake_mint
+        worker_two._mint_installation_token = fake_mint
+
+        assert worker_one.get_installation_token() == 'ghs_cached'
+        assert worker_two.get_installation_token() == 'ghs_cached'
+        assert worker_one.get_installation_headers()['Authorization'] == 'Bearer ghs_cached'
+        assert minted == ['678']
+        print("✅ Installation token minted once and shared")
+
+def test_expiring_token_is_refreshed():
+    """Tokens inside the refresh margin should be minted again"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = GitHubTokenManager('12345', _write_private_key(tmp), '678', os.path.join(tmp, 'tokens.json'))
+
+        tokens = iter([
+            {'token': 'ghs_old', 'expires_at': time.time() + 60},
+            {'token': 'ghs_new', 'expires_at': time.time() + 3600}
+        ])
+        manager._mint_installation_token = lambda installation_id: next(tokens)
+
+        assert manager.get_installation_token() == 'ghs_old'
+        assert manager.get_installation_token() == 'ghs_new'
+        print("✅ Installation token refreshed ahead of expiry")
+
+if __name__ == "__main__":
+    print("🔑 Testing GitHub Token Manager")
+    print("=" * 50)
+    test_jwt_is_reused()
+    test_installation_token_shared_between_workers()
+    test_expiring_token_is_refreshed()
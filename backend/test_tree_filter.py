@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+"""
+Test tree filtering before file contents are downloaded
+"""
+
+import io
+import json
+import tarfile
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from blob_cache import BlobCache, git_blob_sha
+from github_transport import GitHubTransport
+from repo_snapshot import RepositorySnapshot, load_snapshot
+from tree_filter import TreeFilter, is_binary
+
+REPO = 'NiloticNetwork/NiloticNetworkBlockchain'
+
+FILES = {
+    'src/core/blockchain.cpp': b'void Blockchain::addBlock() {}\n',
+    'src/persistence/storage.h': b'class Storage;\n',
+    'src/third_party/json.hpp': b'namespace nlohmann {}\n',
+    'vendor/leveldb/db.cc': b'int db;\n',
+    'src/proto/block.pb.h': b'// generated\n',
+    'src/core/huge.cpp': b'x' * 2048,
+    'src/core/blob.h': b'\0\1\2binary',
+    'docs/logo.png': b'\x89PNG',
+    'README.md': b'# Nilotic Network\n'
+}
+
+KEPT = ['src/core/blockchain.cpp', 'src/persistence/storage.h']
+
+class _TreeHandler(BaseHTTPRequestHandler):
+    """Serves a tree with sizes, its blobs and a tarball; records requested blobs"""
+    protocol_version = 'HTTP/1.1'
+    requests_seen = []
+
+    def do_GET(self):
+        type(self).requests_seen.append(self.path.split('?')[0])
+        by_sha = {git_blob_sha(content): content for content in FILES.values()}
+
+        if '/git/trees/' in self.path:
+            tree = [
+                {'path': path, 'type': 'blob', 'sha': git_blob_sha(content), 'size': len(content)}
+                for path, content in FILES.items()
+            ]
+            self._send(json.dumps({'tree': tree, 'truncated': False}).encode('utf-8'))
+        elif '/git/blobs/' in self.path:
+            self._send(by_sha[self.path.rsplit('/', 1)[1]])
+        else:
+            self._send(_tarball())
+
+    def _send(self, body):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def _tarball():
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        for path, content in FILES.items():
+            info = tarfile.TarInfo(f"root/{path}")
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+def test_filter_rules():
+    """Globs, size cap and binary detection should each reject files"""
+    tree_filter = TreeFilter(max_file_size=1024)
+    assert tree_filter.skip_reason('src/core/blockchain.cpp', 30) is None
+    assert tree_filter.skip_reason('src/third_party/json.hpp') == 'excluded'
+    assert tree_filter.skip_reason('vendor/leveldb/db.h') == 'excluded'
+    assert tree_filter.skip_reason('src/proto/block.pb.h') == 'excluded'
+    assert tree_filter.skip_reason('README.md') == 'not_included'
+    assert tree_filter.skip_reason('docs/logo.png') == 'binary'
+    assert tree_filter.skip_reason('src/core/huge.cpp', 2048) == 'too_large'
+    assert is_binary(b'\0\1\2') and not is_binary(b'int x;\n')
+
+    custom = TreeFilter(include=['src/core/*'], exclude=[], max_file_size=0)
+    assert custom.accepts('src/core/huge.cpp', 10 ** 9)
+    assert not custom.accepts('src/persistence/storage.h')
+    print("✅ Tree filter rules")
+
+def test_filtered_blobs_never_downloaded():
+    """Only blobs that pass the filter should be requested"""
+    handler = type('Handler', (_TreeHandler,), {'requests_seen': []})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            transport = GitHubTransport(base_url=f"http://127.0.0.1:{server.server_port}")
+            tree_filter = TreeFilter(max_file_size=1024)
+
+            with load_snapshot(REPO, 'c1', {}, transport=transport, blob_cache=BlobCache(directory),
+                               tree_filter=tree_filter) as snapshot:
+                assert snapshot.paths() == KEPT
+
+            blob_requests = [path for path in handler.requests_seen if '/git/blobs/' in path]
+            # blob.h passes the path filter and is only dropped once its content is seen
+            assert len(blob_requests) == 3
+            assert not any('/tarball/' in path for path in handler.requests_seen)
+            print("✅ Filtered blobs were not downloaded")
+    finally:
+        server.shutdown()
+
+def test_tarball_members_filtered():
+    """Tarball extraction should apply the same filter"""
+    snapshot = RepositorySnapshot.from_tarball(io.BytesIO(_tarball()), REPO, tree_filter=TreeFilter(max_file_size=1024))
+    assert snapshot.paths() == KEPT
+    print("✅ Tarball members filtered")
+
+if __name__ == "__main__":
+    print("🌳 Testing Tree Filter")
+    print("=" * 50)
+    test_filter_rules()
+    test_filtered_blobs_never_downloaded()
+    test_tarball_members_filtered()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+"""
+Atim AI Assistant - Tree Filter
+===============================
+
+Decides which files of a repository tree are worth analyzing before their
+content is downloaded. Paths are matched against include and exclude
+globs, blobs above a size cap are skipped using the size reported by the
+tree, and known binary extensions are rejected up front. Content that does
+arrive (tarball members, fetched blobs) is sniffed for NUL bytes the same
+way git decides a file is binary.
+"""
+
+import os
+import threading
+from fnmatch import fnmatchcase
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_INCLUDE = ('*.cpp', '*.c', '*.h', '*.hpp')
+
+DEFAULT_EXCLUDE = (
+    '.git/*', 'vendor/*', 'vendored/*', 'third_party/*', 'thirdparty/*', 'external/*',
+    'deps/*', 'node_modules/*', 'build/*', 'generated/*', '*.pb.h', '*.pb.cc', '*_generated.h'
+)
+
+BINARY_EXTENSIONS = (
+    '.a', '.o', '.so', '.dll', '.dylib', '.exe', '.bin', '.obj', '.lib', '.png', '.jpg',
+    '.jpeg', '.gif', '.ico', '.pdf', '.zip', '.gz', '.tar', '.7z', '.woff', '.woff2', '.ttf'
+)
+
+# git treats a file as binary if its first 8000 bytes contain a NUL
+BINARY_SNIFF_BYTES = 8000
+
+
+def is_binary(content: bytes) -> bool:
+    return b'\0' in content[:BINARY_SNIFF_BYTES]
+
+
+def _split_globs(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    if value is None:
+        return None
+    return tuple(glob.strip() for glob in value.split(',') if glob.strip())
+
+
+class TreeFilter:
+    """Include/exclude globs, a size cap and binary detection for tree paths
+
+    A glob matches the full path or any path suffix starting at a directory
+    boundary, so `third_party/*` also excludes `src/third_party/zlib.h`.
+    """
+
+    def __init__(self, include: Iterable[str] = None, exclude: Iterable[str] = None,
+                 max_file_size: int = None):
+        include = include if include is not None else _split_globs(os.environ.get('GITHUB_ANALYSIS_INCLUDE'))
+        exclude = exclude if exclude is not None else _split_globs(os.environ.get('GITHUB_ANALYSIS_EXCLUDE'))
+        self.include = tuple(include if include is not None else DEFAULT_INCLUDE)
+        self.exclude = tuple(exclude if exclude is not None else DEFAULT_EXCLUDE)
+        self.max_file_size = max_file_size if max_file_size is not None else int(
+            os.environ.get('GITHUB_MAX_FILE_SIZE', 1024 * 1024)
+        )
+
+    def _matches(self, path: str, globs: Tuple[str, ...]) -> bool:
+        return any(fnmatchcase(path, glob) or fnmatchcase(path, '*/' + glob) for glob in globs)
+
+    def skip_reason(self, path: str, size: int = None) -> Optional[str]:
+        """Why a path would be skipped, or None if it should be analyzed"""
+        if path.lower().endswith(BINARY_EXTENSIONS):
+            return 'binary'
+        if self.include and not self._matches(path, self.include):
+            return 'not_included'
+        if self._matches(path, self.exclude):
+            return 'excluded'
+        if size is not None and self.max_file_size and size > self.max_file_size:
+            return 'too_large'
+        return None
+
+    def accepts(self, path: str, size: int = None) -> bool:
+        return self.skip_reason(path, size) is None
+
+    def accepts_content(self, path: str, content: bytes) -> bool:
+        """Final check once the content is available"""
+        return self.accepts(path, len(content)) and not is_binary(content)
+
+    def filter_entries(self, entries: Iterable[Dict]) -> Tuple[List[Dict], Dict[str, int]]:
+        """Split git tree entries ({'path', 'size', ...}) into kept entries and skip counts"""
+        kept = []
+        skipped = {}
+        for entry in entries:
+            reason = self.skip_reason(entry['path'], entry.get('size'))
+            if reason is None:
+                kept.append(entry)
+            else:
+                skipped[reason] = skipped.get(reason, 0) + 1
+        return kept, skipped
+
+
+_tree_filter = None
+_tree_filter_lock = threading.Lock()
+
+
+def get_tree_filter() -> TreeFilter:
+    """Return the process-wide tree filter configured from the environment"""
+    global _tree_filter
+    with _tree_filter_lock:
+        if _tree_filter is None:
+            _tree_filter = TreeFilter()
+        return _tree_filter
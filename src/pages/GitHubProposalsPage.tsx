@@ -19,6 +19,18 @@ interface IssueProposal {
   github_issue_number?: number;
 }
 
+interface AnalysisJob {
+  id: string;
+  status: 'queued' | 'running' | 'completed' | 'failed';
+  progress: {
+    files?: number;
+    to_scan?: number;
+    scanned?: number;
+    findings?: number;
+  };
+  error?: string;
+}
+
 interface GitHubStats {
   name: string;
   open_issues: number;
@@ -35,24 +47,41 @@ const GitHubProposalsPage: React.FC = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [processing, setProcessing] = useState<string | null>(null);
+  const [job, setJob] = useState<AnalysisJob | null>(null);
 
   useEffect(() => {
     fetchData();
   }, []);
 
+  // Poll while an analysis job is running; proposals refresh when it finishes
+  useEffect(() => {
+    if (!job || (job.status !== 'queued' && job.status !== 'running')) {
+      return;
+    }
+    const timer = setTimeout(() => {
+      fetchProposals().catch(() => setError('Failed to load proposals'));
+    }, 2000);
+    return () => clearTimeout(timer);
+  }, [job]);
+
+  const fetchProposals = async () => {
+    const proposalsResponse = await fetch('http://localhost:5070/api/github/proposals');
+    const proposalsData = await proposalsResponse.json();
+
+    if (proposalsData.success) {
+      setProposals(proposalsData.data);
+      setJob(proposalsData.job);
+    } else {
+      setError(proposalsData.error || 'Failed to load proposals');
+    }
+  };
+
   const fetchData = async () => {
     try {
       setLoading(true);
       
-      // Fetch proposals
-      const proposalsResponse = await fetch('http://localhost:5070/api/github/proposals');
-      const proposalsData = await proposalsResponse.json();
-      
-      if (proposalsData.success) {
-        setProposals(proposalsData.data);
-      } else {
-        setError(proposalsData.error || 'Failed to load proposals');
-      }
+      // Fetch stored proposals; analysis runs as a background job
+      await fetchProposals();
       
       // Fetch GitHub stats
       const statsResponse = await fetch('http://localhost:5070/api/github/stats');
@@ -217,6 +246,20 @@ const GitHubProposalsPage: React.FC = () => {
           <p className="text-gray-400">Review and manage issue proposals for the NiloticNetwork repository</p>
         </div>
 
+        {/* Analysis Job */}
+        {job && (job.status === 'queued' || job.status === 'running') && (
+          <div className="bg-slate-800 rounded-lg p-4 border border-blue-700 mb-8 text-gray-300">
+            Analyzing repository ({job.status})
+            {job.progress.to_scan !== undefined &&
+              `: ${job.progress.scanned} of ${job.progress.to_scan} changed files scanned, ${job.progress.findings} findings so far`}
+          </div>
+        )}
+        {job && job.status === 'failed' && (
+          <div className="bg-slate-800 rounded-lg p-4 border border-red-700 mb-8 text-red-400">
+            Last analysis failed: {job.error}
+          </div>
+        )}
+
         {/* GitHub Stats */}
         {stats && (
           <div className="grid grid-cols-1 md:grid-cols-5 gap-4 mb-8">